@@ -0,0 +1,169 @@
+import argparse
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+from databases.db import BaseRecipeDB
+
+WEBSITE_NAME = "fast_load_check"
+# the names and steps hold characters outside of utf8mb3, and the characters
+# that to_tsv_field has to escape
+RECIPE_NAME = "Fast-load check 🥑 recipe {index}"
+INSTRUCTION = "Step {order_number}:\tmix\\whisk 🍳\nthen rest"
+
+
+class FastLoadCheck(BaseRecipeDB):
+    """
+    Writes the same synthetic recipes with the INSERT path of insert_recipe_dicts
+    and with the LOAD DATA path of backfill, each in a transaction that is rolled
+    back, and compares the rows they leave in every table.
+    """
+
+    def add_urls(self, recipes: int) -> List[int]:
+        self.cursor.executemany(
+            "INSERT INTO keto_recipe_urls(url, website_name) VALUES (%s, %s)",
+            [(self.get_url(index), WEBSITE_NAME) for index in range(recipes)],
+        )
+        self.cursor.execute(
+            "SELECT url, url_id from keto_recipe_urls where website_name=%s",
+            (WEBSITE_NAME,),
+        )
+        url_ids = {data["url"]: data["url_id"] for data in self.cursor.fetchall()}
+        return [url_ids[self.get_url(index)] for index in range(recipes)]
+
+    @staticmethod
+    def get_url(index: int) -> str:
+        return f"https://example.com/fast-load-check/{index}/"
+
+    @staticmethod
+    def get_recipe_dict(index: int, url_id: int) -> Dict:
+        recipe_name = RECIPE_NAME.format(index=index)
+        return {
+            "keto_recipe_info": {
+                "recipe_name": recipe_name,
+                "url_id": url_id,
+                "yield": "4 servings",
+                "yield_unit": None,
+                "prep_time": 600,
+                "active_time": 1200,
+                "total_time": 1800,
+                "image_url": f"https://example.com/fast-load-check/{index}.jpg",
+            },
+            "keto_recipe_ingredients": [
+                {
+                    "recipe_name": recipe_name,
+                    "ingredient_name": f"ingredient {number} ½",
+                    "amount": str(number),
+                    "unit": "cup" if number % 2 else None,
+                }
+                for number in range(1, 6)
+            ],
+            "keto_recipe_instructions": [
+                {
+                    "recipe_name": recipe_name,
+                    "order_number": order_number,
+                    "eng_description": INSTRUCTION.format(order_number=order_number),
+                }
+                for order_number in range(1, 4)
+            ],
+            "keto_recipe_nutrition": {
+                "recipe_name": recipe_name,
+                "energy": 250,
+                "carbohydrate": 4,
+                "fat": 20,
+                "protein": 12,
+                "total_dietary_fiber": 2,
+            },
+        }
+
+    def get_rows(self, url_ids: List[int]) -> Dict[str, List[Tuple]]:
+        """
+        Get the rows of every table written for url_ids, with each url_id replaced
+        by its index in url_ids and recipe_id left out, so the rows of both paths
+        can be compared.
+
+        :param url_ids: List[int]
+        :return: sorted rows by table
+        """
+        placeholders = ", ".join(["%s"] * len(url_ids))
+        indexes = {url_id: index for index, url_id in enumerate(url_ids)}
+        rows = dict()
+        for table, columns in self.FAST_LOAD_COLUMNS.items():
+            if table == "keto_recipe":
+                query = f"""
+                    SELECT {', '.join(columns)} from keto_recipe
+                    where url_id IN ({placeholders})
+                """
+            else:
+                query = f"""
+                    SELECT keto_recipe.url_id, keto_recipe.recipe_name,
+                    {', '.join(f'{table}.{column}' for column in columns)}
+                    from {table} JOIN keto_recipe
+                    ON keto_recipe.recipe_id = {table}.recipe_id
+                    where keto_recipe.url_id IN ({placeholders})
+                """
+            self.cursor.execute(query, url_ids)
+            rows[table] = sorted(
+                tuple(
+                    indexes[value] if column == "url_id" else value
+                    for column, value in data.items()
+                )
+                for data in self.cursor.fetchall()
+            )
+
+        return rows
+
+    def write(self, recipes: int, fast_load: bool) -> Tuple[float, Dict]:
+        try:
+            url_ids = self.add_urls(recipes=recipes)
+            recipe_dict_list = [
+                self.get_recipe_dict(index=index, url_id=url_id)
+                for index, url_id in enumerate(url_ids)
+            ]
+            started_at = time.perf_counter()
+            if fast_load:
+                with tempfile.TemporaryDirectory() as dir_path:
+                    file_paths = self.write_fast_load_files(
+                        recipe_dicts=recipe_dict_list, dir_path=dir_path
+                    )
+                    self.load_fast_load_files(file_paths=file_paths)
+            else:
+                self.insert_recipe_dicts(
+                    recipe_dict_list=recipe_dict_list, website_name=WEBSITE_NAME
+                )
+            write_time = time.perf_counter() - started_at
+            return write_time, self.get_rows(url_ids=url_ids)
+        finally:
+            self.db.rollback()
+
+
+def run(recipes: int) -> bool:
+    check = FastLoadCheck()
+    try:
+        insert_time, insert_rows = check.write(recipes=recipes, fast_load=False)
+        load_time, load_rows = check.write(recipes=recipes, fast_load=True)
+    finally:
+        check.db.close()
+
+    print(f"{'table':<28}{'INSERT':>10}{'LOAD DATA':>12}  contents")
+    matches = True
+    for table in check.FAST_LOAD_COLUMNS:
+        table_matches = insert_rows[table] == load_rows[table]
+        matches = matches and table_matches
+        print(
+            f"{table:<28}{len(insert_rows[table]):>10}{len(load_rows[table]):>12}"
+            f"  {'match' if table_matches else 'DIFFER'}"
+        )
+    print(f"{'time':<28}{insert_time:>9.3f}s{load_time:>11.3f}s")
+    return matches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Check that the LOAD DATA path writes the same rows as the "
+        "INSERT path, on synthetic recipes that are rolled back."
+    )
+    parser.add_argument("--recipes", type=int, default=1000)
+    args = parser.parse_args()
+    sys.exit(0 if run(recipes=args.recipes) else 1)
@@ -0,0 +1,175 @@
+import argparse
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from bs4 import BeautifulSoup, FeatureNotFound
+
+from constants import BaseUrls, WebsiteNames
+from crawlers.aussie_keto_queen import AussieKetoQueenScraper
+from crawlers.charlie_foundation import CharlieFoundationScraper
+from crawlers.family_on_keto import FamilyOnKetoWebScraper
+from crawlers.freefrdi import FreeFrdiScraper
+from crawlers.keto_diet import KetoDietScraper
+from crawlers.keto_people import KetoPeopleScraper
+from crawlers.ketogenic_diet_resource import KetogenicDietResourceScraper
+from crawlers.low_carb_maven import LowCarbMavenScraper
+from crawlers.ruled_me import RuledMeScraper
+from crawlers.soup import ParseRegion, get_html_parser, get_soup
+from crawlers.ten_thousand_recipe import TenThousandRecipeScraper
+from crawlers.the_girl_who_ate_everything import TheGirlWhoAteEverythingWebScraper
+from crawlers.the_kitchn import TheKitchnScraper
+from network.cache import get_response_cache
+from network.rate_limiter import get_host
+
+HTML_PARSERS = ("lxml", "html.parser", "html5lib")
+
+PARSE_REGIONS = {
+    WebsiteNames.AUSSIE_KETO_QUEEN: AussieKetoQueenScraper.PARSE_REGIONS,
+    WebsiteNames.CHARLIE_FOUNDATION: CharlieFoundationScraper.PARSE_REGIONS,
+    WebsiteNames.FAMILY_ON_KETO: FamilyOnKetoWebScraper.PARSE_REGIONS,
+    WebsiteNames.FREE_FRDI: FreeFrdiScraper.PARSE_REGIONS,
+    WebsiteNames.KETO_DIET: KetoDietScraper.PARSE_REGIONS,
+    WebsiteNames.KETO_PEOPLE: KetoPeopleScraper.PARSE_REGIONS,
+    WebsiteNames.KETOGENIC_DIET_RESOURCE: KetogenicDietResourceScraper.PARSE_REGIONS,
+    WebsiteNames.LOW_CARB_MAVEN: LowCarbMavenScraper.PARSE_REGIONS,
+    WebsiteNames.RULED_ME: RuledMeScraper.PARSE_REGIONS,
+    WebsiteNames.TEN_THOUSAND_RECIPE: TenThousandRecipeScraper.PARSE_REGIONS,
+    WebsiteNames.THE_GIRL_WHO_ATE_EVERYTHING: (
+        TheGirlWhoAteEverythingWebScraper.PARSE_REGIONS
+    ),
+    WebsiteNames.THE_KITCHN: TheKitchnScraper.PARSE_REGIONS,
+}
+
+_website_names = {
+    get_host(base_url.value): WebsiteNames[base_url.name] for base_url in BaseUrls
+}
+
+
+def get_cached_pages(pages_per_site: int) -> Dict[WebsiteNames, List[bytes]]:
+    pages = defaultdict(list)
+    for url, content in get_response_cache().iter_contents():
+        website_name = _website_names.get(get_host(url))
+        if website_name is not None and len(pages[website_name]) < pages_per_site:
+            pages[website_name].append(content)
+
+    return pages
+
+
+def get_parse_time(page_list: List[bytes], features: str, repeat: int) -> float:
+    """
+    Get the best time, out of repeat runs, to parse every page in page_list.
+
+    :param page_list: List[bytes]
+    :param features: str
+    :param repeat: int
+    :return: float
+    """
+    timings = list()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for page in page_list:
+            BeautifulSoup(page, features)
+        timings.append(time.perf_counter() - start)
+
+    return min(timings)
+
+
+def get_soup_cost(
+    page_list: List[bytes],
+    website_name: WebsiteNames,
+    parse_regions: Optional[List[ParseRegion]],
+) -> Tuple[float, float]:
+    """
+    Get the time to parse every page in page_list with the backend selected for
+    website_name, and the average memory taken by one of the soups.
+
+    :param page_list: List[bytes]
+    :param website_name: WebsiteNames
+    :param parse_regions: Optional[List[ParseRegion]]
+    :return: (seconds, bytes per soup)
+    """
+    start = time.perf_counter()
+    for page in page_list:
+        get_soup(page, website_name=website_name, parse_regions=parse_regions)
+    parse_time = time.perf_counter() - start
+
+    soup_size = 0
+    for page in page_list:
+        tracemalloc.start()
+        soup = get_soup(page, website_name=website_name, parse_regions=parse_regions)
+        soup_size += tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del soup
+
+    return parse_time, soup_size / len(page_list)
+
+
+def print_backend_table(pages: Dict[WebsiteNames, List[bytes]], repeat: int) -> None:
+    print(
+        f"{'website':<30}{'pages':>6}"
+        + "".join(f"{features:>14}" for features in HTML_PARSERS)
+        + "  selected"
+    )
+    for website_name, page_list in sorted(pages.items(), key=lambda x: x[0].value):
+        row = f"{website_name.value:<30}{len(page_list):>6}"
+        for features in HTML_PARSERS:
+            try:
+                parse_time = get_parse_time(
+                    page_list=page_list, features=features, repeat=repeat
+                )
+                row += f"{parse_time / len(page_list) * 1000:>11.2f} ms"
+            except FeatureNotFound:
+                row += f"{'-':>14}"
+        print(f"{row}  {get_html_parser(website_name=website_name)}")
+
+
+def print_parse_region_table(pages: Dict[WebsiteNames, List[bytes]]) -> None:
+    print(
+        f"{'website':<30}{'full page':>14}{'regions':>14}"
+        f"{'full soup':>14}{'region soup':>14}"
+    )
+    for website_name, page_list in sorted(pages.items(), key=lambda x: x[0].value):
+        parse_regions = PARSE_REGIONS.get(website_name)
+        if not parse_regions:
+            continue
+
+        full_time, full_size = get_soup_cost(
+            page_list=page_list, website_name=website_name, parse_regions=None
+        )
+        region_time, region_size = get_soup_cost(
+            page_list=page_list,
+            website_name=website_name,
+            parse_regions=parse_regions,
+        )
+        print(
+            f"{website_name.value:<30}"
+            f"{full_time / len(page_list) * 1000:>11.2f} ms"
+            f"{region_time / len(page_list) * 1000:>11.2f} ms"
+            f"{full_size / 1024:>11.0f} KB"
+            f"{region_size / 1024:>11.0f} KB"
+        )
+
+
+def run(pages_per_site: int, repeat: int) -> None:
+    pages = get_cached_pages(pages_per_site=pages_per_site)
+    if not pages:
+        print("No cached pages found. Run the crawlers first to fill the cache.")
+        return
+
+    print_backend_table(pages=pages, repeat=repeat)
+    print()
+    print_parse_region_table(pages=pages)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare parse time per page of the BeautifulSoup backends "
+        "on the pages kept in the response cache."
+    )
+    parser.add_argument("--pages-per-site", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    run(pages_per_site=args.pages_per_site, repeat=args.repeat)
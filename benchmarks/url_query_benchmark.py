@@ -0,0 +1,146 @@
+import argparse
+import random
+import time
+from typing import Callable, Dict
+
+from constants import WebsiteNames
+from databases.db import BaseDBConnection, BulkWriter
+from databases.migrations import INDEXES, SchemaMigrationDB
+
+URLS_TABLE = "bench_keto_recipe_urls"
+RECIPES_TABLE = "bench_keto_recipe"
+
+QUERIES = {
+    "new urls (NOT IN)": f"""
+        SELECT url from {URLS_TABLE} where website_name=%s
+        AND url_id not in (select url_id from {RECIPES_TABLE})
+    """,
+    "new urls (anti-join)": f"""
+        SELECT {URLS_TABLE}.url from {URLS_TABLE}
+        LEFT JOIN {RECIPES_TABLE} ON {RECIPES_TABLE}.url_id = {URLS_TABLE}.url_id
+        where {URLS_TABLE}.website_name=%s AND {RECIPES_TABLE}.url_id IS NULL
+    """,
+    "urls": f"SELECT url from {URLS_TABLE} where website_name=%s",
+}
+LOOKUP_QUERY = f"SELECT url_id from {URLS_TABLE} where website_name=%s and url=%s"
+
+
+class UrlQueryBenchmark(BaseDBConnection):
+    def create_tables(self, rows: int, crawled_ratio: float) -> None:
+        self.cursor.execute(
+            f"""
+                CREATE TABLE {URLS_TABLE}(
+                    url_id INT AUTO_INCREMENT PRIMARY KEY, url VARCHAR(255),
+                    post_id VARCHAR(64), website_name VARCHAR(64)
+                )
+            """
+        )
+        self.cursor.execute(
+            f"""
+                CREATE TABLE {RECIPES_TABLE}(
+                    recipe_id INT AUTO_INCREMENT PRIMARY KEY, url_id INT,
+                    recipe_name VARCHAR(255)
+                )
+            """
+        )
+        writer = BulkWriter(cursor=self.cursor)
+        website_names = [website_name.value for website_name in WebsiteNames]
+        writer.insert(
+            table=URLS_TABLE,
+            columns=("url_id", "url", "website_name"),
+            rows=(
+                (
+                    url_id,
+                    self.get_url(url_id),
+                    website_names[url_id % len(website_names)],
+                )
+                for url_id in range(1, rows + 1)
+            ),
+        )
+        writer.insert(
+            table=RECIPES_TABLE,
+            columns=("url_id", "recipe_name"),
+            rows=(
+                (url_id, f"recipe {url_id}")
+                for url_id in range(1, rows + 1)
+                if random.random() < crawled_ratio
+            ),
+        )
+        self.db.commit()
+
+    def drop_tables(self) -> None:
+        self.cursor.execute(f"DROP TABLE IF EXISTS {URLS_TABLE}, {RECIPES_TABLE}")
+
+    @staticmethod
+    def get_url(url_id: int) -> str:
+        return f"https://example.com/recipes/{url_id}/"
+
+    def get_query_times(self, website_name: str, lookups: int) -> Dict[str, float]:
+        def run_query(query: str):
+            self.cursor.execute(query, (website_name,))
+            self.cursor.fetchall()
+
+        query_times = {
+            name: self.get_time(lambda: run_query(query))
+            for name, query in QUERIES.items()
+        }
+
+        self.cursor.execute(
+            f"SELECT url from {URLS_TABLE} where website_name=%s", (website_name,)
+        )
+        urls = [data["url"] for data in self.cursor.fetchall()]
+        sample = random.sample(urls, min(lookups, len(urls)))
+
+        def run_lookups():
+            for url in sample:
+                self.cursor.execute(LOOKUP_QUERY, (website_name, url))
+                self.cursor.fetchone()
+
+        query_times[f"{len(sample)} url lookups"] = self.get_time(run_lookups)
+        return query_times
+
+    @staticmethod
+    def get_time(function: Callable) -> float:
+        started_at = time.perf_counter()
+        function()
+        return time.perf_counter() - started_at
+
+
+def print_query_table(before: Dict[str, float], after: Dict[str, float]) -> None:
+    print(f"{'query':<24}{'no indexes':>14}{'indexes':>14}{'speedup':>10}")
+    for name in before:
+        print(
+            f"{name:<24}{before[name]:>13.3f}s{after[name]:>13.3f}s"
+            f"{before[name] / max(after[name], 1e-9):>9.1f}x"
+        )
+
+
+def run(rows: int, crawled_ratio: float, lookups: int) -> None:
+    benchmark = UrlQueryBenchmark()
+    website_name = WebsiteNames.RULED_ME.value
+    try:
+        benchmark.drop_tables()
+        benchmark.create_tables(rows=rows, crawled_ratio=crawled_ratio)
+        before = benchmark.get_query_times(website_name=website_name, lookups=lookups)
+        SchemaMigrationDB().add_missing_indexes(
+            indexes={
+                URLS_TABLE: INDEXES["keto_recipe_urls"],
+                RECIPES_TABLE: INDEXES["keto_recipe"],
+            }
+        )
+        after = benchmark.get_query_times(website_name=website_name, lookups=lookups)
+        print_query_table(before=before, after=after)
+    finally:
+        benchmark.drop_tables()
+        benchmark.db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Time the URL queries of BaseRecipeDB on a synthetic URL table."
+    )
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--crawled-ratio", type=float, default=0.9)
+    parser.add_argument("--lookups", type=int, default=1000)
+    args = parser.parse_args()
+    run(rows=args.rows, crawled_ratio=args.crawled_ratio, lookups=args.lookups)
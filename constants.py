@@ -1,10 +1,13 @@
 import enum
+import os
 import re
 
-EXCEPTION_URLS = [
-    "https://www.ketogenic-diet-resource.com/low-carb-mixed-drinks.html",
-    "https://freefrdi.com/imketo-coconut-tortilla/",
-]
+EXCEPTION_URLS = frozenset(
+    {
+        "https://www.ketogenic-diet-resource.com/low-carb-mixed-drinks.html",
+        "https://freefrdi.com/imketo-coconut-tortilla/",
+    }
+)
 
 
 class WebsiteNames(enum.Enum):
@@ -106,3 +109,84 @@ EMOJI_PATTERN = re.compile(
 
 NUTRITION_API_PAGE_SIZE = 500
 TOTAL_NUTRITION_COUNT = 3089
+
+FETCH_CONCURRENCY = 100
+FETCH_QUEUE_SIZE = 50
+
+# (requests per second, burst) for each website
+DEFAULT_RATE_LIMIT = (5, 10)
+RATE_LIMITS = {
+    BaseUrls.THE_KITCHN: (0.5, 1),
+    BaseUrls.THE_GIRL_WHO_ATE_EVERYTHING: (1, 2),
+    BaseUrls.THE_BEST_KETO_RECIPE: (2, 5),
+    BaseUrls.FAMILY_ON_KETO: (2, 5),
+}
+
+HTTP_POOL_CONNECTIONS = len(BaseUrls) + 5
+HTTP_POOL_MAXSIZE = 20
+HTTP_KEEPALIVE_TIMEOUT = 30
+
+RESPONSE_CACHE_DIR = ".cache/responses"
+RESPONSE_CACHE_MAX_SIZE = 2 * 1024 ** 3
+# cache writes after which the size of the stored bodies is summed up again
+RESPONSE_CACHE_SIZE_RESYNC_WRITES = 1000
+# threads of the fetch engine running the cache lookups and writes
+RESPONSE_CACHE_IO_WORKERS = 4
+DEFAULT_RESPONSE_CACHE_TTL = 7 * 24 * 3600
+RESPONSE_CACHE_TTLS = {
+    BaseUrls.THE_KITCHN: 30 * 24 * 3600,
+    BaseUrls.RULED_ME: 30 * 24 * 3600,
+}
+# request headers that change the response body and therefore the cache key
+CACHE_KEY_HEADERS = ("accept", "accept-language", "cookie")
+
+# where to look for the sitemaps of a website whose robots.txt doesn't list them
+SITEMAP_PATHS = ("wp-sitemap.xml", "sitemap_index.xml", "sitemap.xml")
+SITEMAP_CHUNK_SIZE = 64 * 1024
+# websites whose recipe urls are discovered from their sitemaps, with the pattern
+# of the child sitemaps listing their posts (WordPress core and Yoast names). Their
+# post urls don't tell recipes apart, so posts that turn out not to be recipes are
+# flagged by save_not_recipe_urls and left out of later crawls of new urls.
+SITEMAPS = {
+    BaseUrls.FREE_FRDI: r"(posts-post-|post-sitemap)\d*\.xml",
+    BaseUrls.LOW_CARB_MAVEN: r"(posts-post-|post-sitemap)\d*\.xml",
+}
+
+# listing pages fetched at a time when their urls follow a /page/N/ pattern
+DISCOVERY_PAGE_BATCH_SIZE = 10
+# the same for incremental walks, which usually stop at the first or second page
+DISCOVERY_INCREMENTAL_PAGE_BATCH_SIZE = 1
+
+# creations fetched per request from the mv-create collection endpoint, at most
+# the 100 per_page WordPress allows
+MV_CREATE_BATCH_SIZE = 50
+
+CRAWL_CHECKPOINT_PATH = ".cache/checkpoints.sqlite3"
+
+PARSE_WORKERS = os.cpu_count() or 1
+
+DEFAULT_HTML_PARSER = "lxml"
+# websites whose markup lxml doesn't parse the way their scrapers expect
+HTML_PARSERS = {
+    WebsiteNames.KETOGENIC_DIET_RESOURCE: "html.parser",
+}
+
+# size of one multi-row INSERT statement, well under MySQL's max_allowed_packet
+BULK_INSERT_BATCH_BYTES = 1024 ** 2
+
+# rows read at a time by the streaming url and id queries
+DB_STREAM_CHUNK_SIZE = 1000
+
+DB_POOL_MAX_SIZE = 8
+# seconds to wait for a free pooled connection before giving up
+DB_POOL_TIMEOUT = 60
+# idle seconds after which a pooled connection is pinged before being reused
+DB_POOL_PING_AFTER = 30
+
+# recipes committed at a time by the write-behind writer, and recipes it buffers
+DB_WRITER_CHUNK_SIZE = 100
+DB_WRITER_QUEUE_SIZE = 1000
+# seconds after which the write-behind writer commits a partial chunk
+DB_WRITER_FLUSH_INTERVAL = 5
+# seconds a crawl waits on a full writer queue before checking the writer is alive
+DB_WRITER_PUT_TIMEOUT = 1
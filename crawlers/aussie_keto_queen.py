@@ -1,14 +1,15 @@
 import logging
 import re
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List
 from urllib.parse import urljoin
 
-import requests
 from bs4 import BeautifulSoup
 
 from constants import BaseUrls, WebsiteNames
-from databases.db import BaseRecipeDB
-from utils import get_response_content_list
+from crawlers.pipeline import iter_parsed_recipe_dicts
+from crawlers.soup import get_soup
+from databases.db import BaseRecipeDB, UrlIdResolver
+from network.session import get_session
 
 logging.root.setLevel(logging.INFO)
 
@@ -19,8 +20,8 @@ class AussieKetoQueenBaseScraper(BaseRecipeDB):
         index_url = urljoin(
             BaseUrls.AUSSIE_KETO_QUEEN.value, "recipes/keto-recipes-index"
         )
-        response = requests.get(index_url)
-        soup = BeautifulSoup(response.content, "html.parser")
+        response = get_session().get(index_url)
+        soup = get_soup(response.content, website_name=WebsiteNames.AUSSIE_KETO_QUEEN)
         return list(set([link["href"] for link in soup.select("ul#ri-ul > li > a")]))
 
     def run(self):
@@ -36,8 +37,17 @@ class AussieKetoQueenBaseScraper(BaseRecipeDB):
 
 
 class AussieKetoQueenScraper:
-    def __init__(self, url_list: List[str]):
+    PARSE_REGIONS = [
+        ("h1", {"class": "article-heading"}),
+        ("img", {"class": "article-featured-img"}),
+        ("div", {"class": "wprm-recipe-container"}),
+    ]
+
+    def __init__(self, url_list: Iterable[str]):
         self.url_list = url_list
+        self.url_id_resolver = UrlIdResolver(
+            website_name=WebsiteNames.AUSSIE_KETO_QUEEN.value
+        )
 
     def get_keto_recipe_info(self, soup: BeautifulSoup, url: str) -> Dict:
         recipe_name = soup.select_one("h1.article-heading")
@@ -54,9 +64,7 @@ class AussieKetoQueenScraper:
         yield_num = soup.select_one("span.wprm-recipe-servings")
         recipe_dict = {
             "recipe_name": recipe_name,
-            "url_id": BaseRecipeDB().get_url_id_by_url_and_website_name(
-                url=url, website_name=WebsiteNames.AUSSIE_KETO_QUEEN.value
-            ),
+            "url_id": self.url_id_resolver.get_url_id_by_url(url=url),
             "yield": yield_num.text if yield_num is not None else None,
             "yield_unit": None,
             "image_url": soup.select_one("img.article-featured-img").get("src"),
@@ -148,35 +156,38 @@ class AussieKetoQueenScraper:
         }
         return recipe_info
 
-    def run(self) -> List[Dict]:
-        total_recipe_info_list = list()
-        response_content_list = get_response_content_list(url_list=self.url_list)
-        for item in response_content_list:
-            try:
-                soup = BeautifulSoup(item["response_content"], "html.parser")
-                recipe_info = self.get_recipe_dict_from_soup(soup=soup, url=item["url"])
-                total_recipe_info_list.append(recipe_info)
-                logging.info(f"Aussie Keto Queen: Successfully scraped: {item['url']}")
-            except Exception as e:
-                logging.error(e)
-                pass
+    def get_recipe_dict_from_content(self, url: str, response_content: bytes) -> Dict:
+        soup = get_soup(
+            response_content,
+            website_name=WebsiteNames.AUSSIE_KETO_QUEEN,
+            parse_regions=self.PARSE_REGIONS,
+        )
+        recipe_info = self.get_recipe_dict_from_soup(soup=soup, url=url)
+        logging.info(f"Aussie Keto Queen: Successfully scraped: {url}")
+        return recipe_info
 
-        return total_recipe_info_list
+    def iter_recipe_dicts(self) -> Iterator[Dict]:
+        return iter_parsed_recipe_dicts(scraper=self, url_list=self.url_list)
 
+    def run(self) -> List[Dict]:
+        return list(self.iter_recipe_dicts())
 
-def get_total_recipe_dict_list() -> List[Dict]:
+
+def iter_total_recipe_dicts() -> Iterator[Dict]:
     base_scraper = AussieKetoQueenBaseScraper()
 
     # Run when url and id list needs to be updated
     # base_scraper.run()
 
-    url_list = base_scraper.get_web_url_list(
+    url_list = base_scraper.iter_web_urls(
         website_name=WebsiteNames.AUSSIE_KETO_QUEEN.value
     )
     web_scraper = AussieKetoQueenScraper(url_list=url_list)
-    web_recipe_dict_list = web_scraper.run()
+    yield from web_scraper.iter_recipe_dicts()
 
-    return web_recipe_dict_list
+
+def get_total_recipe_dict_list() -> List[Dict]:
+    return list(iter_total_recipe_dicts())
 
 
 if __name__ == "__main__":
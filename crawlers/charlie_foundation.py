@@ -1,18 +1,17 @@
 import logging
 import re
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List, Optional
 from urllib.parse import urljoin
 
-import requests
 from bs4 import BeautifulSoup
 
 from constants import BaseUrls, WebsiteNames
-from databases.db import BaseRecipeDB
-from utils import (
-    get_numbers_from_string,
-    get_response_content_list,
-    get_time_in_seconds,
-)
+from crawlers.extraction import ExtractionContext
+from crawlers.pipeline import iter_parsed_recipe_dicts
+from crawlers.soup import get_soup
+from databases.db import BaseRecipeDB, UrlIdResolver
+from network.session import get_session
+from utils import get_numbers_from_string, get_time_in_seconds
 
 logging.root.setLevel(logging.INFO)
 
@@ -21,8 +20,8 @@ class CharlieFoundationBaseScraper(BaseRecipeDB):
     @staticmethod
     def get_category_urls() -> List[str]:
         index_url = urljoin(BaseUrls.CHARLIE_FOUNDATION.value, "recipes")
-        response = requests.get(index_url)
-        soup = BeautifulSoup(response.content, "html.parser")
+        response = get_session().get(index_url)
+        soup = get_soup(response.content, website_name=WebsiteNames.CHARLIE_FOUNDATION)
         links = [
             re.search(r"/(.*?)/(.*?)/", link["on"])[0]
             for link in soup.select("div.mediasplit > div.taplink")
@@ -36,8 +35,8 @@ class CharlieFoundationBaseScraper(BaseRecipeDB):
 
     @staticmethod
     def get_pagination_urls(category_url: str) -> List[str]:
-        response = requests.get(category_url)
-        soup = BeautifulSoup(response.content, "html.parser")
+        response = get_session().get(category_url)
+        soup = get_soup(response.content, website_name=WebsiteNames.CHARLIE_FOUNDATION)
         pagination_num = soup.select("a.page-numbers")
         max_page = (
             max([int(page.text) for page in pagination_num if page.text.strip()])
@@ -50,8 +49,8 @@ class CharlieFoundationBaseScraper(BaseRecipeDB):
 
     @staticmethod
     def get_url_list(pagination_url: str) -> List[str]:
-        response = requests.get(pagination_url)
-        soup = BeautifulSoup(response.content, "html.parser")
+        response = get_session().get(pagination_url)
+        soup = get_soup(response.content, website_name=WebsiteNames.CHARLIE_FOUNDATION)
         links = soup.select("h3.post-title > a")
         return [link["href"] for link in links]
 
@@ -76,17 +75,32 @@ class CharlieFoundationBaseScraper(BaseRecipeDB):
 
 
 class CharlieFoundationScraper:
-    def __init__(self, url_list: List[str]):
+    PARSE_REGIONS = [
+        ("h1", {"class": "entry-title"}),
+        ("div", {"class": "rcimg"}),
+        ("div", {"class": "ning"}),
+        ("div", {"class": "nutel"}),
+        ("div", {"class": "nutey"}),
+        ("div", {"class": "nutepr"}),
+        ("div", {"class": "nutec"}),
+        ("div", {"class": "nutest"}),
+        ("div", {"class": "nuterat"}),
+        ("span", {"class": "ndtxt"}),
+    ]
+
+    def __init__(self, url_list: Iterable[str]):
         self.url_list = url_list
+        self.url_id_resolver = UrlIdResolver(
+            website_name=WebsiteNames.CHARLIE_FOUNDATION.value
+        )
 
     @staticmethod
     def get_recipe_name(soup: BeautifulSoup) -> str:
         return soup.select_one("h1.entry-title").text
 
-    def get_keto_recipe_info(self, soup: BeautifulSoup, url: str) -> Dict:
-        url_id = BaseRecipeDB().get_url_id_by_url_and_website_name(
-            url=url, website_name=WebsiteNames.CHARLIE_FOUNDATION.value
-        )
+    def get_keto_recipe_info(self, context: ExtractionContext, url: str) -> Dict:
+        soup = context.soup
+        url_id = self.url_id_resolver.get_url_id_by_url(url=url)
         yield_values = (
             soup.select_one("div.nutey").text if soup.select("div.nutey") else None
         )
@@ -114,7 +128,7 @@ class CharlieFoundationScraper:
             else 0
         )
         recipe_info = {
-            "recipe_name": self.get_recipe_name(soup=soup),
+            "recipe_name": context.get("recipe_name", self.get_recipe_name),
             "url_id": url_id,
             "yield": yield_val,
             "yield_unit": yield_unit,
@@ -125,28 +139,31 @@ class CharlieFoundationScraper:
         }
         return recipe_info
 
-    def get_keto_recipe_ingredients(self, soup: BeautifulSoup) -> List[Dict]:
+    def get_keto_recipe_ingredients(self, context: ExtractionContext) -> List[Dict]:
+        soup = context.soup
         return [
             {
                 "ingredient_name": ingredient.text.strip(),
                 "unit": None,
                 "amount": None,
-                "recipe_name": self.get_recipe_name(soup=soup),
+                "recipe_name": context.get("recipe_name", self.get_recipe_name),
             }
             for ingredient in soup.select("div.ning")
         ]
 
-    def get_keto_recipe_instructions(self, soup: BeautifulSoup) -> List[Dict]:
+    def get_keto_recipe_instructions(self, context: ExtractionContext) -> List[Dict]:
+        soup = context.soup
         return [
             {
                 "eng_description": description.text.strip(),
                 "order_number": index,
-                "recipe_name": self.get_recipe_name(soup=soup),
+                "recipe_name": context.get("recipe_name", self.get_recipe_name),
             }
             for index, description in enumerate(soup.select("span.ndtxt"))
         ]
 
-    def get_keto_recipe_nutrition(self, soup: BeautifulSoup) -> Dict:
+    def get_keto_recipe_nutrition(self, context: ExtractionContext) -> Dict:
+        soup = context.soup
         nutrition_info = soup.select("div.nutel > div.nutei")
         yield_values = (
             soup.select_one("div.nutey").text if soup.select("div.nutey") else None
@@ -172,7 +189,7 @@ class CharlieFoundationScraper:
                 "energy": nutrition_dict.pop("energy", None),
                 "fat": nutrition_dict.pop("fat", None),
                 "protein": nutrition_dict.pop("protein", None),
-                "recipe_name": self.get_recipe_name(soup=soup),
+                "recipe_name": context.get("recipe_name", self.get_recipe_name),
                 "carbohydrate": nutrition_dict.pop("net carb", None),
                 "total_dietary_fiber": None,
             }
@@ -180,51 +197,55 @@ class CharlieFoundationScraper:
 
         return nutrition_dict
 
-    def run(self) -> List[Dict]:
-        total_recipe_info_list = list()
-        response_content_list = get_response_content_list(url_list=self.url_list)
-        for index, item in enumerate(response_content_list):
-            soup = BeautifulSoup(item["response_content"], "html.parser")
-
-            ingredients_list = self.get_keto_recipe_ingredients(soup=soup)
-            instructions_list = self.get_keto_recipe_instructions(soup=soup)
-
-            if not ingredients_list or not instructions_list:
-                logging.info(f"NOT A RECIPE: {item['url']}")
-                continue
-
-            recipe_dict = {
-                "keto_recipe_info": self.get_keto_recipe_info(
-                    soup=soup, url=item["url"]
-                ),
-                "keto_recipe_ingredients": self.get_keto_recipe_ingredients(soup=soup),
-                "keto_recipe_instructions": self.get_keto_recipe_instructions(
-                    soup=soup
-                ),
-                "keto_recipe_nutrition": self.get_keto_recipe_nutrition(soup=soup),
-            }
-            total_recipe_info_list.append(recipe_dict)
-            logging.info(
-                f"{index+1}/{len(response_content_list)}: Successfully scraped: {item['url']}"
-            )
+    def get_recipe_dict_from_content(
+        self, url: str, response_content: bytes
+    ) -> Optional[Dict]:
+        soup = get_soup(
+            response_content,
+            website_name=WebsiteNames.CHARLIE_FOUNDATION,
+            parse_regions=self.PARSE_REGIONS,
+        )
+        context = ExtractionContext(soup=soup)
 
-        return total_recipe_info_list
+        ingredients_list = self.get_keto_recipe_ingredients(context=context)
+        instructions_list = self.get_keto_recipe_instructions(context=context)
 
+        if not ingredients_list or not instructions_list:
+            logging.info(f"NOT A RECIPE: {url}")
+            return None
 
-def get_total_recipe_dict_list() -> List[Dict]:
+        recipe_dict = {
+            "keto_recipe_info": self.get_keto_recipe_info(context=context, url=url),
+            "keto_recipe_ingredients": ingredients_list,
+            "keto_recipe_instructions": instructions_list,
+            "keto_recipe_nutrition": self.get_keto_recipe_nutrition(context=context),
+        }
+        logging.info(f"Charlie Foundation: Successfully scraped: {url}")
+        return recipe_dict
+
+    def iter_recipe_dicts(self) -> Iterator[Dict]:
+        return iter_parsed_recipe_dicts(scraper=self, url_list=self.url_list)
+
+    def run(self) -> List[Dict]:
+        return list(self.iter_recipe_dicts())
+
+
+def iter_total_recipe_dicts() -> Iterator[Dict]:
     base_scraper = CharlieFoundationBaseScraper()
 
     # Run when url and id list needs to be updated
     # base_scraper.run()
 
-    url_list = base_scraper.get_new_web_url_list(
+    url_list = base_scraper.iter_new_web_urls(
         website_name=WebsiteNames.CHARLIE_FOUNDATION.value
     )
 
     web_scraper = CharlieFoundationScraper(url_list=url_list)
-    web_recipe_dict_list = web_scraper.run()
+    yield from web_scraper.iter_recipe_dicts()
+
 
-    return web_recipe_dict_list
+def get_total_recipe_dict_list() -> List[Dict]:
+    return list(iter_total_recipe_dicts())
 
 
 if __name__ == "__main__":
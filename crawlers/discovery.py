@@ -0,0 +1,146 @@
+import logging
+import re
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from constants import DISCOVERY_INCREMENTAL_PAGE_BATCH_SIZE, DISCOVERY_PAGE_BATCH_SIZE
+from network.fetcher import iter_url_list
+from network.session import get_session
+
+logging.root.setLevel(logging.INFO)
+
+PAGE_NUMBER_PATTERN = re.compile(r"/page/(\d+)/?")
+
+
+def iter_listing_urls(
+    pagination_urls: Iterable[str],
+    get_url_list: Callable[[str], List[str]],
+    known_urls: Set[str] = None,
+) -> Iterator[str]:
+    """
+    Walk the listing pages of a website in order and yield the recipe urls that
+    get_url_list finds on each of them.
+
+    With known_urls the walk is incremental. Listings show the newest recipes
+    first, so it stops after the first page that only links to known urls, and
+    only the urls that aren't known yet are yielded. Without it, every page is
+    walked as a full sweep.
+
+    :param pagination_urls: Iterable[str]
+    :param get_url_list: Callable[[str], List[str]]
+    :param known_urls: Set[str]
+    :return: recipe urls
+    """
+    for pagination_url in pagination_urls:
+        url_list = get_url_list(pagination_url)
+        if known_urls is None:
+            yield from url_list
+            continue
+
+        new_url_list = [url for url in url_list if url not in known_urls]
+        yield from new_url_list
+        if not new_url_list:
+            logging.info(f"No new urls on {pagination_url}, stopping discovery")
+            return
+
+
+def get_page_url_pattern(page_url: str) -> Optional[Tuple[str, str]]:
+    """
+    Split the url of a second listing page around its /page/2/ number, so that
+    the url of any page can be built from it.
+
+    :param page_url: str
+    :return: (prefix, suffix), or None when the url has no page number 2
+    """
+    match = PAGE_NUMBER_PATTERN.search(page_url)
+    if match is None or match.group(1) != "2":
+        return None
+
+    return page_url[: match.start(1)], page_url[match.end(1) :]
+
+
+def iter_paged_listing_urls(
+    first_page_url: str,
+    get_url_list: Callable[[bytes], List[str]],
+    get_next_page_url: Callable[[bytes], Optional[str]],
+    headers: Dict = None,
+    known_urls: Set[str] = None,
+    batch_size: int = None,
+) -> Iterator[str]:
+    """
+    Walk a paginated listing and yield the recipe urls that get_url_list finds
+    in the content of each page, fetching every page once.
+
+    When the link get_next_page_url finds on the first page has a /page/2/
+    number, the url of every page is built from it and the pages are fetched
+    `batch_size` at a time by the fetch engine, until a page links to no
+    recipe, as the pages past the last one do. Otherwise the next page links
+    are followed one page at a time. Either way the walk is a loop, so archives
+    of any depth are walked. With known_urls, the walk stops after the first
+    page without a new url, as in iter_listing_urls, and batch_size defaults to
+    DISCOVERY_INCREMENTAL_PAGE_BATCH_SIZE rather than DISCOVERY_PAGE_BATCH_SIZE,
+    so that pages past that one are not fetched for nothing.
+
+    :param first_page_url: str
+    :param get_url_list: Callable[[bytes], List[str]]
+    :param get_next_page_url: Callable[[bytes], Optional[str]]
+    :param headers: Dict
+    :param known_urls: Set[str]
+    :param batch_size: int
+    :return: recipe urls
+    """
+    if batch_size is None:
+        batch_size = (
+            DISCOVERY_PAGE_BATCH_SIZE
+            if known_urls is None
+            else DISCOVERY_INCREMENTAL_PAGE_BATCH_SIZE
+        )
+
+    def get_new_url_list(page_url: str, url_list: List[str]) -> List[str]:
+        if known_urls is None:
+            return url_list
+        new_url_list = [url for url in url_list if url not in known_urls]
+        if not new_url_list:
+            logging.info(f"No new urls on {page_url}, stopping discovery")
+        return new_url_list
+
+    response_content = get_session().get(first_page_url, headers=headers).content
+    url_list = get_url_list(response_content)
+    new_url_list = get_new_url_list(first_page_url, url_list)
+    yield from new_url_list
+    next_page_url = get_next_page_url(response_content)
+    if not url_list or not new_url_list or next_page_url is None:
+        return
+
+    page_url_pattern = get_page_url_pattern(next_page_url)
+    if page_url_pattern is None:
+        while next_page_url is not None:
+            response_content = get_session().get(next_page_url, headers=headers).content
+            url_list = get_url_list(response_content)
+            new_url_list = get_new_url_list(next_page_url, url_list)
+            yield from new_url_list
+            if not url_list or not new_url_list:
+                return
+            next_page_url = get_next_page_url(response_content)
+        return
+
+    prefix, suffix = page_url_pattern
+    first_page_num = 2
+    while True:
+        page_urls = {
+            f"{prefix}{page_num}{suffix}": page_num
+            for page_num in range(first_page_num, first_page_num + batch_size)
+        }
+        url_lists = {
+            page_urls[item["url"]]: get_url_list(item["response_content"])
+            for item in iter_url_list(url_list=page_urls, headers=headers, cache=False)
+        }
+        for page_url, page_num in page_urls.items():
+            if page_num not in url_lists:
+                logging.error(f"Could not fetch {page_url}, stopping discovery")
+                return
+            url_list = url_lists[page_num]
+            new_url_list = get_new_url_list(page_url, url_list)
+            yield from new_url_list
+            if not url_list or not new_url_list:
+                return
+        first_page_num += batch_size
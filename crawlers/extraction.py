@@ -0,0 +1,30 @@
+from typing import Any, Callable, Dict
+
+from bs4 import BeautifulSoup
+
+
+class ExtractionContext:
+    """
+    Fields extracted from the soup of one page.
+
+    Extractors share the context of a page instead of the bare soup, so that a
+    field which several of them need, such as the recipe name, is looked up with
+    CSS selectors only once per page rather than once per ingredient or step.
+    """
+
+    def __init__(self, soup: BeautifulSoup):
+        self.soup = soup
+        self.fields: Dict[str, Any] = dict()
+
+    def get(self, field: str, extractor: Callable[[BeautifulSoup], Any]) -> Any:
+        """
+        Get field, running extractor on the soup the first time it is asked for.
+
+        :param field: str
+        :param extractor: Callable[[BeautifulSoup], Any]
+        :return: Any
+        """
+        if field not in self.fields:
+            self.fields[field] = extractor(self.soup)
+
+        return self.fields[field]
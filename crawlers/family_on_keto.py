@@ -1,16 +1,18 @@
 import logging
 import re
-from multiprocessing import Pipe, Process
-from multiprocessing.connection import Connection
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List
 from urllib.parse import urljoin
 
-import requests
 from bs4 import BeautifulSoup
 
 from constants import EMOJI_PATTERN, BaseUrls, WebsiteNames
-from crawlers.cralwer import APIScraper, WebScraperWithMP
-from databases.db import BaseRecipeDB
+from crawlers.cralwer import APIScraper
+from crawlers.mv_create import divide_post_urls
+from crawlers.pipeline import iter_parsed_recipe_dicts
+from crawlers.soup import get_soup
+from databases.db import BaseRecipeDB, UrlIdResolver
+from network.fetcher import iter_url_list
+from network.session import get_session
 from utils import get_time_in_seconds
 
 logging.root.setLevel(logging.INFO)
@@ -22,70 +24,27 @@ class FamilyOnKetoBaseScraper(BaseRecipeDB):
         first_page_url = urljoin(
             BaseUrls.FAMILY_ON_KETO.value, "family-on-keto-recipes"
         )
-        response = requests.get(first_page_url)
-        soup = BeautifulSoup(response.content, "html.parser")
+        response = get_session().get(first_page_url)
+        soup = get_soup(response.content, website_name=WebsiteNames.FAMILY_ON_KETO)
 
         return [link["href"] for link in soup.select("div#archives-2 > ul > li > a")]
 
     @staticmethod
-    def get_post_id_list(month_url: str, child_conn: Connection) -> None:
-        response = requests.get(month_url)
-        soup = BeautifulSoup(response.content, "html.parser")
-        post_urls = [link["href"] for link in soup.select("div.post-header > h2 > a")]
-        post_id_list = list()
-        api_url_list = list()
-        for url in post_urls:
-            try:
-                response = requests.get(url)
-                soup = BeautifulSoup(response.content, "html.parser")
-                post_id = re.search(
-                    r"\d+", soup.select_one("section.mv-create-card")["id"]
-                )[0]
-                post_id_list.append(post_id)
-                api_url_list.append(url)
-            except Exception:
-                pass
-
-        child_conn.send(
-            {
-                "api_crawling_id_list": post_id_list,
-                "web_crawling_url_list": [
-                    url for url in post_urls if url not in api_url_list
-                ],
-            }
-        )
-        child_conn.close()
-
-    def divide_crawling_list(self, month_url_list: List[str]) -> Dict:
-        recipe_info = list()
-        processes = list()
-
-        for url in month_url_list:
-            parent_conn, child_conn = Pipe()
-            recipe_info.append(parent_conn)
-            process = Process(
-                target=self.get_post_id_list,
-                args=(url, child_conn),
+    def iter_post_urls(month_url_list: List[str]) -> Iterator[str]:
+        # archives change with every new post, so they bypass the response cache
+        for item in iter_url_list(url_list=month_url_list, cache=False):
+            soup = get_soup(
+                item["response_content"], website_name=WebsiteNames.FAMILY_ON_KETO
+            )
+            yield from (
+                link["href"] for link in soup.select("div.post-header > h2 > a")
             )
-            processes.append(process)
-
-        for process in processes:
-            process.start()
-
-        total_post_id_list = list()
-        total_url_list = list()
-        for recipe_info in recipe_info:
-            recipe_info_dict = recipe_info.recv()
-            total_post_id_list.extend(recipe_info_dict["api_crawling_id_list"])
-            total_url_list.extend(recipe_info_dict["web_crawling_url_list"])
-
-        for process in processes:
-            process.join()
 
-        return {
-            "api_crawling_id_list": total_post_id_list,
-            "web_crawling_url_list": total_url_list,
-        }
+    def divide_crawling_list(self, month_url_list: List[str]) -> Dict:
+        return divide_post_urls(
+            url_list=list(dict.fromkeys(self.iter_post_urls(month_url_list))),
+            website_name=WebsiteNames.FAMILY_ON_KETO,
+        )
 
     def run(self) -> None:
         month_urls = self.get_recipe_month_urls()
@@ -97,7 +56,7 @@ class FamilyOnKetoBaseScraper(BaseRecipeDB):
 
 
 class FamilyOnKetoAPIScraper(APIScraper):
-    def __init__(self, api_crawling_id_list: List[str]):
+    def __init__(self, api_crawling_id_list: Iterable[str]):
         super().__init__(
             base_url=BaseUrls.FAMILY_ON_KETO.value,
             api_id_list=api_crawling_id_list,
@@ -105,10 +64,21 @@ class FamilyOnKetoAPIScraper(APIScraper):
         )
 
 
-class FamilyOnKetoWebScraper(BaseRecipeDB):
-    def __init__(self, web_crawling_url_list: List[str]):
-        super().__init__()
+class FamilyOnKetoWebScraper:
+    PARSE_REGIONS = [
+        ("div", {"class": "post-header"}),
+        ("div", {"class": "recipe-meta"}),
+        ("div", {"class": "post-img"}),
+        ("div", {"class": "recipe-ingredients"}),
+        ("div", {"class": "step-content"}),
+        ("span", {"class": "servings"}),
+    ]
+
+    def __init__(self, web_crawling_url_list: Iterable[str]):
         self.url_list = web_crawling_url_list
+        self.url_id_resolver = UrlIdResolver(
+            website_name=WebsiteNames.FAMILY_ON_KETO.value
+        )
 
     def get_keto_recipe_info(self, soup: BeautifulSoup, url: str) -> Dict:
         recipe_name = EMOJI_PATTERN.sub(
@@ -132,9 +102,7 @@ class FamilyOnKetoWebScraper(BaseRecipeDB):
 
         return {
             "recipe_name": recipe_name,
-            "url_id": self.get_url_id_by_url_and_website_name(
-                url=url, website_name=WebsiteNames.FAMILY_ON_KETO.value
-            ),
+            "url_id": self.url_id_resolver.get_url_id_by_url(url=url),
             "yield": yield_values[0],
             "yield_unit": yield_values[1] if len(yield_values) == 2 else "servings",
             "image_url": soup.select_one("div.post-img > img").get("src"),
@@ -174,54 +142,54 @@ class FamilyOnKetoWebScraper(BaseRecipeDB):
             raise ValueError("keto recipe doesn't exist")
         return instructions
 
-    def run(self) -> List:
-        total_recipe_info_list = list()
-        url_response_list = WebScraperWithMP().get_response_list_with_mp(
-            web_url_list=self.url_list
+    def get_recipe_dict_from_content(self, url: str, response_content: bytes) -> Dict:
+        soup = get_soup(
+            response_content,
+            website_name=WebsiteNames.FAMILY_ON_KETO,
+            parse_regions=self.PARSE_REGIONS,
         )
-        for url, content in url_response_list:
-            try:
-                soup = BeautifulSoup(content, "html.parser")
-                keto_recipe_info = self.get_keto_recipe_info(soup=soup, url=url)
-                recipe_name = keto_recipe_info["recipe_name"]
-                recipe_info = {
-                    "keto_recipe_info": keto_recipe_info,
-                    "keto_recipe_ingredients": self.get_keto_recipe_ingredients(
-                        soup=soup, recipe_name=recipe_name
-                    ),
-                    "keto_recipe_instructions": self.get_keto_recipe_instructions(
-                        soup=soup, recipe_name=recipe_name
-                    ),
-                }
-                total_recipe_info_list.append(recipe_info)
-                logging.info(f"Family on Keto: Successfully scraped {url}")
-            except Exception as e:
-                logging.error(f"{url}: {e}")
-                pass
-
-        return total_recipe_info_list
+        keto_recipe_info = self.get_keto_recipe_info(soup=soup, url=url)
+        recipe_name = keto_recipe_info["recipe_name"]
+        recipe_info = {
+            "keto_recipe_info": keto_recipe_info,
+            "keto_recipe_ingredients": self.get_keto_recipe_ingredients(
+                soup=soup, recipe_name=recipe_name
+            ),
+            "keto_recipe_instructions": self.get_keto_recipe_instructions(
+                soup=soup, recipe_name=recipe_name
+            ),
+        }
+        logging.info(f"Family on Keto: Successfully scraped {url}")
+        return recipe_info
 
+    def iter_recipe_dicts(self) -> Iterator[Dict]:
+        return iter_parsed_recipe_dicts(scraper=self, url_list=self.url_list)
 
-def get_total_recipe_dict_list() -> List[Dict]:
+    def run(self) -> List[Dict]:
+        return list(self.iter_recipe_dicts())
+
+
+def iter_total_recipe_dicts() -> Iterator[Dict]:
     base_scraper = FamilyOnKetoBaseScraper()
 
     # Run when lists need to be updated
     base_scraper.run()
 
-    web_url_list = base_scraper.get_web_url_list(
+    web_url_list = base_scraper.iter_web_urls(
         website_name=WebsiteNames.FAMILY_ON_KETO.value
     )
-    api_id_list = base_scraper.get_api_id_list(
+    api_id_list = base_scraper.iter_api_ids(
         website_name=WebsiteNames.FAMILY_ON_KETO.value
     )
 
     web_scraper = FamilyOnKetoWebScraper(web_crawling_url_list=web_url_list)
     api_scraper = FamilyOnKetoAPIScraper(api_crawling_id_list=api_id_list)
+    yield from web_scraper.iter_recipe_dicts()
+    yield from api_scraper.iter_recipe_dicts()
 
-    api_recipe_dict_list = api_scraper.run_with_mp()
-    web_recipe_dict_list = web_scraper.run()
 
-    return api_recipe_dict_list + web_recipe_dict_list
+def get_total_recipe_dict_list() -> List[Dict]:
+    return list(iter_total_recipe_dicts())
 
 
 if __name__ == "__main__":
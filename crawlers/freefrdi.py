@@ -1,14 +1,19 @@
 import logging
 import random
-from typing import Any, Dict, List
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
 from urllib.parse import urljoin
 
-import requests
 from bs4 import BeautifulSoup
 
 from constants import USER_AGENT_LIST, BaseUrls, WebsiteNames
-from databases.db import BaseRecipeDB
-from utils import get_response_content_list
+from crawlers.discovery import iter_paged_listing_urls
+from crawlers.extraction import ExtractionContext
+from crawlers.pipeline import iter_parsed_recipe_dicts
+from crawlers.soup import get_soup
+from databases.checkpoint import CrawlCheckpoint
+from databases.db import BaseRecipeDB, UrlIdResolver
+from network.sitemap import get_sitemap_url_list
 
 logging.root.setLevel(logging.INFO)
 
@@ -18,35 +23,42 @@ HEADERS = {
 
 
 class FreeFrdiBaseScraper(BaseRecipeDB):
-    def get_pagination_urls(
-        self, soup: BeautifulSoup = None, url_list: List[str] = None
-    ) -> List[str]:
-        if url_list is None:
-            url_list = list()
-            index_url = urljoin(BaseUrls.FREE_FRDI.value, "category/recipe/")
-            response = requests.get(index_url, headers=HEADERS)
-            soup = BeautifulSoup(response.content, "html.parser")
-            url_list.append(index_url)
-
-        if soup.select_one("div.nav-previous > a") is not None:
-            prev_page_url = soup.select_one("div.nav-previous > a")["href"]
-            response = requests.get(prev_page_url, headers=HEADERS)
-            soup = BeautifulSoup(response.content, "html.parser")
-            url_list.append(prev_page_url)
-            return self.get_pagination_urls(soup=soup, url_list=url_list)
-
-        return url_list
-
-    def get_url_list(self, pagination_url: str) -> List[str]:
-        response = requests.get(pagination_url, headers=HEADERS)
-        soup = BeautifulSoup(response.content, "html.parser")
+    @staticmethod
+    def get_url_list(response_content: bytes) -> List[str]:
+        soup = get_soup(response_content, website_name=WebsiteNames.FREE_FRDI)
         return [link["href"] for link in soup.select("h2.entry-title > a")]
 
-    def run(self):
-        url_list = list()
-        pagination_urls = self.get_pagination_urls()
-        for url in pagination_urls:
-            url_list.extend(self.get_url_list(pagination_url=url))
+    @staticmethod
+    def get_prev_page_url(response_content: bytes) -> Optional[str]:
+        soup = get_soup(response_content, website_name=WebsiteNames.FREE_FRDI)
+        prev_page_link = soup.select_one("div.nav-previous > a")
+        return prev_page_link["href"] if prev_page_link is not None else None
+
+    def get_pagination_url_list(self, known_urls: Set[str] = None) -> List[str]:
+        return list(
+            iter_paged_listing_urls(
+                first_page_url=urljoin(BaseUrls.FREE_FRDI.value, "category/recipe/"),
+                get_url_list=self.get_url_list,
+                get_next_page_url=self.get_prev_page_url,
+                headers=HEADERS,
+                known_urls=known_urls,
+            )
+        )
+
+    def run(self, full_sweep: bool = False):
+        checkpoint = CrawlCheckpoint(website_name=WebsiteNames.FREE_FRDI.value)
+        discovered_at = datetime.now(timezone.utc)
+        url_list = get_sitemap_url_list(
+            base_url=BaseUrls.FREE_FRDI,
+            headers=HEADERS,
+            since=None if full_sweep else checkpoint.get_discovered_at(),
+        )
+        if url_list is None:
+            url_list = self.get_pagination_url_list(
+                known_urls=None
+                if full_sweep
+                else self.get_known_url_set(website_name=WebsiteNames.FREE_FRDI.value)
+            )
 
         self.update_db(
             website_name=WebsiteNames.FREE_FRDI.value,
@@ -55,22 +67,29 @@ class FreeFrdiBaseScraper(BaseRecipeDB):
                 "web_crawling_url_list": url_list,
             },
         )
+        checkpoint.mark_discovered(discovered_at=discovered_at)
 
 
 class FreeFrdiScraper:
-    def __init__(self, url_list: List[str]):
+    PARSE_REGIONS = [
+        ("h1", {"class": "entry-title"}),
+        ("div", {"class": "entry-image"}),
+        ("div", {"class": "entry-content"}),
+    ]
+
+    def __init__(self, url_list: Iterable[str]):
         self.url_list = url_list
+        self.url_id_resolver = UrlIdResolver(website_name=WebsiteNames.FREE_FRDI.value)
 
     @staticmethod
     def get_recipe_name(soup: BeautifulSoup) -> str:
         return soup.select_one("h1.entry-title").text.strip()
 
-    def get_keto_recipe_info(self, soup: BeautifulSoup, url: str) -> Dict:
-        url_id = BaseRecipeDB().get_url_id_by_url_and_website_name(
-            url=url, website_name=WebsiteNames.FREE_FRDI.value
-        )
+    def get_keto_recipe_info(self, context: ExtractionContext, url: str) -> Dict:
+        soup = context.soup
+        url_id = self.url_id_resolver.get_url_id_by_url(url=url)
         recipe_info = {
-            "recipe_name": self.get_recipe_name(soup=soup),
+            "recipe_name": context.get("recipe_name", self.get_recipe_name),
             "url_id": url_id,
             "yield": None,
             "yield_unit": None,
@@ -82,7 +101,8 @@ class FreeFrdiScraper:
 
         return recipe_info
 
-    def get_keto_recipe_ingredients(self, soup: BeautifulSoup) -> List[Dict]:
+    def get_keto_recipe_ingredients(self, context: ExtractionContext) -> List[Dict]:
+        soup = context.soup
         ingredient_tags = [
             item
             for item in soup.select("div.entry-content > h2")
@@ -118,7 +138,7 @@ class FreeFrdiScraper:
                         "ingredient_name": splitted_list[i],
                         "unit": None,
                         "amount": splitted_list[i + 1],
-                        "recipe_name": self.get_recipe_name(soup=soup),
+                        "recipe_name": context.get("recipe_name", self.get_recipe_name),
                     }
                 )
         total_ingredient_list.extend(
@@ -127,7 +147,7 @@ class FreeFrdiScraper:
                     "ingredient_name": ingredient.text.strip(),
                     "unit": None,
                     "amount": None,
-                    "recipe_name": self.get_recipe_name(soup=soup),
+                    "recipe_name": context.get("recipe_name", self.get_recipe_name),
                 }
                 for ingredient in [
                     item for sublist in ingredient_list for item in sublist
@@ -137,7 +157,8 @@ class FreeFrdiScraper:
 
         return total_ingredient_list
 
-    def get_keto_recipe_instructions(self, soup: BeautifulSoup) -> List[Dict]:
+    def get_keto_recipe_instructions(self, context: ExtractionContext) -> List[Dict]:
+        soup = context.soup
         try:
             tag = (
                 soup.find(text="만드는 법")
@@ -155,7 +176,7 @@ class FreeFrdiScraper:
                     {
                         "kor_description": description.text.strip(),
                         "order_number": index,
-                        "recipe_name": self.get_recipe_name(soup=soup),
+                        "recipe_name": context.get("recipe_name", self.get_recipe_name),
                     }
                     for index, description in enumerate(
                         tag.find_next("ol").select("li")
@@ -166,7 +187,7 @@ class FreeFrdiScraper:
                     {
                         "kor_description": description.text.strip(),
                         "order_number": index,
-                        "recipe_name": self.get_recipe_name(soup=soup),
+                        "recipe_name": context.get("recipe_name", self.get_recipe_name),
                     }
                     for index, description in enumerate(
                         tag.find_next("ul").select("li")
@@ -177,7 +198,7 @@ class FreeFrdiScraper:
                     {
                         "kor_description": description.text.strip(),
                         "order_number": index,
-                        "recipe_name": self.get_recipe_name(soup=soup),
+                        "recipe_name": context.get("recipe_name", self.get_recipe_name),
                     }
                     for index, description in enumerate(
                         tag.parent.find_next_siblings("p")
@@ -189,7 +210,8 @@ class FreeFrdiScraper:
         except Exception as e:
             logging.error(f"Instruction: {e}")
 
-    def get_keto_recipe_tips(self, soup: BeautifulSoup) -> Any:
+    def get_keto_recipe_tips(self, context: ExtractionContext) -> Any:
+        soup = context.soup
         tip_tag = soup.find(text="TIP")
 
         if tip_tag is None:
@@ -200,7 +222,7 @@ class FreeFrdiScraper:
                 {
                     "tip": description.text.strip(),
                     "order_number": index,
-                    "recipe_name": self.get_recipe_name(soup=soup),
+                    "recipe_name": context.get("recipe_name", self.get_recipe_name),
                 }
                 for index, description in enumerate(
                     tip_tag.find_next("ol").select("li")
@@ -209,58 +231,58 @@ class FreeFrdiScraper:
 
         return None
 
-    def run(self) -> List[Dict]:
-        total_recipe_info_list = list()
-        response_content_list = get_response_content_list(
-            url_list=self.url_list, headers=HEADERS
+    def get_recipe_dict_from_content(
+        self, url: str, response_content: bytes
+    ) -> Optional[Dict]:
+        soup = get_soup(
+            response_content,
+            website_name=WebsiteNames.FREE_FRDI,
+            parse_regions=self.PARSE_REGIONS,
         )
-        error_urls = list()
-        for index, item in enumerate(response_content_list):
-            try:
-                soup = BeautifulSoup(item["response_content"], "html.parser")
-                ingredients_list = self.get_keto_recipe_ingredients(soup=soup)
-                instructions_list = self.get_keto_recipe_instructions(soup=soup)
-                tip_list = self.get_keto_recipe_tips(soup=soup)
-
-                if not ingredients_list or not instructions_list:
-                    logging.info(f" NOT A RECIPE: {item['url']}")
-                    continue
-
-                recipe_dict = {
-                    "keto_recipe_info": self.get_keto_recipe_info(
-                        soup=soup, url=item["url"]
-                    ),
-                    "keto_recipe_ingredients": ingredients_list,
-                    "keto_recipe_instructions": instructions_list,
-                    "keto_recipe_tips": tip_list,
-                }
-                total_recipe_info_list.append(recipe_dict)
-                logging.info(
-                    f"{index+1}/{len(response_content_list)}: Successfully scraped: {item['url']}"
-                )
-            except Exception as e:
-                logging.error(e)
-                error_urls.append(item["url"])
-                continue
+        context = ExtractionContext(soup=soup)
+        ingredients_list = self.get_keto_recipe_ingredients(context=context)
+        instructions_list = self.get_keto_recipe_instructions(context=context)
+        tip_list = self.get_keto_recipe_tips(context=context)
 
-        return total_recipe_info_list
+        if not ingredients_list or not instructions_list:
+            logging.info(f" NOT A RECIPE: {url}")
+            return None
 
+        recipe_dict = {
+            "keto_recipe_info": self.get_keto_recipe_info(context=context, url=url),
+            "keto_recipe_ingredients": ingredients_list,
+            "keto_recipe_instructions": instructions_list,
+            "keto_recipe_tips": tip_list,
+        }
+        logging.info(f"Free Frdi: Successfully scraped: {url}")
+        return recipe_dict
 
-def get_total_recipe_dict_list() -> List[Dict]:
+    def iter_recipe_dicts(self) -> Iterator[Dict]:
+        return iter_parsed_recipe_dicts(
+            scraper=self, url_list=self.url_list, headers=HEADERS
+        )
+
+    def run(self) -> List[Dict]:
+        return list(self.iter_recipe_dicts())
+
+
+def iter_total_recipe_dicts() -> Iterator[Dict]:
     base_scraper = FreeFrdiBaseScraper()
 
     # Run when url and id list needs to be updated
     # base_scraper.run()
 
-    url_list = base_scraper.get_new_web_url_list(
+    url_list = base_scraper.iter_new_web_urls(
         website_name=WebsiteNames.FREE_FRDI.value
     )
     # url_list = ["https://freefrdi.com/imketo-coconut-tortilla/"]
 
     web_scraper = FreeFrdiScraper(url_list=url_list)
-    web_recipe_dict_list = web_scraper.run()
+    yield from web_scraper.iter_recipe_dicts()
+
 
-    return web_recipe_dict_list
+def get_total_recipe_dict_list() -> List[Dict]:
+    return list(iter_total_recipe_dicts())
 
 
 if __name__ == "__main__":
@@ -5,15 +5,19 @@ import re
 from fractions import Fraction
 from multiprocessing import Pipe, Process
 from multiprocessing.connection import Connection
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List, Optional
 from urllib.parse import urljoin
 
-import requests
 from bs4 import BeautifulSoup
 
 from constants import USER_AGENT_LIST, BaseUrls, WebsiteNames
-from databases.db import BaseRecipeDB
-from utils import get_pt_time_in_seconds, get_response_content_list
+from crawlers.discovery import iter_listing_urls
+from crawlers.extraction import ExtractionContext
+from crawlers.pipeline import iter_parsed_recipe_dicts
+from crawlers.soup import get_soup
+from databases.db import BaseRecipeDB, UrlIdResolver
+from network.session import get_session
+from utils import get_pt_time_in_seconds
 
 logging.root.setLevel(logging.INFO)
 
@@ -26,8 +30,8 @@ class KetoDietBaseScraper(BaseRecipeDB):
     @staticmethod
     def get_pagination_urls() -> List[str]:
         index_url = urljoin(BaseUrls.KETO_DIET.value, "Blog/category/Recipes")
-        response = requests.get(index_url, headers=HEADERS)
-        soup = BeautifulSoup(response.content, "html.parser")
+        response = get_session().get(index_url, headers=HEADERS)
+        soup = get_soup(response.content, website_name=WebsiteNames.KETO_DIET)
         max_page = max([int(page.text) for page in soup.select("li.PagerLink > a")])
         return [urljoin(index_url, f"?page={num+1}") for num in range(max_page)]
 
@@ -56,24 +60,38 @@ class KetoDietBaseScraper(BaseRecipeDB):
         return list(set(total_url_list))
 
     @staticmethod
-    def get_url_sublist(pagination_url: str, child_conn: Connection) -> None:
+    def get_page_url_list(pagination_url: str) -> List[str]:
+        response = get_session().get(pagination_url, headers=HEADERS)
+        soup = get_soup(response.content, website_name=WebsiteNames.KETO_DIET)
+        return [
+            urljoin(BaseUrls.KETO_DIET.value, link["href"])
+            for link in soup.select("div.post-title > h2 > a")
+        ]
+
+    def get_url_sublist(self, pagination_url: str, child_conn: Connection) -> None:
         url_list = list()
         try:
-            response = requests.get(pagination_url, headers=HEADERS)
-            soup = BeautifulSoup(response.content, "html.parser")
-            url_list = [
-                urljoin(BaseUrls.KETO_DIET.value, link["href"])
-                for link in soup.select("div.post-title > h2 > a")
-            ]
+            url_list = self.get_page_url_list(pagination_url=pagination_url)
         except Exception as e:
             logging.error(e)
         finally:
             child_conn.send(url_list)
             child_conn.close()
 
-    def run(self):
+    def run(self, full_sweep: bool = False):
         pagination_urls = self.get_pagination_urls()
-        url_list = self.get_url_list(pagination_url_list=pagination_urls)
+        if full_sweep:
+            url_list = self.get_url_list(pagination_url_list=pagination_urls)
+        else:
+            url_list = list(
+                iter_listing_urls(
+                    pagination_urls=pagination_urls,
+                    get_url_list=self.get_page_url_list,
+                    known_urls=self.get_known_url_set(
+                        website_name=WebsiteNames.KETO_DIET.value
+                    ),
+                )
+            )
         self.update_db(
             website_name=WebsiteNames.KETO_DIET.value,
             recipe_info_dict={
@@ -84,8 +102,17 @@ class KetoDietBaseScraper(BaseRecipeDB):
 
 
 class KetoDietScraper:
-    def __init__(self, url_list: List[str]):
+    PARSE_REGIONS = [
+        (None, {"itemprop": True}),
+        ("h2", {"id": "ingredients"}),
+        ("h3", {"id": "ingredients"}),
+        ("a", {"class": "kdPopupButton"}),
+        ("span", {"class": "kd-data-item"}),
+    ]
+
+    def __init__(self, url_list: Iterable[str]):
         self.url_list = url_list
+        self.url_id_resolver = UrlIdResolver(website_name=WebsiteNames.KETO_DIET.value)
 
     @staticmethod
     def get_recipe_name(soup: BeautifulSoup) -> str:
@@ -97,10 +124,9 @@ class KetoDietScraper:
 
         return recipe_name
 
-    def get_keto_recipe_info(self, soup: BeautifulSoup, url: str) -> Dict:
-        url_id = BaseRecipeDB().get_url_id_by_url_and_website_name(
-            url=url, website_name=WebsiteNames.KETO_DIET.value
-        )
+    def get_keto_recipe_info(self, context: ExtractionContext, url: str) -> Dict:
+        soup = context.soup
+        url_id = self.url_id_resolver.get_url_id_by_url(url=url)
         prep_time = (
             get_pt_time_in_seconds(
                 soup.select_one("time[itemprop='prepTime']").get("datetime")
@@ -132,7 +158,7 @@ class KetoDietScraper:
             else None
         )
         recipe_info = {
-            "recipe_name": self.get_recipe_name(soup=soup),
+            "recipe_name": context.get("recipe_name", self.get_recipe_name),
             "url_id": url_id,
             "yield": yield_num,
             "yield_unit": re.search(r"(?<=\d\s)[a-zA-Z]+", yield_text)[0]
@@ -145,30 +171,33 @@ class KetoDietScraper:
         }
         return recipe_info
 
-    def get_keto_recipe_ingredients(self, soup: BeautifulSoup) -> List[Dict]:
+    def get_keto_recipe_ingredients(self, context: ExtractionContext) -> List[Dict]:
+        soup = context.soup
         return [
             {
                 "ingredient_name": ingredient.text,
                 "unit": None,
                 "amount": None,
-                "recipe_name": self.get_recipe_name(soup=soup),
+                "recipe_name": context.get("recipe_name", self.get_recipe_name),
             }
             for ingredient in soup.select("li[itemprop='recipeIngredient']")
         ]
 
-    def get_keto_recipe_instructions(self, soup: BeautifulSoup) -> List[Dict]:
+    def get_keto_recipe_instructions(self, context: ExtractionContext) -> List[Dict]:
+        soup = context.soup
         return [
             {
                 "eng_description": description.text.strip(),
                 "order_number": index,
-                "recipe_name": self.get_recipe_name(soup=soup),
+                "recipe_name": context.get("recipe_name", self.get_recipe_name),
             }
             for index, description in enumerate(
                 soup.select("li[itemprop='recipeInstructions']")
             )
         ]
 
-    def get_keto_recipe_nutrition(self, soup: BeautifulSoup) -> Dict:
+    def get_keto_recipe_nutrition(self, context: ExtractionContext) -> Dict:
+        soup = context.soup
         other_nutrition_dict = dict()
         for item in soup.select("span.kd-data-item"):
             other_nutrition_dict[item.select("span")[0].text] = item.select("span")[
@@ -184,55 +213,58 @@ class KetoDietScraper:
             "total_dietary_fiber": soup.select_one(
                 "span[itemprop='fiberContent']"
             ).text,
-            "recipe_name": self.get_recipe_name(soup=soup),
+            "recipe_name": context.get("recipe_name", self.get_recipe_name),
             "etc": json.dumps(other_nutrition_dict, indent=4, ensure_ascii=False),
         }
 
-    def run(self) -> List[Dict]:
-        total_recipe_info_list = list()
+    def get_recipe_dict_from_content(
+        self, url: str, response_content: bytes
+    ) -> Optional[Dict]:
+        soup = get_soup(
+            response_content,
+            website_name=WebsiteNames.KETO_DIET,
+            parse_regions=self.PARSE_REGIONS,
+        )
+        context = ExtractionContext(soup=soup)
+        ingredients_list = self.get_keto_recipe_ingredients(context=context)
+        instructions_list = self.get_keto_recipe_instructions(context=context)
+        if not ingredients_list or not instructions_list:
+            logging.info(f"NOT A RECIPE: {url}")
+            return None
+
+        recipe_dict = {
+            "keto_recipe_info": self.get_keto_recipe_info(context=context, url=url),
+            "keto_recipe_ingredients": ingredients_list,
+            "keto_recipe_instructions": instructions_list,
+            "keto_recipe_nutrition": self.get_keto_recipe_nutrition(context=context),
+        }
+        logging.info(f"Keto Diet: Successfully scraped: {url}")
+        return recipe_dict
 
-        response_content_list = get_response_content_list(
-            url_list=self.url_list, headers=HEADERS
+    def iter_recipe_dicts(self) -> Iterator[Dict]:
+        return iter_parsed_recipe_dicts(
+            scraper=self, url_list=self.url_list, headers=HEADERS
         )
-        non_recipe_urls = list()
-        for index, item in enumerate(response_content_list):
-            soup = BeautifulSoup(item["response_content"], "html.parser")
-            ingredients_list = self.get_keto_recipe_ingredients(soup=soup)
-            instructions_list = self.get_keto_recipe_instructions(soup=soup)
-            if not ingredients_list or not instructions_list:
-                non_recipe_urls.append(item["url"])
-                logging.info(f"#{len(non_recipe_urls)}: NOT A RECIPE: {item['url']}")
-                continue
-
-            recipe_dict = {
-                "keto_recipe_info": self.get_keto_recipe_info(
-                    soup=soup, url=item["url"]
-                ),
-                "keto_recipe_ingredients": ingredients_list,
-                "keto_recipe_instructions": instructions_list,
-                "keto_recipe_nutrition": self.get_keto_recipe_nutrition(soup=soup),
-            }
-            total_recipe_info_list.append(recipe_dict)
-            logging.info(
-                f"{index+1}/{len(response_content_list)}: Successfully scraped: {item['url']}"
-            )
 
-        return total_recipe_info_list
+    def run(self) -> List[Dict]:
+        return list(self.iter_recipe_dicts())
 
 
-def get_total_recipe_dict_list() -> List[Dict]:
+def iter_total_recipe_dicts() -> Iterator[Dict]:
     base_scraper = KetoDietBaseScraper()
 
     # Run when url and id list needs to be updated
     # base_scraper.run()
 
-    url_list = base_scraper.get_new_web_url_list(
+    url_list = base_scraper.iter_new_web_urls(
         website_name=WebsiteNames.KETO_DIET.value
     )
     web_scraper = KetoDietScraper(url_list=url_list)
-    web_recipe_dict_list = web_scraper.run()
+    yield from web_scraper.iter_recipe_dicts()
+
 
-    return web_recipe_dict_list
+def get_total_recipe_dict_list() -> List[Dict]:
+    return list(iter_total_recipe_dicts())
 
 
 if __name__ == "__main__":
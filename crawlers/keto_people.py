@@ -1,14 +1,15 @@
 import logging
 import re
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, Iterator, List
 from urllib.parse import urljoin
 
-import requests
 from bs4 import BeautifulSoup
 
 from constants import BaseUrls, WebsiteNames
-from databases.db import BaseRecipeDB
-from utils import get_response_content_list
+from crawlers.pipeline import iter_parsed_recipe_dicts
+from crawlers.soup import get_soup
+from databases.db import BaseRecipeDB, UrlIdResolver
+from network.session import get_session
 
 logging.root.setLevel(logging.INFO)
 
@@ -19,8 +20,8 @@ class KetoPeopleBaseScraper(BaseRecipeDB):
         index_url = urljoin(
             BaseUrls.KETO_PEOPLE.value, "recipe_guide?category=d4QxEKxg1D"
         )
-        response = requests.get(index_url)
-        soup = BeautifulSoup(response.content, "html.parser")
+        response = get_session().get(index_url)
+        soup = get_soup(response.content, website_name=WebsiteNames.KETO_PEOPLE)
         return [
             urljoin(BaseUrls.KETO_PEOPLE.value, link["href"])
             for link in soup.select("div.card > span > a")
@@ -38,17 +39,22 @@ class KetoPeopleBaseScraper(BaseRecipeDB):
 
 
 class KetoPeopleScraper:
-    def __init__(self, url_list: List[str]):
+    # the ingredients, instructions and tips are found by walking the text of the
+    # whole page, so it is always parsed in full
+    PARSE_REGIONS = None
+
+    def __init__(self, url_list: Iterable[str]):
         self.url_list = url_list
+        self.url_id_resolver = UrlIdResolver(
+            website_name=WebsiteNames.KETO_PEOPLE.value
+        )
 
     @staticmethod
     def get_recipe_name(soup: BeautifulSoup) -> str:
         return soup.select_one("p.view_tit").text.replace("레시피", "").strip()
 
     def get_keto_recipe_info(self, soup: BeautifulSoup, url: str) -> Dict:
-        url_id = BaseRecipeDB().get_url_id_by_url_and_website_name(
-            url=url, website_name=WebsiteNames.KETO_PEOPLE.value
-        )
+        url_id = self.url_id_resolver.get_url_id_by_url(url=url)
         recipe_info = {
             "recipe_name": self.get_recipe_name(soup=soup),
             "url_id": url_id,
@@ -73,7 +79,7 @@ class KetoPeopleScraper:
                 break
             html += str(current_tag)
 
-        soup = BeautifulSoup(html, features="lxml")
+        soup = get_soup(html, website_name=WebsiteNames.KETO_PEOPLE)
         ingredient_list = list()
 
         for ingredients in soup.select("span"):
@@ -100,7 +106,7 @@ class KetoPeopleScraper:
                 break
             html += str(current_tag)
 
-        soup = BeautifulSoup(html, features="lxml")
+        soup = get_soup(html, website_name=WebsiteNames.KETO_PEOPLE)
 
         return [
             {
@@ -122,7 +128,7 @@ class KetoPeopleScraper:
                 break
             html += str(current_tag)
 
-        selected_soup = BeautifulSoup(html, features="lxml")
+        selected_soup = get_soup(html, website_name=WebsiteNames.KETO_PEOPLE)
 
         return (
             [
@@ -138,43 +144,43 @@ class KetoPeopleScraper:
             else None
         )
 
-    def run(self):
-        total_recipe_info_list = list()
-        response_content_list = get_response_content_list(url_list=self.url_list)
-
-        for index, item in enumerate(response_content_list):
-            soup = BeautifulSoup(item["response_content"], "html.parser")
-            recipe_dict = {
-                "keto_recipe_info": self.get_keto_recipe_info(
-                    soup=soup, url=item["url"]
-                ),
-                "keto_recipe_ingredients": self.get_keto_recipe_ingredients(soup=soup),
-                "keto_recipe_instructions": self.get_keto_recipe_instructions(
-                    soup=soup
-                ),
-                "keto_recipe_tips": self.get_keto_recipe_tips(soup=soup),
-            }
-            total_recipe_info_list.append(recipe_dict)
-            logging.info(
-                f"{index + 1}/{len(response_content_list)}: Successfully scraped: {item['url']}"
-            )
+    def get_recipe_dict_from_content(self, url: str, response_content: bytes) -> Dict:
+        soup = get_soup(
+            response_content,
+            website_name=WebsiteNames.KETO_PEOPLE,
+            parse_regions=self.PARSE_REGIONS,
+        )
+        recipe_dict = {
+            "keto_recipe_info": self.get_keto_recipe_info(soup=soup, url=url),
+            "keto_recipe_ingredients": self.get_keto_recipe_ingredients(soup=soup),
+            "keto_recipe_instructions": self.get_keto_recipe_instructions(soup=soup),
+            "keto_recipe_tips": self.get_keto_recipe_tips(soup=soup),
+        }
+        logging.info(f"Keto People: Successfully scraped: {url}")
+        return recipe_dict
 
-        return total_recipe_info_list
+    def iter_recipe_dicts(self) -> Iterator[Dict]:
+        return iter_parsed_recipe_dicts(scraper=self, url_list=self.url_list)
 
+    def run(self):
+        return list(self.iter_recipe_dicts())
 
-def get_total_recipe_dict_list() -> List[Dict]:
+
+def iter_total_recipe_dicts() -> Iterator[Dict]:
     base_scraper = KetoPeopleBaseScraper()
 
     # Run when url and id list needs to be updated
     # base_scraper.run()
 
-    url_list = base_scraper.get_new_web_url_list(
+    url_list = base_scraper.iter_new_web_urls(
         website_name=WebsiteNames.KETO_PEOPLE.value
     )
     web_scraper = KetoPeopleScraper(url_list=url_list)
-    web_recipe_dict_list = web_scraper.run()
+    yield from web_scraper.iter_recipe_dicts()
+
 
-    return web_recipe_dict_list
+def get_total_recipe_dict_list() -> List[Dict]:
+    return list(iter_total_recipe_dicts())
 
 
 if __name__ == "__main__":
@@ -1,15 +1,16 @@
 import logging
 import random
 import re
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List, Optional
 from urllib.parse import urljoin
 
-import requests
 from bs4 import BeautifulSoup
 
 from constants import EXCEPTION_URLS, USER_AGENT_LIST, BaseUrls, WebsiteNames
-from databases.db import BaseRecipeDB
-from utils import get_response_content_list
+from crawlers.pipeline import iter_parsed_recipe_dicts
+from crawlers.soup import get_soup
+from databases.db import BaseRecipeDB, UrlIdResolver
+from network.session import get_session
 
 logging.root.setLevel(logging.INFO)
 
@@ -24,8 +25,10 @@ class KetogenicDietResourceBaseScraper(BaseRecipeDB):
         index_url = urljoin(
             BaseUrls.KETOGENIC_DIET_RESOURCE.value, "/low-carb-recipes.html"
         )
-        response = requests.get(index_url, headers=HEADERS)
-        soup = BeautifulSoup(response.content, "html.parser")
+        response = get_session().get(index_url, headers=HEADERS)
+        soup = get_soup(
+            response.content, website_name=WebsiteNames.KETOGENIC_DIET_RESOURCE
+        )
         return [
             link["href"]
             for link in soup.select("div.Liner > ul > li > a")
@@ -44,8 +47,16 @@ class KetogenicDietResourceBaseScraper(BaseRecipeDB):
 
 
 class KetogenicDietResourceScraper:
-    def __init__(self, url_list: List[str]):
+    PARSE_REGIONS = [
+        ("div", {"id": "ContentColumn"}),
+        ("div", {"class": "ImageBlock"}),
+    ]
+
+    def __init__(self, url_list: Iterable[str]):
         self.url_list = url_list
+        self.url_id_resolver = UrlIdResolver(
+            website_name=WebsiteNames.KETOGENIC_DIET_RESOURCE.value
+        )
 
     def get_recipe_names(self, soup: BeautifulSoup) -> List[str]:
         title_elements = (
@@ -58,9 +69,7 @@ class KetogenicDietResourceScraper:
         return [item.text.strip() for item in title_elements if item.text.strip()]
 
     def get_keto_recipe_info(self, soup: BeautifulSoup, url: str) -> List[Dict]:
-        url_id = BaseRecipeDB().get_url_id_by_url_and_website_name(
-            url=url, website_name=WebsiteNames.KETOGENIC_DIET_RESOURCE.value
-        )
+        url_id = self.url_id_resolver.get_url_id_by_url(url=url)
         recipe_names = self.get_recipe_names(soup=soup)
         total_recipe_dict = [
             {
@@ -133,52 +142,59 @@ class KetogenicDietResourceScraper:
 
         return total_instruction_list
 
-    def run(self) -> List[Dict]:
-        total_recipe_info_list = list()
-
-        response_content_list = get_response_content_list(
-            url_list=self.url_list, headers=HEADERS
+    def get_recipe_dict_from_content(
+        self, url: str, response_content: bytes
+    ) -> Optional[Dict]:
+        # the page is parsed in full once to fix its broken </style> tags, and only
+        # the recipe regions of the fixed markup are parsed again
+        soup = get_soup(
+            response_content, website_name=WebsiteNames.KETOGENIC_DIET_RESOURCE
+        )
+        soup = get_soup(
+            re.sub(r"<\/style(?<!>)\s+", "</style>", str(soup)),
+            website_name=WebsiteNames.KETOGENIC_DIET_RESOURCE,
+            parse_regions=self.PARSE_REGIONS,
+        )
+        ingredients_list = self.get_keto_recipe_ingredients(soup=soup)
+        instructions_list = self.get_keto_recipe_instructions(soup=soup)
+
+        if not ingredients_list or not instructions_list:
+            logging.error(f"NOT A RECIPE: {url}")
+            return None
+
+        recipe_dict = {
+            "keto_recipe_info": self.get_keto_recipe_info(soup=soup, url=url),
+            "keto_recipe_ingredients": ingredients_list,
+            "keto_recipe_instructions": instructions_list,
+        }
+        logging.info(f"Ketogenic Diet Resource: Successfully scraped: {url}")
+        return recipe_dict
+
+    def iter_recipe_dicts(self) -> Iterator[Dict]:
+        return iter_parsed_recipe_dicts(
+            scraper=self, url_list=self.url_list, headers=HEADERS
         )
-        for index, item in enumerate(response_content_list):
-            soup = BeautifulSoup(item["response_content"], "html.parser")
-            soup = BeautifulSoup(
-                re.sub(r"<\/style(?<!>)\s+", "</style>", str(soup)), "html.parser"
-            )
-            ingredients_list = self.get_keto_recipe_ingredients(soup=soup)
-            instructions_list = self.get_keto_recipe_instructions(soup=soup)
-
-            if not ingredients_list or not instructions_list:
-                logging.error(f"NOT A RECIPE: {item['url']}")
-                continue
-
-            recipe_dict = {
-                "keto_recipe_info": self.get_keto_recipe_info(
-                    soup=soup, url=item["url"]
-                ),
-                "keto_recipe_ingredients": ingredients_list,
-                "keto_recipe_instructions": instructions_list,
-            }
-            total_recipe_info_list.append(recipe_dict)
-            logging.info(
-                f"{index+1}/{len(response_content_list)}: Successfully scraped: {item['url']}"
-            )
 
-        return total_recipe_info_list
+    def run(self) -> List[Dict]:
+        return list(self.iter_recipe_dicts())
 
 
-def get_total_recipe_dict_list() -> List[Dict]:
+def iter_total_recipe_dicts() -> Iterator[Dict]:
     base_scraper = KetogenicDietResourceBaseScraper()
 
     # Run when url and id list needs to be updated
     # base_scraper.run()
 
-    url_list = base_scraper.get_web_url_list(
+    url_list = base_scraper.iter_web_urls(
         website_name=WebsiteNames.KETOGENIC_DIET_RESOURCE.value
     )
     # url_list = ["https://www.ketogenic-diet-resource.com/low-carb-appetizers.html"]
-    web_scraper = KetogenicDietResourceScraper(url_list=url_list[:1])
-    web_recipe_dict_list = web_scraper.run()
-    return web_recipe_dict_list
+    web_scraper = KetogenicDietResourceScraper(url_list=url_list)
+    yield from web_scraper.iter_recipe_dicts()
+
+
+def get_total_recipe_dict_list() -> List[Dict]:
+    return list(iter_total_recipe_dicts())
 
 
 if __name__ == "__main__":
@@ -1,21 +1,20 @@
 import json
 import logging
 import re
+from datetime import datetime, timezone
 from multiprocessing import Pipe, Process
 from multiprocessing.connection import Connection
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List, Optional
 from urllib.parse import urljoin
 
-import requests
-from bs4 import BeautifulSoup
-
 from constants import BaseUrls, WebsiteNames
-from databases.db import BaseRecipeDB
-from utils import (
-    get_numbers_from_string,
-    get_response_content_list,
-    get_time_in_seconds,
-)
+from crawlers.pipeline import iter_parsed_recipe_dicts
+from crawlers.soup import get_soup
+from databases.checkpoint import CrawlCheckpoint
+from databases.db import BaseRecipeDB, UrlIdResolver
+from network.session import get_session
+from network.sitemap import get_sitemap_url_list
+from utils import get_numbers_from_string, get_time_in_seconds
 
 logging.root.setLevel(logging.INFO)
 
@@ -26,8 +25,8 @@ class LowCarbMavenBaseScraper(BaseRecipeDB):
         index_url = urljoin(
             BaseUrls.LOW_CARB_MAVEN.value, "low-carb-keto-recipe-index/"
         )
-        response = requests.get(index_url)
-        soup = BeautifulSoup(response.content, "html.parser")
+        response = get_session().get(index_url)
+        soup = get_soup(response.content, website_name=WebsiteNames.LOW_CARB_MAVEN)
 
         return [
             link["href"]
@@ -62,8 +61,8 @@ class LowCarbMavenBaseScraper(BaseRecipeDB):
     def get_url_sublist(category_url: str, child_conn: Connection) -> None:
         url_sublist = list()
         try:
-            response = requests.get(category_url)
-            soup = BeautifulSoup(response.content, "html.parser")
+            response = get_session().get(category_url)
+            soup = get_soup(response.content, website_name=WebsiteNames.LOW_CARB_MAVEN)
             page_url_list = [
                 link["href"] for link in soup.select("div.pagination > ul > li > a")
             ]
@@ -76,8 +75,10 @@ class LowCarbMavenBaseScraper(BaseRecipeDB):
             ]
 
             for pagination_url in pagination_urls:
-                response = requests.get(pagination_url)
-                soup = BeautifulSoup(response.content, "html.parser")
+                response = get_session().get(pagination_url)
+                soup = get_soup(
+                    response.content, website_name=WebsiteNames.LOW_CARB_MAVEN
+                )
                 url_list = [link["href"] for link in soup.select("a.entry-title-link")]
                 url_sublist.extend(url_list)
                 logging.info(f"Found {len(url_sublist)} urls from {category_url}")
@@ -88,9 +89,16 @@ class LowCarbMavenBaseScraper(BaseRecipeDB):
             child_conn.send(url_sublist)
             child_conn.close()
 
-    def run(self):
-        category_url_list = self.get_category_urls()
-        url_list = self.get_url_list(category_url_list=category_url_list)
+    def run(self, full_sweep: bool = False):
+        checkpoint = CrawlCheckpoint(website_name=WebsiteNames.LOW_CARB_MAVEN.value)
+        discovered_at = datetime.now(timezone.utc)
+        url_list = get_sitemap_url_list(
+            base_url=BaseUrls.LOW_CARB_MAVEN,
+            since=None if full_sweep else checkpoint.get_discovered_at(),
+        )
+        if url_list is None:
+            category_url_list = self.get_category_urls()
+            url_list = self.get_url_list(category_url_list=category_url_list)
         self.update_db(
             website_name=WebsiteNames.LOW_CARB_MAVEN.value,
             recipe_info_dict={
@@ -98,17 +106,22 @@ class LowCarbMavenBaseScraper(BaseRecipeDB):
                 "web_crawling_url_list": url_list,
             },
         )
+        checkpoint.mark_discovered(discovered_at=discovered_at)
 
 
 class LowCarbMavenScraper:
-    def __init__(self, url_list: List[str]):
-        self.url_list = url_list
+    PARSE_REGIONS = [
+        ("script", {"class": "yoast-schema-graph"}),
+    ]
 
-    @staticmethod
-    def get_keto_recipe_info(json_obj: Dict, url: str) -> Dict:
-        url_id = BaseRecipeDB().get_url_id_by_url_and_website_name(
-            url=url, website_name=WebsiteNames.LOW_CARB_MAVEN.value
+    def __init__(self, url_list: Iterable[str]):
+        self.url_list = url_list
+        self.url_id_resolver = UrlIdResolver(
+            website_name=WebsiteNames.LOW_CARB_MAVEN.value
         )
+
+    def get_keto_recipe_info(self, json_obj: Dict, url: str) -> Dict:
+        url_id = self.url_id_resolver.get_url_id_by_url(url=url)
         prep_time = get_time_in_seconds(json_obj.get("prepTime"))
         active_time = get_time_in_seconds(json_obj.get("cookTime"))
         yield_val = json_obj.get("recipeYield")
@@ -182,58 +195,67 @@ class LowCarbMavenScraper:
 
             return nutrition
 
-    def run(self) -> List[Dict]:
-        total_recipe_info_list = list()
-        response_content_list = get_response_content_list(url_list=self.url_list)
-        for item in response_content_list:
-            try:
-                soup = BeautifulSoup(item["response_content"], "html.parser")
-                json_obj = json.loads(
-                    soup.select_one(
-                        "script.yoast-schema-graph[type='application/ld+json']"
-                    ).contents[0]
-                )
+    def get_recipe_dict_from_content(
+        self, url: str, response_content: bytes
+    ) -> Optional[Dict]:
+        soup = get_soup(
+            response_content,
+            website_name=WebsiteNames.LOW_CARB_MAVEN,
+            parse_regions=self.PARSE_REGIONS,
+        )
+        json_obj = json.loads(
+            soup.select_one(
+                "script.yoast-schema-graph[type='application/ld+json']"
+            ).contents[0]
+        )
 
-                recipe_dict = next(
-                    item for item in json_obj["@graph"] if item["@type"] == "Recipe"
-                )
-                recipe_info = {
-                    "keto_recipe_info": self.get_keto_recipe_info(
-                        json_obj=recipe_dict, url=item["url"]
-                    ),
-                    "keto_recipe_ingredients": self.get_keto_recipe_ingredients(
-                        json_obj=recipe_dict
-                    ),
-                    "keto_recipe_instructions": self.get_keto_recipe_instructions(
-                        json_obj=recipe_dict
-                    ),
-                    "keto_recipe_nutrition": self.get_keto_recipe_nutrition(
-                        json_obj=recipe_dict
-                    ),
-                }
-                total_recipe_info_list.append(recipe_info)
-                logging.info(f"Low Carb Maven: Successfully scraped: {item['url']}")
-            except Exception as e:
-                logging.error(f"{item['url']}: {e}")
-                pass
-
-        return total_recipe_info_list
+        recipe_dict = next(
+            (item for item in json_obj["@graph"] if item["@type"] == "Recipe"), None
+        )
+        if recipe_dict is None:
+            # posts of the sitemap that aren't recipes
+            logging.info(f"Low Carb Maven: NOT A RECIPE: {url}")
+            return None
+        recipe_info = {
+            "keto_recipe_info": self.get_keto_recipe_info(
+                json_obj=recipe_dict, url=url
+            ),
+            "keto_recipe_ingredients": self.get_keto_recipe_ingredients(
+                json_obj=recipe_dict
+            ),
+            "keto_recipe_instructions": self.get_keto_recipe_instructions(
+                json_obj=recipe_dict
+            ),
+            "keto_recipe_nutrition": self.get_keto_recipe_nutrition(
+                json_obj=recipe_dict
+            ),
+        }
+        logging.info(f"Low Carb Maven: Successfully scraped: {url}")
+        return recipe_info
 
+    def iter_recipe_dicts(self) -> Iterator[Dict]:
+        return iter_parsed_recipe_dicts(scraper=self, url_list=self.url_list)
 
-def get_total_recipe_dict_list() -> List[Dict]:
+    def run(self) -> List[Dict]:
+        return list(self.iter_recipe_dicts())
+
+
+def iter_total_recipe_dicts() -> Iterator[Dict]:
     base_scraper = LowCarbMavenBaseScraper()
 
     # Run when url and id list needs to be updated
     # base_scraper.run()
 
-    url_list = base_scraper.get_new_web_url_list(
+    url_list = base_scraper.iter_new_web_urls(
         website_name=WebsiteNames.LOW_CARB_MAVEN.value
     )
 
     web_scraper = LowCarbMavenScraper(url_list=url_list)
-    web_recipe_dict_list = web_scraper.run()
+    yield from web_scraper.iter_recipe_dicts()
 
-    return web_recipe_dict_list
+
+def get_total_recipe_dict_list() -> List[Dict]:
+    return list(iter_total_recipe_dicts())
 
 
 if __name__ == "__main__":
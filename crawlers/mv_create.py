@@ -0,0 +1,278 @@
+import itertools
+import json
+import logging
+import re
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional
+from urllib.parse import urlencode, urljoin
+
+from constants import MV_CREATE_BATCH_SIZE, WebsiteNames
+from crawlers.soup import get_soup
+from network.fetcher import iter_url_list
+
+logging.root.setLevel(logging.INFO)
+
+MV_CREATE_CARD_REGIONS = [("section", {"class": "mv-create-card"})]
+
+
+class PostPage(NamedTuple):
+    url: str
+    # id of the mv-create card of the post, None when it has none
+    post_id: Optional[str]
+
+
+def get_mv_create_id(
+    response_content: bytes, website_name: WebsiteNames
+) -> Optional[str]:
+    soup = get_soup(
+        response_content,
+        website_name=website_name,
+        parse_regions=MV_CREATE_CARD_REGIONS,
+    )
+    card = soup.select_one("section.mv-create-card")
+    match = re.search(r"\d+", card.get("id", "")) if card is not None else None
+
+    return match[0] if match else None
+
+
+def iter_post_pages(
+    url_list: Iterable[str], website_name: WebsiteNames, headers: Dict = None
+) -> Iterator[PostPage]:
+    """
+    Fetch the post pages of a website with the fetch engine and find the
+    mv-create card of each of them.
+
+    Pages are fetched through the response cache, so the web scraper that later
+    parses the posts without a card reads them from there instead of requesting
+    them again.
+
+    :param url_list: Iterable[str]
+    :param website_name: WebsiteNames
+    :param headers: Dict
+    :return: PostPage, in completion order
+    """
+    for item in iter_url_list(url_list=url_list, headers=headers):
+        try:
+            post_id = get_mv_create_id(
+                item["response_content"], website_name=website_name
+            )
+        except Exception as e:
+            logging.error(f"{item['url']}: {e}")
+            continue
+        if post_id is not None:
+            logging.info(f"{item['url']}: Found {post_id}")
+        yield PostPage(url=item["url"], post_id=post_id)
+
+
+def divide_post_urls(
+    url_list: List[str], website_name: WebsiteNames, headers: Dict = None
+) -> Dict:
+    """
+    Divide the posts of a website into those crawled from the mv-create API,
+    by the id of their card, and those crawled from their web page, fetching
+    every post once.
+
+    :param url_list: List[str]
+    :param website_name: WebsiteNames
+    :param headers: Dict
+    :return: {"api_crawling_id_list": [...], "web_crawling_url_list": [...]}
+    """
+    post_ids = {
+        page.url: page.post_id
+        for page in iter_post_pages(
+            url_list=url_list, website_name=website_name, headers=headers
+        )
+        if page.post_id is not None
+    }
+    logging.info(f"{website_name.value}: total of {len(post_ids)} API urls")
+
+    return {
+        "api_crawling_id_list": list(dict.fromkeys(post_ids.values())),
+        "web_crawling_url_list": [url for url in url_list if url not in post_ids],
+    }
+
+
+def iter_batches(items: Iterable[Any], batch_size: int) -> Iterator[List[Any]]:
+    iterator = iter(items)
+    while True:
+        batch = list(itertools.islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+class MvCreateClient:
+    """
+    Client of the REST API of Mediavine Create recipe cards, the
+    /wp-json/mv-create/v1/creations endpoints of a WordPress website.
+
+    Creations are fetched `batch_size` at a time from the collection endpoint,
+    filtered with include= on their ids. The first batch probes whether the
+    website serves it, and when it doesn't, creations are fetched one by one
+    from their own endpoint instead. Either way requests go through the fetch
+    engine, so they run concurrently under the rate limit of the website.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        headers: Dict = None,
+        batch_size: int = MV_CREATE_BATCH_SIZE,
+    ):
+        self.base_url = base_url
+        self.headers = headers
+        self.batch_size = batch_size
+
+    def get_creation_url(self, post_id: Any) -> str:
+        return urljoin(self.base_url, f"/wp-json/mv-create/v1/creations/{post_id}")
+
+    def get_collection_url(self, post_ids: List[Any]) -> str:
+        query = urlencode(
+            {
+                "include": ",".join(str(post_id) for post_id in post_ids),
+                "per_page": len(post_ids),
+            }
+        )
+        return urljoin(self.base_url, f"/wp-json/mv-create/v1/creations?{query}")
+
+    @staticmethod
+    def get_batch_creations(post_ids: List[Any], item: Dict) -> Optional[List[Dict]]:
+        """
+        Get the creations of a collection response, each with the post_id it was
+        requested with.
+
+        :param post_ids: List[Any]
+        :param item: Dict
+        :return: the creations, or None when the response isn't the collection of
+        post_ids
+        """
+        try:
+            creations = json.loads(item["response_content"])
+        except ValueError:
+            return None
+        if not isinstance(creations, list):
+            return None
+
+        batch_post_ids = {str(post_id): post_id for post_id in post_ids}
+        for creation in creations:
+            post_id = batch_post_ids.get(str(creation.get("id")))
+            if post_id is None:
+                # the endpoint ignored include=
+                return None
+            creation.update({"post_id": post_id})
+
+        return creations
+
+    @staticmethod
+    def get_missing_post_ids(post_ids: List[Any], creations: List[Dict]) -> List[Any]:
+        """
+        Get the post_ids a collection response left out, such as the ids of
+        creations that failed on the server.
+
+        :param post_ids: List[Any]
+        :param creations: creations of get_batch_creations
+        :return: List[Any]
+        """
+        returned_post_ids = {str(creation["post_id"]) for creation in creations}
+        return [
+            post_id for post_id in post_ids if str(post_id) not in returned_post_ids
+        ]
+
+    def iter_single_creations(self, post_ids: Iterable[Any]) -> Iterator[Dict]:
+        api_url_dict = dict()
+
+        def iter_api_urls() -> Iterator[str]:
+            for post_id in post_ids:
+                url = self.get_creation_url(post_id)
+                api_url_dict[url] = post_id
+                yield url
+
+        for item in iter_url_list(url_list=iter_api_urls(), headers=self.headers):
+            post_id = api_url_dict.pop(item["url"])
+            try:
+                recipe_dict = json.loads(item["response_content"])
+                recipe_dict.update({"post_id": post_id})
+            except Exception as e:
+                logging.error(e)
+                continue
+            logging.info(f"Successfully scraped: {post_id}")
+            yield recipe_dict
+
+    def iter_collection_creations(
+        self, batches: Iterable[List[Any]], failed_post_ids: List[Any] = None
+    ) -> Iterator[Dict]:
+        """
+        Fetch the creations of batches through the collection endpoint. The
+        post_ids of the batches that failed, and those a response left out, are
+        fetched one by one at the end, along with failed_post_ids.
+
+        :param batches: Iterable[List[Any]]
+        :param failed_post_ids: List[Any]
+        :return: creations, in completion order
+        """
+        batch_url_dict = dict()
+        failed_post_ids = list(failed_post_ids or list())
+
+        def iter_batch_urls() -> Iterator[str]:
+            for batch in batches:
+                url = self.get_collection_url(batch)
+                batch_url_dict[url] = batch
+                yield url
+
+        for item in iter_url_list(url_list=iter_batch_urls(), headers=self.headers):
+            post_ids = batch_url_dict.pop(item["url"])
+            creations = self.get_batch_creations(post_ids=post_ids, item=item)
+            if creations is None:
+                failed_post_ids.extend(post_ids)
+                continue
+            logging.info(f"Successfully scraped {len(creations)} creations")
+            failed_post_ids.extend(
+                self.get_missing_post_ids(post_ids=post_ids, creations=creations)
+            )
+            yield from creations
+
+        # batches whose request failed, and those the endpoint didn't answer
+        failed_post_ids.extend(
+            post_id for post_ids in batch_url_dict.values() for post_id in post_ids
+        )
+        yield from self.iter_single_creations(failed_post_ids)
+
+    def iter_creations(self, post_ids: Iterable[Any]) -> Iterator[Dict]:
+        """
+        Fetch the creations of post_ids, each with a "post_id" key holding the id
+        it was requested with.
+
+        :param post_ids: Iterable[Any]
+        :return: creations, in completion order
+        """
+        batches = iter_batches(post_ids, self.batch_size)
+        first_batch = next(batches, None)
+        if first_batch is None:
+            return
+
+        items = list(
+            iter_url_list(
+                url_list=[self.get_collection_url(first_batch)], headers=self.headers
+            )
+        )
+        creations = (
+            self.get_batch_creations(post_ids=first_batch, item=items[0])
+            if items
+            else None
+        )
+        if creations is None:
+            logging.info(
+                f"{self.base_url}: no mv-create collection endpoint, "
+                f"fetching creations one by one"
+            )
+            yield from self.iter_single_creations(
+                itertools.chain(first_batch, itertools.chain.from_iterable(batches))
+            )
+            return
+
+        yield from creations
+        yield from self.iter_collection_creations(
+            batches,
+            failed_post_ids=self.get_missing_post_ids(
+                post_ids=first_batch, creations=creations
+            ),
+        )
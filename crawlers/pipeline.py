@@ -0,0 +1,106 @@
+import logging
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterable, Iterator
+
+from constants import PARSE_WORKERS
+from databases.checkpoint import FETCHED, PARSED, SKIPPED, get_crawl_checkpoint
+from network.fetcher import iter_url_list
+
+logging.root.setLevel(logging.INFO)
+
+_worker_scraper = None
+
+
+def init_parse_worker(scraper: Any) -> None:
+    global _worker_scraper
+    _worker_scraper = scraper
+
+
+def parse_response_content(url: str, response_content: bytes) -> Dict:
+    return _worker_scraper.get_recipe_dict_from_content(
+        url=url, response_content=response_content
+    )
+
+
+def get_parsed_results(futures: Dict[Future, str]) -> Iterator[Dict]:
+    checkpoint = get_crawl_checkpoint()
+    for future, url in futures.items():
+        try:
+            recipe_dict = future.result()
+        except Exception as e:
+            logging.error(f"{url}: {e}")
+            continue
+        if checkpoint is not None:
+            checkpoint.mark_page(
+                url=url, state=PARSED if recipe_dict is not None else SKIPPED
+            )
+        if recipe_dict is not None:
+            yield recipe_dict
+
+
+def iter_parsed_recipe_dicts(
+    scraper: Any,
+    url_list: Iterable[str],
+    headers: Dict = None,
+    workers: int = PARSE_WORKERS,
+) -> Iterator[Dict]:
+    """
+    Run the two crawling stages side by side: pages are fetched by the asyncio
+    fetch engine and parsed by a pool of `workers` processes as soon as they arrive.
+
+    The scraper is handed to each worker once when the pool is forked, and its
+    get_recipe_dict_from_content(url, response_content) is called for every page.
+    It returns None for pages that aren't recipes.
+
+    Pages the server answered with 304 whose recipe was already written, as the
+    url_id_resolver of the scraper tells, are not parsed again and are recorded
+    as skipped. Pages are recorded as fetched, then as parsed or skipped, in the
+    checkpoint of the crawl when there is one.
+
+    :param scraper: Any
+    :param url_list: Iterable[str]
+    :param headers: Dict
+    :param workers: int
+    :return: recipe dicts in completion order
+    """
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("fork"),
+        initializer=init_parse_worker,
+        initargs=(scraper,),
+    ) as executor:
+        # Forked pools start every worker on the first submit. Do it before the
+        # fetch engine starts its thread, and before the first recipe is yielded,
+        # which starts the thread of the write-behind writer, so that workers are
+        # forked while the crawl runs no other thread. Crawlers that chain
+        # several scrapers run the ones that use this pool first.
+        executor.submit(os.getpid).result()
+
+        checkpoint = get_crawl_checkpoint()
+        url_id_resolver = getattr(scraper, "url_id_resolver", None)
+        pending = dict()
+        for item in iter_url_list(url_list=url_list, headers=headers):
+            if (
+                item["not_modified"]
+                and url_id_resolver is not None
+                and url_id_resolver.is_written(item["url"])
+            ):
+                if checkpoint is not None:
+                    checkpoint.mark_page(url=item["url"], state=SKIPPED)
+                continue
+            if checkpoint is not None:
+                checkpoint.mark_page(url=item["url"], state=FETCHED)
+            future = executor.submit(
+                parse_response_content, item["url"], item["response_content"]
+            )
+            pending[future] = item["url"]
+            if len(pending) >= workers * 2:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                yield from get_parsed_results(
+                    {future: pending.pop(future) for future in done}
+                )
+
+        wait(pending)
+        yield from get_parsed_results(pending)
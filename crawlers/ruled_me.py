@@ -2,33 +2,41 @@ import logging
 import re
 from multiprocessing import Pipe, Process
 from multiprocessing.connection import Connection
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Optional, Set
 from urllib.parse import urljoin
 
 import pandas
-import requests
 from bs4 import BeautifulSoup
 
 from constants import RULED_ME_NUTRITION_COLUMN_LIST, BaseUrls, WebsiteNames
-from databases.db import BaseRecipeDB
+from crawlers.discovery import iter_listing_urls
+from crawlers.pipeline import iter_parsed_recipe_dicts
+from crawlers.soup import get_soup
+from databases.db import BaseRecipeDB, UrlIdResolver
+from network.session import get_session
 
 logging.root.setLevel(logging.INFO)
 
 
 class RuledMeBaseScraper:
+    def __init__(self, known_urls: Set[str] = None):
+        # urls already in the DB, with which discovery stops at the first page
+        # without new ones, or None to walk every page
+        self.known_urls = known_urls
+
     @staticmethod
     def get_keto_recipe_category_urls() -> List[str]:
         url = urljoin(BaseUrls.RULED_ME.value, "keto-recipes")
-        response = requests.get(url)
-        soup = BeautifulSoup(response.content, "html.parser")
+        response = get_session().get(url)
+        soup = get_soup(response.content, website_name=WebsiteNames.RULED_ME)
         categories = soup.select("ul.main-nav-sub > li > a")
 
         return [link["href"] for link in categories if "keto-recipes" in link["href"]]
 
     @staticmethod
     def get_paginated_urls(url: str) -> List[str]:
-        response = requests.get(url)
-        soup = BeautifulSoup(response.content, "html.parser")
+        response = get_session().get(url)
+        soup = get_soup(response.content, website_name=WebsiteNames.RULED_ME)
         pagination_nums = [
             re.findall(r"\d+", link["href"])
             for link in soup.select("div.navigation > ul > li > a")
@@ -65,19 +73,26 @@ class RuledMeBaseScraper:
 
         return total_url_list
 
+    @staticmethod
+    def get_recipe_urls(paginated_url: str) -> List[str]:
+        response = get_session().get(paginated_url, timeout=10)
+        soup = get_soup(response.content, website_name=WebsiteNames.RULED_ME)
+        recipe_list = soup.select("div.hfeed > div > a")
+        logging.info(
+            f"Ruled Me: found {len(recipe_list)} recipe urls for {paginated_url}"
+        )
+        return [link["href"] for link in recipe_list]
+
     def get_keto_recipe_url(self, category_url: str, child_conn: Connection):
         try:
             url = urljoin(BaseUrls.RULED_ME.value, category_url)
-            paginated_urls = self.get_paginated_urls(url=url)
-            total_url_list = list()
-            for paginated_url in paginated_urls:
-                response = requests.get(paginated_url, timeout=10)
-                soup = BeautifulSoup(response.content, "html.parser")
-                recipe_list = soup.select("div.hfeed > div > a")
-                logging.info(
-                    f"Ruled Me: found {len(recipe_list)} recipe urls for {category_url}"
+            total_url_list = list(
+                iter_listing_urls(
+                    pagination_urls=self.get_paginated_urls(url=url),
+                    get_url_list=self.get_recipe_urls,
+                    known_urls=self.known_urls,
                 )
-                total_url_list.extend([link["href"] for link in recipe_list])
+            )
             child_conn.send(total_url_list)
         except Exception as e:
             logging.error(e)
@@ -86,11 +101,8 @@ class RuledMeBaseScraper:
             child_conn.close()
 
     def update_url_db(self):
-        base_scraper = RuledMeBaseScraper()
-        category_urls = base_scraper.get_keto_recipe_category_urls()
-        total_recipe_urls = base_scraper.update_keto_recipe_urls(
-            category_urls=category_urls
-        )
+        category_urls = self.get_keto_recipe_category_urls()
+        total_recipe_urls = self.update_keto_recipe_urls(category_urls=category_urls)
         BaseRecipeDB().update_db(
             website_name=WebsiteNames.RULED_ME.value,
             recipe_info_dict={
@@ -99,11 +111,30 @@ class RuledMeBaseScraper:
             },
         )
 
-    def run(self):
+    def run(self, full_sweep: bool = False):
+        self.known_urls = (
+            None
+            if full_sweep
+            else BaseRecipeDB().get_known_url_set(
+                website_name=WebsiteNames.RULED_ME.value
+            )
+        )
         self.update_url_db()
 
 
 class RuledMeScraper:
+    PARSE_REGIONS = [
+        ("h1", {}),
+        ("table", {}),
+        ("div", {"class": "entry-content"}),
+        ("li", {"class": "instruction"}),
+        ("p", {"id": "zlrecipe-yield"}),
+        ("div", {"class": "postImage_f"}),
+    ]
+
+    def __init__(self):
+        self.url_id_resolver = UrlIdResolver(website_name=WebsiteNames.RULED_ME.value)
+
     def get_instructions(self, soup: BeautifulSoup) -> List[str]:
         return [
             instruction.getText().strip()
@@ -140,90 +171,60 @@ class RuledMeScraper:
             logging.error(f"Error while getting nutrition: {e}")
             pass
 
-    def parse_url(self, url_sublist: List[str], child_conn: Connection) -> None:
-        try:
-            recipe_dict_list = list()
-            for url in url_sublist:
-                logging.info(f"Ruled Me: parsing {url}")
-                response = requests.get(url)
-                soup = BeautifulSoup(response.content, "html.parser")
-                recipe_name = (
-                    soup.select("h1")[0].getText() if soup.select("h1") else None
-                )
-                image_url = (
-                    soup.select("div.postImage_f > img")[0]["data-lazy-src"]
-                    if soup.select("div.postImage_f > img")
-                    else None
-                )
-                recipe_dict = {
-                    "nutrition": self.get_nutrition_values(soup=soup),
-                    "yield": self.get_yield(soup=soup)[0],
-                    "yield_unit": self.get_yield(soup=soup)[1],
-                    "ingredients": self.get_ingredients(soup=soup),
-                    "instructions": self.get_instructions(soup=soup),
-                    "recipe_name": recipe_name,
-                    "image_url": image_url,
-                    "url_id": BaseRecipeDB().get_url_id_by_url_and_website_name(
-                        url=url, website_name=WebsiteNames.RULED_ME.value
-                    ),
-                }
-                recipe_dict_list.append(recipe_dict)
-            child_conn.send(recipe_dict_list)
-        except Exception as e:
-            logging.error(f"Error while parsing url: {e}")
-            child_conn.send([])
-        finally:
-            child_conn.close()
+    def get_recipe_dict_from_content(
+        self, url: str, response_content: bytes
+    ) -> Optional[Dict]:
+        logging.info(f"Ruled Me: parsing {url}")
+        soup = get_soup(
+            response_content,
+            website_name=WebsiteNames.RULED_ME,
+            parse_regions=self.PARSE_REGIONS,
+        )
+        recipe_name = soup.select("h1")[0].getText() if soup.select("h1") else None
+        if recipe_name is None:
+            return None
+
+        image_url = (
+            soup.select("div.postImage_f > img")[0]["data-lazy-src"]
+            if soup.select("div.postImage_f > img")
+            else None
+        )
+        recipe_yield = self.get_yield(soup=soup)
+        return {
+            "nutrition": self.get_nutrition_values(soup=soup),
+            "yield": recipe_yield[0],
+            "yield_unit": recipe_yield[1],
+            "ingredients": self.get_ingredients(soup=soup),
+            "instructions": self.get_instructions(soup=soup),
+            "recipe_name": recipe_name,
+            "image_url": image_url,
+            "url_id": self.url_id_resolver.get_url_id_by_url(url=url),
+        }
 
     def parse_urls(self, url_list: List[str]) -> List[Dict]:
-        parsed_info_list = list()
-        processes = list()
-
-        for i in range(0, len(url_list), 40):
-            url_sublist = url_list[i : i + 40]
-            parent_conn, child_conn = Pipe()
-            parsed_info_list.append(parent_conn)
-            process = Process(
-                target=self.parse_url,
-                args=(
-                    url_sublist,
-                    child_conn,
-                ),
-            )
-            processes.append(process)
-
-        for process in processes:
-            process.start()
-
-        total_parsed_info = [
-            recipe_dict
-            for parsed_info in parsed_info_list
-            for recipe_dict in parsed_info.recv()
-            if recipe_dict.get("recipe_name") is not None
-        ]
+        return list(iter_parsed_recipe_dicts(scraper=self, url_list=url_list))
 
-        for process in processes:
-            process.join()
-
-        return total_parsed_info
-
-    def run(self) -> List[Dict]:
-        recipe_urls = BaseRecipeDB().get_web_url_list(
+    def iter_recipe_dicts(self) -> Iterator[Dict]:
+        recipe_urls = BaseRecipeDB().iter_web_urls(
             website_name=WebsiteNames.RULED_ME.value
         )
-        recipe_dict_list = self.parse_urls(url_list=recipe_urls)
-        return recipe_dict_list
+        return iter_parsed_recipe_dicts(scraper=self, url_list=recipe_urls)
 
+    def run(self) -> List[Dict]:
+        return list(self.iter_recipe_dicts())
 
-def get_total_recipe_dict_list() -> List[Dict]:
+
+def iter_total_recipe_dicts() -> Iterator[Dict]:
     # Run when lists need to be updated
     # base_scraper = RuledMeBaseScraper()
     # base_scraper.run()
 
     web_scraper = RuledMeScraper()
-    url_recipe_dict_list = web_scraper.run()
+    yield from web_scraper.iter_recipe_dicts()
 
-    return url_recipe_dict_list
+
+def get_total_recipe_dict_list() -> List[Dict]:
+    return list(iter_total_recipe_dicts())
 
 
 if __name__ == "__main__":
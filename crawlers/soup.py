@@ -0,0 +1,81 @@
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+from bs4 import BeautifulSoup
+from bs4.filter import ElementFilter
+
+from constants import DEFAULT_HTML_PARSER, HTML_PARSERS, WebsiteNames
+
+# (tag name, attributes) of a page region, e.g. ("div", {"class": "entry-content"}).
+# A None tag name matches any tag and True matches any value of an attribute.
+ParseRegion = Tuple[Optional[str], Dict[str, Union[str, bool]]]
+
+
+class ParseRegionFilter(ElementFilter):
+    """
+    Filter handed to BeautifulSoup as parse_only so that only the subtrees rooted at
+    a tag matching one of the regions are built. Everything else on the page, such
+    as headers, ads, comments and footers, is dropped while parsing.
+    """
+
+    def __init__(self, regions: Iterable[ParseRegion]):
+        super().__init__()
+        self.regions = list(regions)
+
+    @property
+    def includes_everything(self) -> bool:
+        return False
+
+    @staticmethod
+    def is_attr_matched(attrs: Dict, key: str, value: Union[str, bool]) -> bool:
+        attr_value = attrs.get(key)
+        if attr_value is None:
+            return False
+        if value is True:
+            return True
+        if key == "class":
+            classes = attr_value.split() if isinstance(attr_value, str) else attr_value
+            return value in classes
+
+        return attr_value == value
+
+    def allow_tag_creation(
+        self, nsprefix: Optional[str], name: str, attrs: Optional[Dict]
+    ) -> bool:
+        attrs = attrs or dict()
+        return any(
+            (region_name is None or region_name == name)
+            and all(
+                self.is_attr_matched(attrs=attrs, key=key, value=value)
+                for key, value in region_attrs.items()
+            )
+            for region_name, region_attrs in self.regions
+        )
+
+    def allow_string_creation(self, string: str) -> bool:
+        return False
+
+
+def get_html_parser(website_name: WebsiteNames) -> str:
+    return HTML_PARSERS.get(website_name, DEFAULT_HTML_PARSER)
+
+
+def get_soup(
+    markup: Union[str, bytes],
+    website_name: WebsiteNames,
+    parse_regions: Iterable[ParseRegion] = None,
+) -> BeautifulSoup:
+    """
+    Parse markup with the parser backend chosen for website_name in HTML_PARSERS,
+    lxml by default. When parse_regions is given, only those regions of the page
+    are parsed into the soup.
+
+    :param markup: Union[str, bytes]
+    :param website_name: WebsiteNames
+    :param parse_regions: Iterable[ParseRegion]
+    :return: BeautifulSoup
+    """
+    return BeautifulSoup(
+        markup,
+        get_html_parser(website_name=website_name),
+        parse_only=ParseRegionFilter(regions=parse_regions) if parse_regions else None,
+    )
@@ -1,18 +1,17 @@
 import logging
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List, Optional
 from urllib.parse import urljoin
 
-import requests
 from bs4 import BeautifulSoup
 
 from constants import BaseUrls, WebsiteNames
-from databases.db import BaseRecipeDB
-from utils import (
-    get_letters_from_string,
-    get_numbers_from_string,
-    get_response_content_list,
-    get_time_in_seconds,
-)
+from crawlers.discovery import iter_listing_urls
+from crawlers.extraction import ExtractionContext
+from crawlers.pipeline import iter_parsed_recipe_dicts
+from crawlers.soup import get_soup
+from databases.db import BaseRecipeDB, UrlIdResolver
+from network.session import get_session
+from utils import get_letters_from_string, get_numbers_from_string, get_time_in_seconds
 
 logging.root.setLevel(logging.INFO)
 
@@ -21,8 +20,8 @@ class TenThousandRecipeBaseScraper(BaseRecipeDB):
     @staticmethod
     def get_pagination_urls() -> List[str]:
         index_url = urljoin(BaseUrls.TEN_THOUSAND_RECIPE.value, "recipe/list.html?q=키토")
-        response = requests.get(index_url)
-        soup = BeautifulSoup(response.content, "html.parser")
+        response = get_session().get(index_url)
+        soup = get_soup(response.content, website_name=WebsiteNames.TEN_THOUSAND_RECIPE)
         pagination_elements = [
             int(get_numbers_from_string(item.text)[0])
             for item in soup.select("ul.pagination > li")
@@ -32,25 +31,35 @@ class TenThousandRecipeBaseScraper(BaseRecipeDB):
         return [
             urljoin(
                 BaseUrls.TEN_THOUSAND_RECIPE.value,
-                f"recipe/list.html?q=키토&order=reco&page={index+1}",
+                f"recipe/list.html?q=키토&order=date&page={index+1}",
             )
             for index in range(max_num)
         ]
 
     def get_url_list(self, pagination_url: str) -> List[str]:
-        response = requests.get(pagination_url)
-        soup = BeautifulSoup(response.content, "html.parser")
+        response = get_session().get(pagination_url)
+        soup = get_soup(response.content, website_name=WebsiteNames.TEN_THOUSAND_RECIPE)
 
         return [
             urljoin(BaseUrls.TEN_THOUSAND_RECIPE.value, link["href"])
             for link in soup.select("div.common_sp_thumb > a")
         ]
 
-    def run(self) -> None:
-        url_list = list()
-        pagination_urls = self.get_pagination_urls()
-        for url in pagination_urls:
-            url_list.extend(self.get_url_list(pagination_url=url))
+    def run(self, full_sweep: bool = False) -> None:
+        known_urls = (
+            None
+            if full_sweep
+            else self.get_known_url_set(
+                website_name=WebsiteNames.TEN_THOUSAND_RECIPE.value
+            )
+        )
+        url_list = list(
+            iter_listing_urls(
+                pagination_urls=self.get_pagination_urls(),
+                get_url_list=self.get_url_list,
+                known_urls=known_urls,
+            )
+        )
 
         self.update_db(
             website_name=WebsiteNames.TEN_THOUSAND_RECIPE.value,
@@ -62,17 +71,29 @@ class TenThousandRecipeBaseScraper(BaseRecipeDB):
 
 
 class TenThousandRecipeScraper:
-    def __init__(self, url_list: List[str]):
+    PARSE_REGIONS = [
+        ("div", {"class": "view2_summary"}),
+        ("span", {"class": "view2_summary_info1"}),
+        ("span", {"class": "view2_summary_info2"}),
+        ("img", {"id": "main_thumbs"}),
+        ("div", {"id": "divConfirmedMaterialArea"}),
+        ("div", {"class": "cont_ingre"}),
+        ("div", {"class": "view_step_cont"}),
+    ]
+
+    def __init__(self, url_list: Iterable[str]):
         self.url_list = url_list
+        self.url_id_resolver = UrlIdResolver(
+            website_name=WebsiteNames.TEN_THOUSAND_RECIPE.value
+        )
 
     @staticmethod
     def get_recipe_name(soup: BeautifulSoup) -> str:
         return soup.select_one("div.view2_summary > h3").text.strip()
 
-    def get_keto_recipe_info(self, soup: BeautifulSoup, url: str) -> Dict:
-        url_id = BaseRecipeDB().get_url_id_by_url_and_website_name(
-            url=url, website_name=WebsiteNames.TEN_THOUSAND_RECIPE.value
-        )
+    def get_keto_recipe_info(self, context: ExtractionContext, url: str) -> Dict:
+        soup = context.soup
+        url_id = self.url_id_resolver.get_url_id_by_url(url=url)
         yield_val = (
             soup.select_one("span.view2_summary_info1").text
             if soup.select("span.view2_summary_info1")
@@ -84,7 +105,7 @@ class TenThousandRecipeScraper:
             else None
         )
         recipe_info = {
-            "recipe_name": self.get_recipe_name(soup=soup),
+            "recipe_name": context.get("recipe_name", self.get_recipe_name),
             "url_id": url_id,
             "yield": get_numbers_from_string(yield_val)[0],
             "yield_unit": get_letters_from_string(yield_val)[0],
@@ -96,10 +117,11 @@ class TenThousandRecipeScraper:
 
         return recipe_info
 
-    def get_keto_recipe_ingredients(self, soup: BeautifulSoup) -> List[Dict]:
+    def get_keto_recipe_ingredients(self, context: ExtractionContext) -> List[Dict]:
+        soup = context.soup
         ingredient_list = soup.select("div#divConfirmedMaterialArea > ul > a > li")
         total_ingredient_list = list()
-        recipe_name = self.get_recipe_name(soup=soup)
+        recipe_name = context.get("recipe_name", self.get_recipe_name)
         for ingredient in ingredient_list:
             if ingredient.select_one("span.ingre_unit").text:
                 value = ingredient.select_one("span.ingre_unit").text
@@ -142,57 +164,64 @@ class TenThousandRecipeScraper:
 
         return total_ingredient_list
 
-    def get_keto_recipe_instructions(self, soup: BeautifulSoup) -> List[Dict]:
+    def get_keto_recipe_instructions(self, context: ExtractionContext) -> List[Dict]:
+        soup = context.soup
         return [
             {
                 "kor_description": description.text.strip(),
                 "order_number": index,
-                "recipe_name": self.get_recipe_name(soup=soup),
+                "recipe_name": context.get("recipe_name", self.get_recipe_name),
             }
             for index, description in enumerate(soup.select("div.view_step_cont"))
         ]
 
-    def run(self) -> List[Dict]:
-        total_recipe_info_list = list()
-        response_content_list = get_response_content_list(url_list=self.url_list)
-        for index, item in enumerate(response_content_list):
-            soup = BeautifulSoup(item["response_content"], "html.parser")
-            ingredients_list = self.get_keto_recipe_ingredients(soup=soup)
-            instructions_list = self.get_keto_recipe_instructions(soup=soup)
-
-            if not ingredients_list or not instructions_list:
-                logging.info(f" NOT A RECIPE: {item['url']}")
-                continue
-
-            recipe_dict = {
-                "keto_recipe_info": self.get_keto_recipe_info(
-                    soup=soup, url=item["url"]
-                ),
-                "keto_recipe_ingredients": ingredients_list,
-                "keto_recipe_instructions": instructions_list,
-            }
-            total_recipe_info_list.append(recipe_dict)
-            logging.info(
-                f"{index+1}/{len(response_content_list)}: Successfully scraped: {item['url']}"
-            )
+    def get_recipe_dict_from_content(
+        self, url: str, response_content: bytes
+    ) -> Optional[Dict]:
+        soup = get_soup(
+            response_content,
+            website_name=WebsiteNames.TEN_THOUSAND_RECIPE,
+            parse_regions=self.PARSE_REGIONS,
+        )
+        context = ExtractionContext(soup=soup)
+        ingredients_list = self.get_keto_recipe_ingredients(context=context)
+        instructions_list = self.get_keto_recipe_instructions(context=context)
+
+        if not ingredients_list or not instructions_list:
+            logging.info(f" NOT A RECIPE: {url}")
+            return None
+
+        recipe_dict = {
+            "keto_recipe_info": self.get_keto_recipe_info(context=context, url=url),
+            "keto_recipe_ingredients": ingredients_list,
+            "keto_recipe_instructions": instructions_list,
+        }
+        logging.info(f"10000 Recipe: Successfully scraped: {url}")
+        return recipe_dict
+
+    def iter_recipe_dicts(self) -> Iterator[Dict]:
+        return iter_parsed_recipe_dicts(scraper=self, url_list=self.url_list)
 
-        return total_recipe_info_list
+    def run(self) -> List[Dict]:
+        return list(self.iter_recipe_dicts())
 
 
-def get_total_recipe_dict_list() -> List[Dict]:
+def iter_total_recipe_dicts() -> Iterator[Dict]:
     base_scraper = TenThousandRecipeBaseScraper()
 
     # Run when url and id list needs to be updated
     # base_scraper.run()
 
-    url_list = base_scraper.get_new_web_url_list(
+    url_list = base_scraper.iter_new_web_urls(
         website_name=WebsiteNames.TEN_THOUSAND_RECIPE.value
     )
 
     web_scraper = TenThousandRecipeScraper(url_list=url_list)
-    web_recipe_dict_list = web_scraper.run()
+    yield from web_scraper.iter_recipe_dicts()
 
-    return web_recipe_dict_list
+
+def get_total_recipe_dict_list() -> List[Dict]:
+    return list(iter_total_recipe_dicts())
 
 
 if __name__ == "__main__":
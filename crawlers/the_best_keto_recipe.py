@@ -1,17 +1,15 @@
 import logging
 import re
-import time
 from multiprocessing import Pipe, Process
 from multiprocessing.connection import Connection
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List
 from urllib.parse import urljoin
 
-import requests
-from bs4 import BeautifulSoup
-
 from constants import BaseUrls, WebsiteNames
 from crawlers.cralwer import APIScraper
+from crawlers.soup import get_soup
 from databases.db import BaseRecipeDB
+from network.session import get_session
 
 logging.root.setLevel(logging.INFO)
 
@@ -20,8 +18,8 @@ class TheBestKetoRecipeBaseScraper(BaseRecipeDB):
     @staticmethod
     def get_tag_list() -> List[str]:
         url = urljoin(BaseUrls.THE_BEST_KETO_RECIPE.value, "recipe-index")
-        page = requests.get(url)
-        soup = BeautifulSoup(page.content, "html.parser")
+        page = get_session().get(url)
+        soup = get_soup(page.content, website_name=WebsiteNames.THE_BEST_KETO_RECIPE)
         tag_list = soup.select("div.tagindex > ul > li > a")
         return [tag.text.strip().replace(" ", "-") for tag in tag_list]
 
@@ -54,9 +52,10 @@ class TheBestKetoRecipeBaseScraper(BaseRecipeDB):
         recipe_id_list = list()
         try:
             url = urljoin(BaseUrls.THE_BEST_KETO_RECIPE.value, f"tag/{tag}")
-            page = requests.get(url)
-            time.sleep(1)
-            soup = BeautifulSoup(page.content, "html.parser")
+            page = get_session().get(url)
+            soup = get_soup(
+                page.content, website_name=WebsiteNames.THE_BEST_KETO_RECIPE
+            )
             recipe_urls = [
                 recipe["href"].strip() for recipe in soup.select("a.entry-title-link")
             ]
@@ -65,10 +64,9 @@ class TheBestKetoRecipeBaseScraper(BaseRecipeDB):
             )
             for url in recipe_urls:
                 try:
-                    page = requests.get(url)
-                    time.sleep(1)
-                    soup = BeautifulSoup(
-                        markup=page.content, features="html.parser"
+                    page = get_session().get(url)
+                    soup = get_soup(
+                        page.content, website_name=WebsiteNames.THE_BEST_KETO_RECIPE
                     ).select_one("a.mv-create-jtr")["href"]
                     recipe_id_list.append(re.search(r"\d+", soup)[0])
                     logging.info(f"Found post id from {url}")
@@ -97,7 +95,7 @@ class TheBestKetoRecipeBaseScraper(BaseRecipeDB):
 
 
 class TheBestKetoRecipeScraper(APIScraper):
-    def __init__(self, api_id_list: List[str]):
+    def __init__(self, api_id_list: Iterable[str]):
         super().__init__(
             base_url=BaseUrls.THE_BEST_KETO_RECIPE.value,
             api_id_list=api_id_list,
@@ -105,19 +103,21 @@ class TheBestKetoRecipeScraper(APIScraper):
         )
 
 
-def get_total_recipe_dict_list() -> List[Dict]:
+def iter_total_recipe_dicts() -> Iterator[Dict]:
     base_scraper = TheBestKetoRecipeBaseScraper()
 
     # Run when lists need to be updated
     # base_scraper.run()
 
-    api_id_list = base_scraper.get_api_id_list(
+    api_id_list = base_scraper.iter_api_ids(
         website_name=WebsiteNames.THE_BEST_KETO_RECIPE.value
     )
     api_scraper = TheBestKetoRecipeScraper(api_id_list=api_id_list)
-    api_recipe_dict_list = api_scraper.run_with_mp()
+    yield from api_scraper.iter_recipe_dicts_with_mp()
 
-    return api_recipe_dict_list
+
+def get_total_recipe_dict_list() -> List[Dict]:
+    return list(iter_total_recipe_dicts())
 
 
 if __name__ == "__main__":
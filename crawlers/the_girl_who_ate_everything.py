@@ -1,16 +1,18 @@
 import logging
 import random
 import re
-import time
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List
 from urllib.parse import urljoin
 
-import requests
 from bs4 import BeautifulSoup
 
 from constants import USER_AGENT_LIST, BaseUrls, WebsiteNames
 from crawlers.cralwer import APIScraper
-from databases.db import BaseRecipeDB
+from crawlers.mv_create import divide_post_urls
+from crawlers.pipeline import iter_parsed_recipe_dicts
+from crawlers.soup import get_soup
+from databases.db import BaseRecipeDB, UrlIdResolver
+from network.session import get_session
 
 logging.root.setLevel(logging.INFO)
 
@@ -26,9 +28,10 @@ class TheGirlWhoAteEverythingBaseScraper(BaseRecipeDB):
         first_page_url = urljoin(
             BaseUrls.THE_GIRL_WHO_ATE_EVERYTHING.value, "category/keto-recipes"
         )
-        response = requests.get(first_page_url, headers=HEADERS)
-        time.sleep(1)
-        soup = BeautifulSoup(response.content, "html.parser")
+        response = get_session().get(first_page_url, headers=HEADERS)
+        soup = get_soup(
+            response.content, website_name=WebsiteNames.THE_GIRL_WHO_ATE_EVERYTHING
+        )
         pagination_urls = [link["href"] for link in soup.select("a.page-numbers")]
         pagination_urls.append(first_page_url)
 
@@ -36,44 +39,27 @@ class TheGirlWhoAteEverythingBaseScraper(BaseRecipeDB):
 
     @staticmethod
     def get_post_urls(paginated_url: str) -> List[str]:
-        response = requests.get(paginated_url, headers=HEADERS)
-        soup = BeautifulSoup(response.content, "html.parser")
+        response = get_session().get(paginated_url, headers=HEADERS)
+        soup = get_soup(
+            response.content, website_name=WebsiteNames.THE_GIRL_WHO_ATE_EVERYTHING
+        )
 
         return [link["href"] for link in soup.select("div.archive-post > a")]
 
     @staticmethod
     def divide_crawling_list(url_list: List[str]) -> Dict:
-        recipe_id_list = list()
-        api_url_list = list()
-        for url in url_list:
-            try:
-                response = requests.get(url, headers=HEADERS)
-                time.sleep(1)
-                soup = BeautifulSoup(response.content, "html.parser")
-                recipe_id = re.search(
-                    r"\d+", soup.select_one("section.mv-create-card")["id"]
-                )[0]
-                logging.info(f"{url}: Found {recipe_id}")
-                recipe_id_list.append(recipe_id)
-                api_url_list.append(url)
-            except Exception:
-                pass
-        logging.info(
-            f"The Girl Who Ate Everything: total of {len(recipe_id_list)} API urls"
+        return divide_post_urls(
+            url_list=url_list,
+            website_name=WebsiteNames.THE_GIRL_WHO_ATE_EVERYTHING,
+            headers=HEADERS,
         )
 
-        return {
-            "api_crawling_id_list": recipe_id_list,
-            "web_crawling_url_list": [
-                url for url in url_list if url not in api_url_list
-            ],
-        }
-
     def run(self) -> None:
         pagination_urls = self.get_pagination_urls()
         url_list = list()
         for pagination_url in pagination_urls:
             url_list.extend(self.get_post_urls(pagination_url))
+        url_list = list(dict.fromkeys(url_list))
         recipe_info_dict = self.divide_crawling_list(url_list)
         self.update_db(
             website_name=WebsiteNames.THE_GIRL_WHO_ATE_EVERYTHING.value,
@@ -82,19 +68,27 @@ class TheGirlWhoAteEverythingBaseScraper(BaseRecipeDB):
 
 
 class TheGirlWhoAteEverythingAPIScraper(APIScraper):
-    def __init__(self, api_crawling_id_list: List[str]):
+    def __init__(self, api_crawling_id_list: Iterable[str]):
         super().__init__(
             base_url=BaseUrls.THE_GIRL_WHO_ATE_EVERYTHING.value,
             headers=HEADERS,
-            time_sleep=1,
             api_id_list=api_crawling_id_list,
             website_name=WebsiteNames.THE_GIRL_WHO_ATE_EVERYTHING.value,
         )
 
 
 class TheGirlWhoAteEverythingWebScraper:
-    def __init__(self, web_crawling_url_list: List[str]):
+    PARSE_REGIONS = [
+        ("h1", {"class": "post-title"}),
+        ("img", {"data-pin-title": True}),
+        ("div", {"class": "wprm-recipe-container"}),
+    ]
+
+    def __init__(self, web_crawling_url_list: Iterable[str]):
         self.url_list = web_crawling_url_list
+        self.url_id_resolver = UrlIdResolver(
+            website_name=WebsiteNames.THE_GIRL_WHO_ATE_EVERYTHING.value
+        )
 
     def get_keto_recipe_info(self, soup: BeautifulSoup, url: str) -> Dict:
         try:
@@ -111,9 +105,7 @@ class TheGirlWhoAteEverythingWebScraper:
             )
             return {
                 "recipe_name": recipe_name,
-                "url_id": BaseRecipeDB().get_url_id_by_url_and_website_name(
-                    url=url, website_name=WebsiteNames.THE_GIRL_WHO_ATE_EVERYTHING.value
-                ),
+                "url_id": self.url_id_resolver.get_url_id_by_url(url=url),
                 "yield": soup.select_one("span.wprm-recipe-servings").text,
                 "yield_unit": soup.select_one("span.wprm-recipe-details-unit").text,
                 "image_url": soup.find("img", {"data-pin-title": recipe_name}).get(
@@ -187,48 +179,49 @@ class TheGirlWhoAteEverythingWebScraper:
         }
         return db_nutrition_dict
 
+    def get_recipe_dict_from_content(self, url: str, response_content: bytes) -> Dict:
+        soup = get_soup(
+            response_content,
+            website_name=WebsiteNames.THE_GIRL_WHO_ATE_EVERYTHING,
+            parse_regions=self.PARSE_REGIONS,
+        )
+        keto_recipe_info = self.get_keto_recipe_info(soup=soup, url=url)
+        yield_num = keto_recipe_info["yield"]
+        recipe_name = keto_recipe_info["recipe_name"]
+        recipe_info = {
+            "keto_recipe_info": keto_recipe_info,
+            "keto_recipe_ingredients": self.get_keto_recipe_ingredients(
+                soup=soup, recipe_name=recipe_name
+            ),
+            "keto_recipe_instructions": self.get_keto_recipe_instructions(
+                soup=soup, recipe_name=recipe_name
+            ),
+            "keto_recipe_nutrition": self.get_keto_recipe_nutrition(
+                soup=soup, yield_num=yield_num, recipe_name=recipe_name
+            ),
+        }
+        logging.info(f"The Girl Who Ate Everything: Successfully scraped: {url}")
+        return recipe_info
+
+    def iter_recipe_dicts(self) -> Iterator[Dict]:
+        return iter_parsed_recipe_dicts(
+            scraper=self, url_list=self.url_list, headers=HEADERS
+        )
+
     def run(self) -> List[Dict]:
-        total_recipe_info_list = list()
-        for url in self.url_list:
-            try:
-                response = requests.get(url, headers=HEADERS)
-                soup = BeautifulSoup(response.content, "html.parser")
-                keto_recipe_info = self.get_keto_recipe_info(soup=soup, url=url)
-                yield_num = keto_recipe_info["yield"]
-                recipe_name = keto_recipe_info["recipe_name"]
-                recipe_info = {
-                    "keto_recipe_info": keto_recipe_info,
-                    "keto_recipe_ingredients": self.get_keto_recipe_ingredients(
-                        soup=soup, recipe_name=recipe_name
-                    ),
-                    "keto_recipe_instructions": self.get_keto_recipe_instructions(
-                        soup=soup, recipe_name=recipe_name
-                    ),
-                    "keto_recipe_nutrition": self.get_keto_recipe_nutrition(
-                        soup=soup, yield_num=yield_num, recipe_name=recipe_name
-                    ),
-                }
-                total_recipe_info_list.append(recipe_info)
-                logging.info(
-                    f"The Girl Who Ate Everything: Successfully scraped: {url}"
-                )
-            except Exception as e:
-                logging.error(e)
-                pass
-
-        return total_recipe_info_list
+        return list(self.iter_recipe_dicts())
 
 
-def get_total_recipe_dict_list() -> List[Dict]:
+def iter_total_recipe_dicts() -> Iterator[Dict]:
     base_scraper = TheGirlWhoAteEverythingBaseScraper()
 
     # Run when url and id list needs to be updated
     # base_scraper.run()
 
-    api_crawling_id_list = base_scraper.get_api_id_list(
+    api_crawling_id_list = base_scraper.iter_api_ids(
         website_name=WebsiteNames.THE_GIRL_WHO_ATE_EVERYTHING.value
     )
-    web_crawling_url_list = base_scraper.get_web_url_list(
+    web_crawling_url_list = base_scraper.iter_web_urls(
         website_name=WebsiteNames.THE_GIRL_WHO_ATE_EVERYTHING.value
     )
 
@@ -238,10 +231,12 @@ def get_total_recipe_dict_list() -> List[Dict]:
     web_scraper = TheGirlWhoAteEverythingWebScraper(
         web_crawling_url_list=web_crawling_url_list
     )
-    web_recipe_dict_list = web_scraper.run()
-    api_recipe_dict_list = api_scraper.run()
+    yield from web_scraper.iter_recipe_dicts()
+    yield from api_scraper.iter_recipe_dicts()
 
-    return web_recipe_dict_list + api_recipe_dict_list
+
+def get_total_recipe_dict_list() -> List[Dict]:
+    return list(iter_total_recipe_dicts())
 
 
 if __name__ == "__main__":
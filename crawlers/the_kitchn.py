@@ -1,15 +1,14 @@
 import json
 import logging
 import random
-import time
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List
 from urllib.parse import urljoin
 
-import requests
-from bs4 import BeautifulSoup
-
 from constants import USER_AGENT_LIST, BaseUrls, WebsiteNames
-from databases.db import BaseRecipeDB
+from crawlers.pipeline import iter_parsed_recipe_dicts
+from crawlers.soup import get_soup
+from databases.db import BaseRecipeDB, UrlIdResolver
+from network.session import get_session
 from utils import get_numbers_from_string, get_time_in_seconds
 
 logging.root.setLevel(logging.INFO)
@@ -24,9 +23,8 @@ HEADERS = {
 class TheKitchnBaseScraper(BaseRecipeDB):
     def get_category_urls(self) -> List[str]:
         index_url = urljoin(BaseUrls.THE_KITCHN.value, "/recipes/keto")
-        response = requests.get(index_url, headers=HEADERS)
-        time.sleep(2)
-        soup = BeautifulSoup(response.content, "html.parser")
+        response = get_session().get(index_url, headers=HEADERS)
+        soup = get_soup(response.content, website_name=WebsiteNames.THE_KITCHN)
 
         return [
             urljoin(BaseUrls.THE_KITCHN.value, link["href"])
@@ -34,9 +32,8 @@ class TheKitchnBaseScraper(BaseRecipeDB):
         ]
 
     def get_url_list_from_category_url(self, category_url: str) -> List[str]:
-        response = requests.get(category_url, headers=HEADERS)
-        time.sleep(2)
-        soup = BeautifulSoup(response.content, "html.parser")
+        response = get_session().get(category_url, headers=HEADERS)
+        soup = get_soup(response.content, website_name=WebsiteNames.THE_KITCHN)
         url_list = [
             urljoin(BaseUrls.THE_KITCHN.value, link["href"])
             for link in soup.select("a.Teaser__headline")
@@ -64,13 +61,16 @@ class TheKitchnBaseScraper(BaseRecipeDB):
 
 
 class TheKitchnScraper:
-    def __init__(self, url_list: List[str]):
+    PARSE_REGIONS = [
+        ("script", {"class": "json-ld-recipe"}),
+    ]
+
+    def __init__(self, url_list: Iterable[str]):
         self.url_list = url_list
+        self.url_id_resolver = UrlIdResolver(website_name=WebsiteNames.THE_KITCHN.value)
 
     def get_keto_recipe_info(self, json_obj: Dict, url: str) -> Dict:
-        url_id = BaseRecipeDB().get_url_id_by_url_and_website_name(
-            url=url, website_name=WebsiteNames.THE_KITCHN.value
-        )
+        url_id = self.url_id_resolver.get_url_id_by_url(url=url)
         prep_time = get_time_in_seconds(json_obj.get("prepTime"))
         active_time = get_time_in_seconds(json_obj.get("cookTime"))
         return {
@@ -124,54 +124,52 @@ class TheKitchnScraper:
 
         return nutrition
 
+    def get_recipe_dict_from_content(self, url: str, response_content: bytes) -> Dict:
+        soup = get_soup(
+            response_content,
+            website_name=WebsiteNames.THE_KITCHN,
+            parse_regions=self.PARSE_REGIONS,
+        )
+        json_obj = json.loads(
+            soup.select_one(
+                "script.json-ld-recipe[type='application/ld+json']"
+            ).contents[0]
+        )
+        recipe_info = {
+            "keto_recipe_info": self.get_keto_recipe_info(json_obj=json_obj, url=url),
+            "keto_recipe_ingredients": self.get_keto_recipe_ingredients(
+                json_obj=json_obj
+            ),
+            "keto_recipe_instructions": self.get_keto_recipe_instructions(
+                json_obj=json_obj
+            ),
+            "keto_recipe_nutrition": self.get_keto_recipe_nutrition(json_obj=json_obj),
+        }
+        logging.info(f"The Kitchn: Successfully scraped: {url}")
+        return recipe_info
+
+    def iter_recipe_dicts(self) -> Iterator[Dict]:
+        return iter_parsed_recipe_dicts(
+            scraper=self, url_list=self.url_list, headers=HEADERS
+        )
+
     def run(self) -> List[Dict]:
-        total_recipe_info_list = list()
-        for index, url in enumerate(self.url_list):
-            try:
-                response = requests.get(url, headers=HEADERS)
-                time.sleep(2)
-                soup = BeautifulSoup(response.content, "html.parser")
-                json_obj = json.loads(
-                    soup.select_one(
-                        "script.json-ld-recipe[type='application/ld+json']"
-                    ).contents[0]
-                )
-                recipe_info = {
-                    "keto_recipe_info": self.get_keto_recipe_info(
-                        json_obj=json_obj, url=url
-                    ),
-                    "keto_recipe_ingredients": self.get_keto_recipe_ingredients(
-                        json_obj=json_obj
-                    ),
-                    "keto_recipe_instructions": self.get_keto_recipe_instructions(
-                        json_obj=json_obj
-                    ),
-                    "keto_recipe_nutrition": self.get_keto_recipe_nutrition(
-                        json_obj=json_obj
-                    ),
-                }
-                total_recipe_info_list.append(recipe_info)
-                logging.info(
-                    f"{index}/{len(self.url_list)} The Kitchn: Successfully scraped: {url}"
-                )
-            except Exception as e:
-                logging.error(f"{url}: {e}")
-                pass
-
-        return total_recipe_info_list
+        return list(self.iter_recipe_dicts())
 
 
-def get_total_recipe_dict_list() -> List[Dict]:
+def iter_total_recipe_dicts() -> Iterator[Dict]:
     base_scraper = TheKitchnBaseScraper()
 
     # Run when url and id list needs to be updated
     # base_scraper.run()
 
-    url_list = base_scraper.get_web_url_list(website_name=WebsiteNames.THE_KITCHN.value)
+    url_list = base_scraper.iter_web_urls(website_name=WebsiteNames.THE_KITCHN.value)
     web_scraper = TheKitchnScraper(url_list=url_list)
-    web_recipe_dict_list = web_scraper.run()
+    yield from web_scraper.iter_recipe_dicts()
+
 
-    return web_recipe_dict_list
+def get_total_recipe_dict_list() -> List[Dict]:
+    return list(iter_total_recipe_dicts())
 
 
 if __name__ == "__main__":
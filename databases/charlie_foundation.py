@@ -1,16 +1,19 @@
 import logging
 
 from constants import WebsiteNames
-from crawlers.charlie_foundation import get_total_recipe_dict_list
+from crawlers.charlie_foundation import iter_total_recipe_dicts
+from databases.checkpoint import parse_crawl_args
 from databases.db import BaseRecipeDB
 
 logging.root.setLevel(logging.INFO)
 
 
 if __name__ == "__main__":
-    total_recipe_dict_list = get_total_recipe_dict_list()
+    args = parse_crawl_args()
     db = BaseRecipeDB()
-    db.insert_all_into_db(
-        recipe_dict_list=total_recipe_dict_list,
+    db.write_behind(
+        recipe_dicts=iter_total_recipe_dicts(),
         website_name=WebsiteNames.CHARLIE_FOUNDATION.value,
+        resume=args.resume,
+        backfill=args.backfill,
     )
@@ -0,0 +1,216 @@
+import argparse
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Iterable, Iterator, List, Optional
+
+from constants import CRAWL_CHECKPOINT_PATH
+
+logging.root.setLevel(logging.INFO)
+
+FETCHED = "fetched"
+PARSED = "parsed"
+# not a recipe, or not modified since its recipe was written, so there is
+# nothing to write for the url
+SKIPPED = "skipped"
+
+
+class CrawlCheckpoint:
+    """
+    Crawl state of one website, kept in a local SQLite file so that a run that
+    died partway can be resumed.
+
+    The pages table records the urls that were fetched, parsed or skipped as not
+    being recipes or as unchanged, and the recipes table the url_ids whose recipes were
+    committed to MySQL. A resumed run leaves out the committed and skipped urls,
+    and crawls everything else again. Pages fetched by the run it resumes are
+    served from the response cache.
+
+    The discoveries table records when the urls of the website were last
+    discovered, which is kept when a crawl starts over.
+    """
+
+    def __init__(self, website_name: str, path: str = CRAWL_CHECKPOINT_PATH):
+        self.website_name = website_name
+        self.path = path
+        self.finished_urls = set()
+        self.finished_url_ids = set()
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self.db:
+            self.db.execute(
+                """
+                    CREATE TABLE IF NOT EXISTS pages(
+                        website_name TEXT, url TEXT, state TEXT, updated_at REAL,
+                        PRIMARY KEY (website_name, url)
+                    )
+                """
+            )
+            self.db.execute(
+                """
+                    CREATE TABLE IF NOT EXISTS recipes(
+                        website_name TEXT, url_id TEXT, committed_at REAL,
+                        PRIMARY KEY (website_name, url_id)
+                    )
+                """
+            )
+            self.db.execute(
+                """
+                    CREATE TABLE IF NOT EXISTS discoveries(
+                        website_name TEXT PRIMARY KEY, discovered_at REAL
+                    )
+                """
+            )
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        # sqlite connections can't be shared between threads or forked processes
+        if getattr(self._local, "pid", None) != os.getpid():
+            self._local.db = sqlite3.connect(self.path, timeout=30)
+            self._local.db.execute("PRAGMA journal_mode=WAL")
+            self._local.db.execute("PRAGMA synchronous=NORMAL")
+            self._local.pid = os.getpid()
+
+        return self._local.db
+
+    def reset(self) -> None:
+        with self.db:
+            self.db.execute(
+                "DELETE FROM pages where website_name=?", (self.website_name,)
+            )
+            self.db.execute(
+                "DELETE FROM recipes where website_name=?", (self.website_name,)
+            )
+
+    def load(self) -> None:
+        """
+        Load what the previous run finished, which is_finished checks against.
+
+        :return:
+        """
+        self.finished_urls = {
+            row[0]
+            for row in self.db.execute(
+                "SELECT url from pages where website_name=? and state=?",
+                (self.website_name, SKIPPED),
+            )
+        }
+        self.finished_url_ids = {
+            row[0]
+            for row in self.db.execute(
+                "SELECT url_id from recipes where website_name=?",
+                (self.website_name,),
+            )
+        }
+        counts = dict(
+            self.db.execute(
+                "SELECT state, COUNT(*) from pages where website_name=? GROUP BY state",
+                (self.website_name,),
+            ).fetchall()
+        )
+        logging.info(
+            f"{self.website_name}: Resuming after {counts.get(FETCHED, 0)} fetched, "
+            f"{counts.get(PARSED, 0)} parsed, {len(self.finished_urls)} skipped "
+            f"and {len(self.finished_url_ids)} committed"
+        )
+
+    def is_finished(self, url: str = None, url_id: Any = None) -> bool:
+        return url in self.finished_urls or str(url_id) in self.finished_url_ids
+
+    def get_urls(self, state: str) -> List[str]:
+        return [
+            row[0]
+            for row in self.db.execute(
+                "SELECT url from pages where website_name=? and state=?",
+                (self.website_name, state),
+            )
+        ]
+
+    def mark_page(self, url: str, state: str) -> None:
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?)",
+                (self.website_name, url, state, time.time()),
+            )
+
+    def mark_committed(self, url_ids: Iterable[Any]) -> None:
+        committed_at = time.time()
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO recipes VALUES (?, ?, ?)",
+                [
+                    (self.website_name, str(url_id), committed_at)
+                    for url_id in url_ids
+                    if url_id is not None
+                ],
+            )
+
+    def get_discovered_at(self) -> Optional[datetime]:
+        row = self.db.execute(
+            "SELECT discovered_at from discoveries where website_name=?",
+            (self.website_name,),
+        ).fetchone()
+        return datetime.fromtimestamp(row[0], timezone.utc) if row else None
+
+    def mark_discovered(self, discovered_at: datetime) -> None:
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO discoveries VALUES (?, ?)",
+                (self.website_name, discovered_at.timestamp()),
+            )
+
+
+_crawl_checkpoint: Optional[CrawlCheckpoint] = None
+
+
+def get_crawl_checkpoint() -> Optional[CrawlCheckpoint]:
+    """
+    Get the checkpoint of the crawl running in this process, if any.
+
+    :return: Optional[CrawlCheckpoint]
+    """
+    return _crawl_checkpoint
+
+
+@contextmanager
+def crawl_checkpoint(website_name: str, resume: bool = False) -> Iterator:
+    """
+    Checkpoint the crawl of website_name run within the block. A resumed crawl
+    continues from the checkpoint left by the previous one, any other starts over.
+
+    :param website_name: str
+    :param resume: bool
+    :return: CrawlCheckpoint
+    """
+    global _crawl_checkpoint
+
+    checkpoint = CrawlCheckpoint(website_name=website_name)
+    if resume:
+        checkpoint.load()
+    else:
+        checkpoint.reset()
+
+    _crawl_checkpoint = checkpoint
+    try:
+        yield checkpoint
+    finally:
+        _crawl_checkpoint = None
+
+
+def parse_crawl_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="continue from the checkpoint of the last run instead of starting over",
+    )
+    parser.add_argument(
+        "--backfill",
+        action="store_true",
+        help="load the whole crawl at once with LOAD DATA LOCAL INFILE",
+    )
+    return parser.parse_args()
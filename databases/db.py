@@ -1,232 +1,998 @@
+import hashlib
+import json
 import logging
-from typing import Any, Dict, List
+import os
+import tempfile
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 
 import pymysql
 
-from config import DB_HOST, DB_NAME, DB_PASSWORD, DB_USERNAME
-from constants import EXCEPTION_URLS
+from constants import (
+    BULK_INSERT_BATCH_BYTES,
+    DB_STREAM_CHUNK_SIZE,
+    EXCEPTION_URLS,
+)
+from databases.checkpoint import SKIPPED, crawl_checkpoint, get_crawl_checkpoint
+from databases.pool import PooledConnection, get_connection_pool
+from databases.writer import WriteBehindWriter
 
 
 class BaseDBConnection:
-    def __init__(self):
-        self.db = pymysql.connect(
-            user=DB_USERNAME,
-            passwd=DB_PASSWORD,
-            host=DB_HOST,
-            db=DB_NAME,
-            charset="utf8",
-        )
-        self.cursor = self.db.cursor(pymysql.cursors.DictCursor)
+    """
+    Gives access to a connection of the process' connection pool, checked out on
+    first use of `db` or `cursor`. Closing `db` hands it back to the pool, and
+    the next use checks out another one.
+    """
+
+    _db: Optional[PooledConnection] = None
+    _cursor: Optional[pymysql.cursors.DictCursor] = None
+
+    def _acquire(self) -> None:
+        if self._db is None or self._db.closed:
+            self._db = get_connection_pool().acquire()
+            self._cursor = self._db.cursor(pymysql.cursors.DictCursor)
+
+    @property
+    def db(self) -> PooledConnection:
+        self._acquire()
+        return self._db
+
+    @property
+    def cursor(self) -> pymysql.cursors.DictCursor:
+        self._acquire()
+        return self._cursor
+
+    @staticmethod
+    def iter_query_rows(
+        query: str,
+        args: Sequence = (),
+        key: str = "url_id",
+        chunk_size: int = DB_STREAM_CHUNK_SIZE,
+    ) -> Iterator[Dict]:
+        """
+        Stream the rows of query in pages of chunk_size rows, so that the result
+        set is never held in memory.
+
+        Pages are read with keyset pagination: query, whose WHERE clause must come
+        last, is ordered by the unique column key and continued after the key of
+        the last row read. Each page is read with a cursor of its own on a pooled
+        connection that is handed back right away, so no result stays open on the
+        server while the rows are slowly consumed, as they are by a rate-limited
+        crawl.
+
+        :param query: str
+        :param args: Sequence
+        :param key: str, the key column as written in query, e.g. "table.url_id"
+        :param chunk_size: int
+        :return: rows as dicts
+        """
+        row_key = key.rsplit(".", 1)[-1]
+        last_key = None
+        while True:
+            if last_key is None:
+                page_query = f"{query} ORDER BY {key} LIMIT %s"
+                page_args = (*args, chunk_size)
+            else:
+                page_query = f"{query} AND {key} > %s ORDER BY {key} LIMIT %s"
+                page_args = (*args, last_key, chunk_size)
+
+            connection = get_connection_pool().acquire()
+            try:
+                with connection.cursor(pymysql.cursors.DictCursor) as cursor:
+                    cursor.execute(page_query, page_args)
+                    rows = cursor.fetchall()
+            finally:
+                connection.close()
+
+            yield from rows
+            if len(rows) < chunk_size:
+                return
+            last_key = rows[-1][row_key]
+
+
+def to_tsv_field(value: Any) -> str:
+    """
+    Format value as a field of a LOAD DATA INFILE file with the default tab
+    separated format, where NULL is written as \\N and special characters are
+    escaped with a backslash.
+
+    :param value: Any
+    :return: str
+    """
+    if value is None:
+        return "\\N"
+
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+        .replace("\0", "\\0")
+    )
+
+
+class BulkWriter:
+    """
+    Writes rows with multi-row INSERT IGNORE statements.
+
+    Rows are either dicts keyed by column or sequences in the order of the columns.
+    Each row is escaped with cursor.mogrify and appended to the VALUES list of the
+    current statement, which is sent once it would grow past batch_bytes. Rows of
+    any number of recipes are therefore written in a handful of round trips.
+    """
+
+    def __init__(self, cursor: Any, batch_bytes: int = BULK_INSERT_BATCH_BYTES):
+        self.cursor = cursor
+        self.batch_bytes = batch_bytes
+
+    def insert(
+        self, table: str, columns: Sequence[str], rows: Iterable[Union[Dict, Sequence]]
+    ) -> int:
+        """
+        Insert the values of columns in each of rows into table.
+
+        :param table: str
+        :param columns: Sequence[str]
+        :param rows: Iterable[Union[Dict, Sequence]]
+        :return: number of rows sent
+        """
+        statement = f"INSERT IGNORE INTO {table}({', '.join(columns)}) VALUES "
+        dict_row_format = f"({', '.join(f'%({column})s' for column in columns)})"
+        sequence_row_format = f"({', '.join(['%s'] * len(columns))})"
+
+        values = list()
+        values_size = 0
+        row_count = 0
+        for row in rows:
+            value = self.cursor.mogrify(
+                dict_row_format if isinstance(row, dict) else sequence_row_format, row
+            )
+            if values and len(statement) + values_size + len(value) > self.batch_bytes:
+                self.cursor.execute(statement + ",".join(values))
+                values = list()
+                values_size = 0
+            values.append(value)
+            values_size += len(value) + 1
+            row_count += 1
+
+        if values:
+            self.cursor.execute(statement + ",".join(values))
+
+        return row_count
+
+
+def get_recipe_fingerprint(recipe_dict: Dict) -> str:
+    """
+    Hash the extracted content of a recipe, so that a re-crawl can tell whether it
+    changed since it was last written.
+
+    :param recipe_dict: Dict
+    :return: hex digest
+    """
+    content = json.dumps(recipe_dict, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class UrlIdResolver(BaseDBConnection):
+    """
+    Resolves the url_id of the recipes of one website from memory.
+
+    The url -> url_id and post_id -> url_id maps of the website, and the urls
+    whose recipes were already written, are loaded with a single query when the
+    resolver is created, and its connection is closed right after, so scrapers can
+    share it with forked processes.
+    """
+
+    def __init__(self, website_name: str):
+        super().__init__()
+        try:
+            query = """
+                        SELECT url, post_id, url_id,
+                        content_hash IS NOT NULL OR EXISTS (
+                            SELECT 1 from keto_recipe
+                            where keto_recipe.url_id = keto_recipe_urls.url_id
+                        ) AS written
+                        from keto_recipe_urls where website_name=%s
+                    """
+            self.cursor.execute(query, (website_name,))
+            rows = self.cursor.fetchall()
+        finally:
+            self.db.close()
+
+        self.website_name = website_name
+        self.url_ids = {
+            data["url"]: data["url_id"] for data in rows if data["url"] is not None
+        }
+        self.post_url_ids = {
+            str(data["post_id"]): data["url_id"]
+            for data in rows
+            if data["post_id"] is not None
+        }
+        self.written_urls = {
+            data["url"] for data in rows if data["url"] is not None and data["written"]
+        }
+        logging.info(f"Loaded {len(rows)} url ids of {website_name}")
+
+    def get_url_id_by_url(self, url: str) -> Any:
+        return self.url_ids[url]
+
+    def get_url_id_by_post_id(self, post_id: Any) -> Any:
+        return self.post_url_ids[str(post_id)]
+
+    def is_written(self, url: str) -> bool:
+        return url in self.written_urls
 
 
 class BaseRecipeDB(BaseDBConnection):
+    # tables whose rows belong to a keto_recipe row through its recipe_id
+    RECIPE_CHILD_TABLES = (
+        "keto_recipe_ingredients",
+        "keto_recipe_instructions",
+        "keto_recipe_tips",
+        "nutrition",
+    )
+    # whether the recipes can be written by the fast-load mode of backfill
+    FAST_LOAD = True
+    # columns of each table written by the fast-load mode, except recipe_id
+    FAST_LOAD_COLUMNS = {
+        "keto_recipe": (
+            "recipe_name",
+            "url_id",
+            "yield",
+            "yield_unit",
+            "prep_time",
+            "active_time",
+            "total_time",
+            "image_url",
+        ),
+        "keto_recipe_ingredients": ("ingredient_name", "amount", "unit"),
+        "keto_recipe_instructions": ("order_number", "eng_description"),
+        "nutrition": (
+            "energy",
+            "carbohydrate",
+            "fat",
+            "protein",
+            "total_dietary_fiber",
+        ),
+    }
+
     def get_recipe_id_by_recipe_and_website_name(
         self, recipe_name: str, website_name: str
     ) -> str:
-        url_ids = tuple(self.get_web_url_id_list(website_name=website_name))
-        recipe_name = recipe_name.replace("'", "\\'")
-        query = f"""
-                    SELECT recipe_id from keto_recipe where recipe_name='{recipe_name}' and url_id in {url_ids}
+        query = """
+                    SELECT keto_recipe.recipe_id from keto_recipe
+                    JOIN keto_recipe_urls ON keto_recipe.url_id = keto_recipe_urls.url_id
+                    where keto_recipe.recipe_name=%s and keto_recipe_urls.website_name=%s
                 """
-        self.cursor.execute(query)
+        self.cursor.execute(query, (recipe_name, website_name))
         row = self.cursor.fetchone()
         return row["recipe_id"]
 
-    def get_web_url_id_list(self, website_name: str) -> List[str]:
+    def get_recipe_id_map(self, url_ids: Iterable[Any]) -> Dict[Tuple[Any, str], Any]:
+        """
+        Get the recipe_id of every recipe of url_ids by its url_id and name, in one
+        query.
+
+        :param url_ids: Iterable[Any]
+        :return: Dict[Tuple[Any, str], Any]
+        """
+        url_ids = list({url_id for url_id in url_ids if url_id is not None})
+        if not url_ids:
+            return dict()
+
         query = f"""
-                    SELECT url_id from keto_recipe_urls where website_name='{website_name}'
+                    SELECT url_id, recipe_name, recipe_id from keto_recipe
+                    where url_id IN ({', '.join(['%s'] * len(url_ids))})
                 """
-        self.cursor.execute(query)
+        self.cursor.execute(query, url_ids)
         rows = self.cursor.fetchall()
-        return [data["url_id"] for data in rows if data["url_id"] is not None]
+        return {
+            (data["url_id"], data["recipe_name"]): data["recipe_id"] for data in rows
+        }
+
+    def get_rows_with_url_id(
+        self, recipe_dict: Dict, rows: Optional[List[Dict]]
+    ) -> List[Dict]:
+        """
+        Copy the child rows of recipe_dict, adding to each row the url_id of the
+        recipe, which get_rows_with_recipe_id looks their recipe_id up by.
+
+        :param recipe_dict: Dict
+        :param rows: Optional[List[Dict]]
+        :return: List[Dict]
+        """
+        url_id = self.get_recipe_url_id(recipe_dict)
+        return [{**row, "url_id": url_id} for row in rows or list()]
+
+    @staticmethod
+    def get_row_url_ids(row_lists: List[List[Dict]]) -> List[Any]:
+        return [
+            row["url_id"]
+            for row_list in row_lists
+            if row_list is not None
+            for row in row_list
+        ]
+
+    @staticmethod
+    def get_rows_with_recipe_id(
+        row_lists: List[List[Dict]], recipe_id_map: Dict[Tuple[Any, str], Any]
+    ) -> List[Dict]:
+        """
+        Flatten the child rows of the recipes in row_lists, adding to each row the
+        recipe_id of its url_id and recipe_name.
+
+        :param row_lists: List[List[Dict]]
+        :param recipe_id_map: Dict[Tuple[Any, str], Any]
+        :return: List[Dict]
+        """
+        return [
+            {**row, "recipe_id": recipe_id_map[(row["url_id"], row["recipe_name"])]}
+            for row_list in row_lists
+            if row_list is not None
+            for row in row_list
+        ]
+
+    def iter_web_url_ids(self, website_name: str) -> Iterator[Any]:
+        query = """
+                    SELECT url_id from keto_recipe_urls where website_name=%s
+                """
+        return (
+            data["url_id"]
+            for data in self.iter_query_rows(query, (website_name,))
+            if data["url_id"] is not None
+        )
+
+    @staticmethod
+    def is_crawl_finished(data: Dict) -> bool:
+        """
+        Whether the crawl being resumed already finished the url of a
+        keto_recipe_urls row. See CrawlCheckpoint.
+
+        :param data: Dict
+        :return: bool
+        """
+        checkpoint = get_crawl_checkpoint()
+        return checkpoint is not None and checkpoint.is_finished(
+            url=data.get("url"), url_id=data["url_id"]
+        )
+
+    def get_known_url_set(self, website_name: str) -> Set[str]:
+        query = """
+                    SELECT url, url_id from keto_recipe_urls where website_name=%s
+                """
+        return {
+            data["url"]
+            for data in self.iter_query_rows(query, (website_name,))
+            if data["url"] is not None
+        }
+
+    def get_web_url_id_list(self, website_name: str) -> List[str]:
+        return list(self.iter_web_url_ids(website_name=website_name))
 
     def delete_url_from_keto_recipe_urls(self, url: str) -> None:
-        query = f"""
-                    DELETE from keto_recipe_urls where url='{url}'
+        query = """
+                    DELETE from keto_recipe_urls where url=%s
                 """
-        self.cursor.execute(query)
+        self.cursor.execute(query, (url,))
         self.db.commit()
         logging.info(f"{url} successfully deleted. ")
 
     def get_url_id_by_url_and_website_name(self, url: str, website_name: str):
-        query = f"""
-                    SELECT url_id from keto_recipe_urls where url='{url}' and website_name='{website_name}'
+        query = """
+                    SELECT url_id from keto_recipe_urls where website_name=%s and url=%s
                 """
-        self.cursor.execute(query)
+        self.cursor.execute(query, (website_name, url))
         row = self.cursor.fetchone()
         return row["url_id"]
 
     def get_url_id_by_post_id_and_website_name(self, post_id: Any, website_name: str):
-        query = f"""
-                    SELECT url_id from keto_recipe_urls where post_id='{post_id}' and website_name='{website_name}'
+        query = """
+                    SELECT url_id from keto_recipe_urls where website_name=%s and post_id=%s
                 """
-        self.cursor.execute(query)
+        self.cursor.execute(query, (website_name, post_id))
         row = self.cursor.fetchone()
         return row["url_id"]
 
     def update_db(self, website_name: str, recipe_info_dict: Dict) -> None:
-        url_query = f"""
+        url_query = """
                     INSERT INTO keto_recipe_urls(url, website_name)
-                    VALUES (%s, '{website_name}')
+                    VALUES (%s, %s)
                     ON DUPLICATE KEY UPDATE url=VALUES(url), website_name=VALUES(website_name);
                 """
-        self.cursor.executemany(url_query, recipe_info_dict["web_crawling_url_list"])
-        id_query = f"""
+        self.cursor.executemany(
+            url_query,
+            [(url, website_name) for url in recipe_info_dict["web_crawling_url_list"]],
+        )
+        id_query = """
                     INSERT INTO keto_recipe_urls(post_id, website_name)
-                    VALUES (%s, '{website_name}')
+                    VALUES (%s, %s)
                     ON DUPLICATE KEY UPDATE post_id=VALUES(post_id), website_name=VALUES(website_name);
                 """
-        self.cursor.executemany(id_query, recipe_info_dict["api_crawling_id_list"])
+        self.cursor.executemany(
+            id_query,
+            [
+                (post_id, website_name)
+                for post_id in recipe_info_dict["api_crawling_id_list"]
+            ],
+        )
         self.db.commit()
         logging.info("Successfully updated recipe url DB")
 
+    def iter_web_urls(self, website_name: str) -> Iterator[str]:
+        """
+        Stream the recipe urls of website_name, without the EXCEPTION_URLS, so they
+        can be handed to the fetch engine as they are read.
+
+        :param website_name: str
+        :return: urls
+        """
+        query = """
+                    SELECT url, url_id from keto_recipe_urls where website_name=%s
+                """
+        return (
+            data["url"]
+            for data in self.iter_query_rows(query, (website_name,))
+            if data["url"] is not None
+            and data["url"] not in EXCEPTION_URLS
+            and not self.is_crawl_finished(data)
+        )
+
     def get_web_url_list(self, website_name: str) -> List[str]:
-        query = f"""
-                    SELECT url from keto_recipe_urls where website_name='{website_name}'
+        return list(self.iter_web_urls(website_name=website_name))
+
+    def save_not_recipe_urls(self, website_name: str, urls: List[str]) -> None:
+        """
+        Flag the urls of website_name whose pages were found not to be recipes, as
+        the non-recipe posts their sitemaps list. Urls that have a recipe, such as
+        the unchanged pages the crawl skipped, are left alone.
+
+        :param website_name: str
+        :param urls: List[str]
+        :return:
+        """
+        if not urls:
+            return
+
+        query = """
+                    UPDATE keto_recipe_urls
+                    LEFT JOIN keto_recipe ON keto_recipe.url_id = keto_recipe_urls.url_id
+                    SET keto_recipe_urls.not_recipe=1
+                    where keto_recipe_urls.website_name=%s and keto_recipe_urls.url=%s
+                    AND keto_recipe_urls.content_hash IS NULL
+                    AND keto_recipe.url_id IS NULL
                 """
-        self.cursor.execute(query)
-        rows = self.cursor.fetchall()
-        return [
+        try:
+            self.cursor.executemany(query, [(website_name, url) for url in urls])
+            self.db.commit()
+            logging.info(f"{website_name}: Flagged {len(urls)} urls as not recipes")
+        finally:
+            self.db.close()
+
+    def iter_new_web_urls(self, website_name: str) -> Iterator[str]:
+        """
+        Stream the urls of website_name that have no recipe yet, without the
+        EXCEPTION_URLS and the pages found not to be recipes.
+
+        :param website_name: str
+        :return: urls
+        """
+        # anti-join, resolved on the keto_recipe side by its url_id index of
+        # databases.migrations
+        query = """
+                    SELECT keto_recipe_urls.url, keto_recipe_urls.url_id from keto_recipe_urls
+                    LEFT JOIN keto_recipe ON keto_recipe.url_id = keto_recipe_urls.url_id
+                    where keto_recipe_urls.website_name=%s AND keto_recipe.url_id IS NULL
+                    AND NOT keto_recipe_urls.not_recipe
+                """
+        return (
             data["url"]
-            for data in rows
-            if data["url"] is not None and data["url"] not in EXCEPTION_URLS
-        ]
+            for data in self.iter_query_rows(
+                query, (website_name,), key="keto_recipe_urls.url_id"
+            )
+            if data["url"] is not None
+            and data["url"] not in EXCEPTION_URLS
+            and not self.is_crawl_finished(data)
+        )
 
     def get_new_web_url_list(self, website_name: str) -> List[str]:
-        query = f"""
-                    SELECT url from keto_recipe_urls where website_name='{website_name}'
-                    AND url_id not in (select url_id from keto_recipe)
+        return list(self.iter_new_web_urls(website_name=website_name))
+
+    def iter_api_ids(self, website_name: str) -> Iterator[Any]:
+        query = """
+                    SELECT post_id, url_id from keto_recipe_urls where website_name=%s
                 """
-        self.cursor.execute(query)
-        rows = self.cursor.fetchall()
-        return [
-            data["url"]
-            for data in rows
-            if data["url"] is not None and data["url"] not in EXCEPTION_URLS
-        ]
+        return (
+            data["post_id"]
+            for data in self.iter_query_rows(query, (website_name,))
+            if data["post_id"] is not None and not self.is_crawl_finished(data)
+        )
 
     def get_api_id_list(self, website_name: str) -> List[str]:
-        query = f"""
-                    SELECT post_id from keto_recipe_urls where website_name='{website_name}'
-                """
-        self.cursor.execute(query)
-        rows = self.cursor.fetchall()
-        return [data["post_id"] for data in rows if data["post_id"] is not None]
+        return list(self.iter_api_ids(website_name=website_name))
+
+    def bulk_insert(
+        self, table: str, columns: Sequence[str], rows: Iterable[Union[Dict, Sequence]]
+    ) -> None:
+        BulkWriter(cursor=self.cursor).insert(table=table, columns=columns, rows=rows)
 
     def insert_into_keto_recipe(self, keto_recipe_info_list: List[Dict]) -> None:
         try:
-            query = f"""
-                        INSERT IGNORE INTO
-                        keto_recipe(
-                            recipe_name, url_id, yield, yield_unit,
-                            prep_time, active_time, total_time, image_url
-                        )
-                        VALUES (
-                                %(recipe_name)s, %(url_id)s, %(yield)s, %(yield_unit)s, %(prep_time)s,
-                                 %(active_time)s, %(total_time)s, %(image_url)s
-                                )
-                    """
-            self.cursor.executemany(query, (keto_recipe_info_list))
+            self.bulk_insert(
+                table="keto_recipe",
+                columns=(
+                    "recipe_name",
+                    "url_id",
+                    "yield",
+                    "yield_unit",
+                    "prep_time",
+                    "active_time",
+                    "total_time",
+                    "image_url",
+                ),
+                rows=keto_recipe_info_list,
+            )
             logging.info(f"Successfully inserted into keto_recipe")
         except Exception as e:
             logging.error(f"{e} -> keto_recipe")
             raise e
 
     def insert_into_keto_recipe_ingredients(
-        self, keto_recipe_ingredients_list: List[List], website_name: str
+        self,
+        keto_recipe_ingredients_list: List[List],
+        website_name: str,
+        recipe_id_map: Dict[Tuple[Any, str], Any] = None,
     ):
         try:
-            for ingredients_list in keto_recipe_ingredients_list:
-                recipe_id = self.get_recipe_id_by_recipe_and_website_name(
-                    recipe_name=ingredients_list[0]["recipe_name"],
-                    website_name=website_name,
+            if recipe_id_map is None:
+                recipe_id_map = self.get_recipe_id_map(
+                    url_ids=self.get_row_url_ids(keto_recipe_ingredients_list)
                 )
-                query = f"""
-                            INSERT IGNORE INTO
-                            keto_recipe_ingredients(recipe_id, ingredient_name, amount, unit)
-                            VALUES ({recipe_id}, %(ingredient_name)s, %(amount)s, %(unit)s)
-                        """
-                self.cursor.executemany(query, ingredients_list)
+            self.bulk_insert(
+                table="keto_recipe_ingredients",
+                columns=("recipe_id", "ingredient_name", "amount", "unit"),
+                rows=self.get_rows_with_recipe_id(
+                    row_lists=keto_recipe_ingredients_list, recipe_id_map=recipe_id_map
+                ),
+            )
             logging.info(f"Successfully inserted into keto_recipe_ingredients")
         except Exception as e:
             logging.error(f"{e} -> keto_recipe_ingredients")
             raise e
 
     def insert_into_keto_recipe_instructions(
-        self, keto_recipe_instructions_list: List[List], website_name: str
+        self,
+        keto_recipe_instructions_list: List[List],
+        website_name: str,
+        recipe_id_map: Dict[Tuple[Any, str], Any] = None,
     ):
         try:
-            for instructions_list in keto_recipe_instructions_list:
-                recipe_id = self.get_recipe_id_by_recipe_and_website_name(
-                    recipe_name=instructions_list[0]["recipe_name"],
-                    website_name=website_name,
+            if recipe_id_map is None:
+                recipe_id_map = self.get_recipe_id_map(
+                    url_ids=self.get_row_url_ids(keto_recipe_instructions_list)
                 )
-                query = f"""
-                            INSERT IGNORE INTO
-                            keto_recipe_instructions(recipe_id, order_number, eng_description)
-                            VALUES ({recipe_id}, %(order_number)s, %(eng_description)s)
-                        """
-                self.cursor.executemany(query, instructions_list)
+            self.bulk_insert(
+                table="keto_recipe_instructions",
+                columns=("recipe_id", "order_number", "eng_description"),
+                rows=self.get_rows_with_recipe_id(
+                    row_lists=keto_recipe_instructions_list,
+                    recipe_id_map=recipe_id_map,
+                ),
+            )
             logging.info(f"Successfully inserted into keto_recipe_instructions")
         except Exception as e:
             logging.error(f"{e} -> keto_recipe_instructions")
             raise e
 
     def insert_into_keto_recipe_nutrition(
-        self, keto_recipe_nutrition_list: List[Dict], website_name: str
+        self,
+        keto_recipe_nutrition_list: List[Dict],
+        website_name: str,
+        recipe_id_map: Dict[Tuple[Any, str], Any] = None,
     ):
         try:
-            for nutrition_dict in keto_recipe_nutrition_list:
-                recipe_id = self.get_recipe_id_by_recipe_and_website_name(
-                    recipe_name=nutrition_dict["recipe_name"], website_name=website_name
+            if recipe_id_map is None:
+                recipe_id_map = self.get_recipe_id_map(
+                    url_ids=self.get_row_url_ids([keto_recipe_nutrition_list])
                 )
-                query = f"""
-                            INSERT IGNORE INTO
-                            nutrition(recipe_id, energy, carbohydrate, fat, protein, total_dietary_fiber)
-                            VALUES (
-                                {recipe_id}, %(energy)s, %(carbohydrate)s, %(fat)s, %(protein)s, %(total_dietary_fiber)s
-                            )
-                        """
-                self.cursor.execute(query, nutrition_dict)
+            self.bulk_insert(
+                table="nutrition",
+                columns=(
+                    "recipe_id",
+                    "energy",
+                    "carbohydrate",
+                    "fat",
+                    "protein",
+                    "total_dietary_fiber",
+                ),
+                rows=self.get_rows_with_recipe_id(
+                    row_lists=[keto_recipe_nutrition_list], recipe_id_map=recipe_id_map
+                ),
+            )
             logging.info(f"Successfully inserted into keto_recipe_nutrition")
         except Exception as e:
             logging.error(f"{e} -> keto_recipe_nutrition")
             raise e
 
-    def insert_all_into_db(
-        self, recipe_dict_list: List[Dict], website_name: str
-    ) -> None:
+    def iter_fast_load_rows(
+        self, recipe_dicts: Iterable[Dict]
+    ) -> Iterator[Tuple[str, Dict]]:
+        """
+        Iterate over the rows of every table written for the recipes, as (table, row)
+        tuples. The rows of the child tables carry the url_id and recipe_name of
+        their recipe instead of its recipe_id.
+
+        :param recipe_dicts: Iterable[Dict]
+        :return: (table, row) tuples
+        """
+        for recipe_dict in recipe_dicts:
+            recipe_info = recipe_dict["keto_recipe_info"]
+            recipe_key = {
+                "url_id": recipe_info["url_id"],
+                "recipe_name": recipe_info["recipe_name"],
+            }
+            yield "keto_recipe", recipe_info
+            for ingredient in recipe_dict["keto_recipe_ingredients"] or list():
+                yield "keto_recipe_ingredients", {**ingredient, **recipe_key}
+            for instruction in recipe_dict["keto_recipe_instructions"] or list():
+                yield "keto_recipe_instructions", {**instruction, **recipe_key}
+            for tip in recipe_dict.get("keto_recipe_tips") or list():
+                yield "keto_recipe_tips", {**tip, **recipe_key}
+            if recipe_dict.get("keto_recipe_nutrition") is not None:
+                yield "nutrition", {
+                    **recipe_dict["keto_recipe_nutrition"],
+                    **recipe_key,
+                }
+
+    def write_fast_load_files(
+        self, recipe_dicts: Iterable[Dict], dir_path: str
+    ) -> Dict[str, str]:
+        """
+        Stream the rows of every table into a tab separated file per table.
+
+        :param recipe_dicts: Iterable[Dict]
+        :param dir_path: str
+        :return: file path by table
+        """
+        files = dict()
+        try:
+            for table, row in self.iter_fast_load_rows(recipe_dicts):
+                if table not in files:
+                    files[table] = open(
+                        os.path.join(dir_path, f"{table}.tsv"), "w", encoding="utf-8"
+                    )
+                columns = self.FAST_LOAD_COLUMNS[table]
+                if table != "keto_recipe":
+                    columns = ("url_id", "recipe_name") + columns
+                files[table].write(
+                    "\t".join(to_tsv_field(row.get(column)) for column in columns)
+                    + "\n"
+                )
+        finally:
+            for f in files.values():
+                f.close()
+
+        return {table: f.name for table, f in files.items()}
+
+    def load_data_infile(self, file_path: str, table: str, columns: Sequence[str]):
+        query = f"""
+                    LOAD DATA LOCAL INFILE %s IGNORE INTO TABLE {table}
+                    CHARACTER SET utf8mb4 ({', '.join(columns)})
+                """
+        self.cursor.execute(query, (file_path,))
+        logging.info(f"Loaded {self.cursor.rowcount} rows into {table}")
+
+    def load_child_table(self, file_path: str, table: str) -> None:
+        """
+        Load the rows of a child table of keto_recipe through a temporary staging
+        table, then resolve their recipe_id with a single join on url_id and
+        recipe_name.
+
+        :param file_path: str
+        :param table: str
+        :return:
+        """
+        columns = self.FAST_LOAD_COLUMNS[table]
+        staging_table = f"fast_load_{table}"
+        self.cursor.execute(
+            f"""
+                CREATE TEMPORARY TABLE {staging_table}
+                SELECT keto_recipe.url_id, keto_recipe.recipe_name,
+                {', '.join(f'{table}.{column}' for column in columns)}
+                FROM keto_recipe, {table} LIMIT 0
+            """
+        )
         try:
-            self.insert_into_keto_recipe(
-                keto_recipe_info_list=[
-                    recipe_dict["keto_recipe_info"] for recipe_dict in recipe_dict_list
-                ]
+            self.load_data_infile(
+                file_path=file_path,
+                table=staging_table,
+                columns=("url_id", "recipe_name") + columns,
             )
-            self.insert_into_keto_recipe_ingredients(
-                keto_recipe_ingredients_list=[
-                    recipe_dict["keto_recipe_ingredients"]
-                    for recipe_dict in recipe_dict_list
-                ],
-                website_name=website_name,
+            self.cursor.execute(
+                f"""
+                    INSERT IGNORE INTO {table}(recipe_id, {', '.join(columns)})
+                    SELECT keto_recipe.recipe_id,
+                    {', '.join(f'{staging_table}.{column}' for column in columns)}
+                    FROM {staging_table} JOIN keto_recipe
+                    ON keto_recipe.url_id = {staging_table}.url_id
+                    AND keto_recipe.recipe_name = {staging_table}.recipe_name
+                """
             )
-            self.insert_into_keto_recipe_instructions(
-                keto_recipe_instructions_list=[
-                    recipe_dict["keto_recipe_instructions"]
-                    for recipe_dict in recipe_dict_list
-                ],
-                website_name=website_name,
+            logging.info(f"Inserted {self.cursor.rowcount} rows into {table}")
+        finally:
+            self.cursor.execute(f"DROP TEMPORARY TABLE {staging_table}")
+
+    def load_fast_load_files(self, file_paths: Dict[str, str]) -> None:
+        """
+        Load the files written by write_fast_load_files with LOAD DATA LOCAL INFILE,
+        keto_recipe first, so the server has to run with local_infile enabled.
+
+        :param file_paths: file path by table
+        :return:
+        """
+        file_paths = dict(file_paths)
+        if "keto_recipe" in file_paths:
+            self.load_data_infile(
+                file_path=file_paths.pop("keto_recipe"),
+                table="keto_recipe",
+                columns=self.FAST_LOAD_COLUMNS["keto_recipe"],
             )
-            self.insert_into_keto_recipe_nutrition(
-                keto_recipe_nutrition_list=[
-                    recipe_dict.get("keto_recipe_nutrition")
-                    for recipe_dict in recipe_dict_list
-                    if recipe_dict.get("keto_recipe_nutrition") is not None
-                ],
-                website_name=website_name,
+        for table, file_path in file_paths.items():
+            self.load_child_table(file_path=file_path, table=table)
+
+    def insert_into_all_tables(
+        self, recipe_dict_list: List[Dict], website_name: str
+    ) -> None:
+        self.insert_into_keto_recipe(
+            keto_recipe_info_list=[
+                recipe_dict["keto_recipe_info"] for recipe_dict in recipe_dict_list
+            ]
+        )
+        recipe_id_map = self.get_recipe_id_map(
+            url_ids=[
+                self.get_recipe_url_id(recipe_dict) for recipe_dict in recipe_dict_list
+            ]
+        )
+        self.insert_into_keto_recipe_ingredients(
+            keto_recipe_ingredients_list=[
+                self.get_rows_with_url_id(
+                    recipe_dict=recipe_dict, rows=recipe_dict["keto_recipe_ingredients"]
+                )
+                for recipe_dict in recipe_dict_list
+            ],
+            website_name=website_name,
+            recipe_id_map=recipe_id_map,
+        )
+        self.insert_into_keto_recipe_instructions(
+            keto_recipe_instructions_list=[
+                self.get_rows_with_url_id(
+                    recipe_dict=recipe_dict,
+                    rows=recipe_dict["keto_recipe_instructions"],
+                )
+                for recipe_dict in recipe_dict_list
+            ],
+            website_name=website_name,
+            recipe_id_map=recipe_id_map,
+        )
+        self.insert_into_keto_recipe_nutrition(
+            keto_recipe_nutrition_list=[
+                {
+                    **recipe_dict["keto_recipe_nutrition"],
+                    "url_id": self.get_recipe_url_id(recipe_dict),
+                }
+                for recipe_dict in recipe_dict_list
+                if recipe_dict.get("keto_recipe_nutrition") is not None
+            ],
+            website_name=website_name,
+            recipe_id_map=recipe_id_map,
+        )
+
+    def insert_recipe_dicts(
+        self, recipe_dict_list: List[Dict], website_name: str
+    ) -> None:
+        """
+        Insert the recipes into every table without committing.
+
+        :param recipe_dict_list: List[Dict]
+        :param website_name: str
+        :return:
+        """
+        self.insert_into_all_tables(
+            recipe_dict_list=recipe_dict_list, website_name=website_name
+        )
+
+    def get_recipe_url_id(self, recipe_dict: Dict) -> Any:
+        return recipe_dict["keto_recipe_info"]["url_id"]
+
+    def get_content_hash_map(self, url_ids: List[Any]) -> Dict[Any, Optional[str]]:
+        query = f"""
+                    SELECT url_id, content_hash from keto_recipe_urls
+                    where url_id IN ({', '.join(['%s'] * len(url_ids))})
+                """
+        self.cursor.execute(query, url_ids)
+        rows = self.cursor.fetchall()
+        return {data["url_id"]: data["content_hash"] for data in rows}
+
+    def save_content_hashes(self, content_hashes: Dict[Any, str]) -> None:
+        query = """
+                    UPDATE keto_recipe_urls SET content_hash=%s where url_id=%s
+                """
+        self.cursor.executemany(
+            query,
+            [(content_hash, url_id) for url_id, content_hash in content_hashes.items()],
+        )
+
+    def delete_recipes_by_url_ids(self, url_ids: List[Any]) -> None:
+        """
+        Delete the recipes of url_ids and the rows of every child table that
+        belong to them.
+
+        :param url_ids: List[Any]
+        :return:
+        """
+        placeholders = ", ".join(["%s"] * len(url_ids))
+        for table in self.RECIPE_CHILD_TABLES:
+            self.cursor.execute(
+                f"""
+                    DELETE {table} FROM {table} JOIN keto_recipe
+                    ON keto_recipe.recipe_id = {table}.recipe_id
+                    where keto_recipe.url_id IN ({placeholders})
+                """,
+                url_ids,
             )
+        self.cursor.execute(
+            f"DELETE FROM keto_recipe where url_id IN ({placeholders})", url_ids
+        )
+
+    def write_recipe_dicts(
+        self, recipe_dict_list: List[Dict], website_name: str
+    ) -> int:
+        """
+        Write the recipes whose content changed since they were last written,
+        without committing.
+
+        Each recipe is fingerprinted with get_recipe_fingerprint and compared with
+        the content_hash stored on its keto_recipe_urls row. Unchanged recipes are
+        skipped. The others replace whatever rows their url had, through
+        insert_recipe_dicts, and their new fingerprint is stored.
+
+        :param recipe_dict_list: List[Dict]
+        :param website_name: str
+        :return: number of recipes written
+        """
+        content_hashes = dict()
+        recipe_dicts = dict()
+        unkeyed_recipe_dicts = list()
+        for recipe_dict in recipe_dict_list:
+            url_id = self.get_recipe_url_id(recipe_dict)
+            if url_id is None:
+                unkeyed_recipe_dicts.append(recipe_dict)
+                continue
+            content_hashes[url_id] = get_recipe_fingerprint(recipe_dict)
+            recipe_dicts[url_id] = recipe_dict
+
+        if content_hashes:
+            stored_hashes = self.get_content_hash_map(url_ids=list(content_hashes))
+            content_hashes = {
+                url_id: content_hash
+                for url_id, content_hash in content_hashes.items()
+                if stored_hashes.get(url_id) != content_hash
+            }
+
+        changed_recipe_dicts = [recipe_dicts[url_id] for url_id in content_hashes]
+        changed_recipe_dicts.extend(unkeyed_recipe_dicts)
+        if not changed_recipe_dicts:
+            return 0
+
+        if content_hashes:
+            self.delete_recipes_by_url_ids(url_ids=list(content_hashes))
+        self.insert_recipe_dicts(
+            recipe_dict_list=changed_recipe_dicts, website_name=website_name
+        )
+        if content_hashes:
+            self.save_content_hashes(content_hashes=content_hashes)
+
+        return len(changed_recipe_dicts)
+
+    def backfill(
+        self, recipe_dicts: Iterable[Dict], website_name: str, checkpoint: Any = None
+    ) -> None:
+        """
+        Fast-load mode of write_behind for full-site backfills. Every recipe is
+        streamed into the files of write_fast_load_files while it is crawled, and the
+        files are loaded once the crawl is done, in a single transaction. The
+        recipes replace whatever rows their url had and their fingerprint is stored,
+        as in write_recipe_dicts, but unchanged recipes are reloaded too.
+
+        :param recipe_dicts: Iterable[Dict]
+        :param website_name: str
+        :param checkpoint: CrawlCheckpoint the loaded url_ids are recorded in
+        :return:
+        """
+        content_hashes = dict()
+
+        def iter_fingerprinted_recipe_dicts() -> Iterator[Dict]:
+            for recipe_dict in recipe_dicts:
+                url_id = self.get_recipe_url_id(recipe_dict)
+                if url_id is not None:
+                    content_hashes[url_id] = get_recipe_fingerprint(recipe_dict)
+                yield recipe_dict
+
+        try:
+            with tempfile.TemporaryDirectory() as dir_path:
+                file_paths = self.write_fast_load_files(
+                    recipe_dicts=iter_fingerprinted_recipe_dicts(), dir_path=dir_path
+                )
+                url_ids = list(content_hashes)
+                for start in range(0, len(url_ids), DB_STREAM_CHUNK_SIZE):
+                    self.delete_recipes_by_url_ids(
+                        url_ids=url_ids[start : start + DB_STREAM_CHUNK_SIZE]
+                    )
+                self.load_fast_load_files(file_paths=file_paths)
+                if content_hashes:
+                    self.save_content_hashes(content_hashes=content_hashes)
             self.db.commit()
         except Exception as e:
-            logging.error(e)
+            logging.error(f"{website_name}: {e}")
             self.db.rollback()
+            raise e
         finally:
             self.db.close()
+
+        if checkpoint is not None:
+            checkpoint.mark_committed(url_ids=content_hashes)
+        logging.info(f"{website_name}: Backfilled {len(content_hashes)} recipes")
+
+    def write_behind(
+        self,
+        recipe_dicts: Iterable[Dict],
+        website_name: str,
+        resume: bool = False,
+        backfill: bool = False,
+    ) -> None:
+        """
+        Insert the recipes while they are still being crawled. They are handed to a
+        WriteBehindWriter thread, which commits them in chunks, or with backfill,
+        streamed to files that are loaded once the crawl is done.
+
+        The crawl is checkpointed as it goes. When resuming, the urls the previous
+        run committed or found not to be recipes are left out of the url lists.
+        Once the crawl is done, the pages it found not to be recipes are flagged
+        in keto_recipe_urls, so that later crawls leave them out of the new urls.
+
+        :param recipe_dicts: Iterable[Dict]
+        :param website_name: str
+        :param resume: bool
+        :param backfill: bool
+        :return:
+        """
+        if backfill and not self.FAST_LOAD:
+            raise ValueError(f"{website_name}: backfill isn't supported")
+
+        with crawl_checkpoint(website_name=website_name, resume=resume) as checkpoint:
+            if backfill:
+                self.backfill(
+                    recipe_dicts=recipe_dicts,
+                    website_name=website_name,
+                    checkpoint=checkpoint,
+                )
+            else:
+                with WriteBehindWriter(
+                    db=self, website_name=website_name, checkpoint=checkpoint
+                ) as writer:
+                    for recipe_dict in recipe_dicts:
+                        writer.put(recipe_dict)
+            self.save_not_recipe_urls(
+                website_name=website_name, urls=checkpoint.get_urls(state=SKIPPED)
+            )
@@ -1,98 +1,120 @@
 import logging
-from typing import Dict, List
+from typing import Any, Dict, List, Tuple
 
 from constants import WebsiteNames
-from crawlers.freefrdi import get_total_recipe_dict_list
+from crawlers.freefrdi import iter_total_recipe_dicts
+from databases.checkpoint import parse_crawl_args
 from databases.db import BaseRecipeDB
 
 logging.root.setLevel(logging.INFO)
 
 
 class FreeFrdiDB(BaseRecipeDB):
+    FAST_LOAD_COLUMNS = {
+        **BaseRecipeDB.FAST_LOAD_COLUMNS,
+        "keto_recipe_instructions": ("order_number", "kor_description"),
+        "keto_recipe_tips": ("order_number", "tip"),
+    }
+
     def insert_into_keto_recipe_instructions(
-        self, keto_recipe_instructions_list: List[List], website_name: str
+        self,
+        keto_recipe_instructions_list: List[List],
+        website_name: str,
+        recipe_id_map: Dict[Tuple[Any, str], Any] = None,
     ):
         try:
-            for instructions_list in keto_recipe_instructions_list:
-                recipe_id = self.get_recipe_id_by_recipe_and_website_name(
-                    recipe_name=instructions_list[0]["recipe_name"],
-                    website_name=website_name,
+            if recipe_id_map is None:
+                recipe_id_map = self.get_recipe_id_map(
+                    url_ids=self.get_row_url_ids(keto_recipe_instructions_list)
                 )
-                query = f"""
-                            INSERT IGNORE INTO
-                            keto_recipe_instructions(recipe_id, order_number, kor_description)
-                            VALUES ({recipe_id}, %(order_number)s, %(kor_description)s)
-                        """
-                self.cursor.executemany(query, instructions_list)
+            self.bulk_insert(
+                table="keto_recipe_instructions",
+                columns=("recipe_id", "order_number", "kor_description"),
+                rows=self.get_rows_with_recipe_id(
+                    row_lists=keto_recipe_instructions_list,
+                    recipe_id_map=recipe_id_map,
+                ),
+            )
             logging.info(f"Successfully inserted into keto_recipe_instructions")
         except Exception as e:
             logging.error(f"{e} -> keto_recipe_instructions")
             raise e
 
     def insert_into_keto_recipe_tips(
-        self, keto_recipe_tips_list: List[List], website_name: str
+        self,
+        keto_recipe_tips_list: List[List],
+        website_name: str,
+        recipe_id_map: Dict[Tuple[Any, str], Any] = None,
     ):
         try:
-            for tips_list in keto_recipe_tips_list:
-                if tips_list is None:
-                    continue
-
-                recipe_id = self.get_recipe_id_by_recipe_and_website_name(
-                    recipe_name=tips_list[0]["recipe_name"],
-                    website_name=website_name,
+            if recipe_id_map is None:
+                recipe_id_map = self.get_recipe_id_map(
+                    url_ids=self.get_row_url_ids(keto_recipe_tips_list)
                 )
-                query = f"""
-                            INSERT IGNORE INTO
-                            keto_recipe_tips(recipe_id, order_number, tip)
-                            VALUES ({recipe_id}, %(order_number)s, %(tip)s)
-                        """
-                self.cursor.executemany(query, tips_list)
+            self.bulk_insert(
+                table="keto_recipe_tips",
+                columns=("recipe_id", "order_number", "tip"),
+                rows=self.get_rows_with_recipe_id(
+                    row_lists=keto_recipe_tips_list, recipe_id_map=recipe_id_map
+                ),
+            )
             logging.info(f"Successfully inserted into keto_recipe_tips")
         except Exception as e:
             logging.error(f"{e} -> keto_recipe_tips")
             raise e
 
-    def insert_all_into_db(
+    def insert_into_all_tables(
         self, recipe_dict_list: List[Dict], website_name: str
     ) -> None:
-        try:
-            self.insert_into_keto_recipe(
-                keto_recipe_info_list=[
-                    recipe_dict["keto_recipe_info"] for recipe_dict in recipe_dict_list
-                ]
-            )
-            self.insert_into_keto_recipe_ingredients(
-                keto_recipe_ingredients_list=[
-                    recipe_dict["keto_recipe_ingredients"]
-                    for recipe_dict in recipe_dict_list
-                ],
-                website_name=website_name,
-            )
-            self.insert_into_keto_recipe_instructions(
-                keto_recipe_instructions_list=[
-                    recipe_dict["keto_recipe_instructions"]
-                    for recipe_dict in recipe_dict_list
-                ],
-                website_name=website_name,
-            )
-            self.insert_into_keto_recipe_tips(
-                keto_recipe_tips_list=[
-                    recipe_dict["keto_recipe_tips"] for recipe_dict in recipe_dict_list
-                ],
-                website_name=website_name,
-            )
-            self.db.commit()
-        except Exception as e:
-            logging.error(e)
-            self.db.rollback()
-        finally:
-            self.db.close()
+        self.insert_into_keto_recipe(
+            keto_recipe_info_list=[
+                recipe_dict["keto_recipe_info"] for recipe_dict in recipe_dict_list
+            ]
+        )
+        recipe_id_map = self.get_recipe_id_map(
+            url_ids=[
+                self.get_recipe_url_id(recipe_dict) for recipe_dict in recipe_dict_list
+            ]
+        )
+        self.insert_into_keto_recipe_ingredients(
+            keto_recipe_ingredients_list=[
+                self.get_rows_with_url_id(
+                    recipe_dict=recipe_dict, rows=recipe_dict["keto_recipe_ingredients"]
+                )
+                for recipe_dict in recipe_dict_list
+            ],
+            website_name=website_name,
+            recipe_id_map=recipe_id_map,
+        )
+        self.insert_into_keto_recipe_instructions(
+            keto_recipe_instructions_list=[
+                self.get_rows_with_url_id(
+                    recipe_dict=recipe_dict,
+                    rows=recipe_dict["keto_recipe_instructions"],
+                )
+                for recipe_dict in recipe_dict_list
+            ],
+            website_name=website_name,
+            recipe_id_map=recipe_id_map,
+        )
+        self.insert_into_keto_recipe_tips(
+            keto_recipe_tips_list=[
+                self.get_rows_with_url_id(
+                    recipe_dict=recipe_dict, rows=recipe_dict["keto_recipe_tips"]
+                )
+                for recipe_dict in recipe_dict_list
+            ],
+            website_name=website_name,
+            recipe_id_map=recipe_id_map,
+        )
 
 
 if __name__ == "__main__":
-    recipe_dict_list = get_total_recipe_dict_list()
+    args = parse_crawl_args()
     db = FreeFrdiDB()
-    db.insert_all_into_db(
-        recipe_dict_list=recipe_dict_list,
+    db.write_behind(
+        recipe_dicts=iter_total_recipe_dicts(),
         website_name=WebsiteNames.FREE_FRDI.value,
+        resume=args.resume,
+        backfill=args.backfill,
     )
@@ -1,31 +1,53 @@
 import logging
-from typing import Dict, List
+from typing import Any, Dict, List, Tuple
 
 from constants import WebsiteNames
-from crawlers.keto_diet import get_total_recipe_dict_list
+from crawlers.keto_diet import iter_total_recipe_dicts
+from databases.checkpoint import parse_crawl_args
 from databases.db import BaseRecipeDB
 
 logging.root.setLevel(logging.INFO)
 
 
 class KetoDietDB(BaseRecipeDB):
+    FAST_LOAD_COLUMNS = {
+        **BaseRecipeDB.FAST_LOAD_COLUMNS,
+        "nutrition": (
+            "energy",
+            "carbohydrate",
+            "fat",
+            "protein",
+            "total_dietary_fiber",
+            "etc",
+        ),
+    }
+
     def insert_into_keto_recipe_nutrition(
-        self, keto_recipe_nutrition_list: List[Dict], website_name: str
+        self,
+        keto_recipe_nutrition_list: List[Dict],
+        website_name: str,
+        recipe_id_map: Dict[Tuple[Any, str], Any] = None,
     ):
         try:
-            for nutrition_dict in keto_recipe_nutrition_list:
-                recipe_id = self.get_recipe_id_by_recipe_and_website_name(
-                    recipe_name=nutrition_dict["recipe_name"], website_name=website_name
+            if recipe_id_map is None:
+                recipe_id_map = self.get_recipe_id_map(
+                    url_ids=self.get_row_url_ids([keto_recipe_nutrition_list])
                 )
-                query = f"""
-                            INSERT IGNORE INTO
-                            nutrition(recipe_id, energy, carbohydrate, fat, protein, total_dietary_fiber, etc)
-                            VALUES (
-                                {recipe_id}, %(energy)s, %(carbohydrate)s, %(fat)s,
-                                %(protein)s, %(total_dietary_fiber)s, %(etc)s
-                            )
-                        """
-                self.cursor.execute(query, nutrition_dict)
+            self.bulk_insert(
+                table="nutrition",
+                columns=(
+                    "recipe_id",
+                    "energy",
+                    "carbohydrate",
+                    "fat",
+                    "protein",
+                    "total_dietary_fiber",
+                    "etc",
+                ),
+                rows=self.get_rows_with_recipe_id(
+                    row_lists=[keto_recipe_nutrition_list], recipe_id_map=recipe_id_map
+                ),
+            )
             logging.info(f"Successfully inserted into keto_recipe_nutrition")
         except Exception as e:
             logging.error(f"{e} -> keto_recipe_nutrition")
@@ -33,9 +55,11 @@ class KetoDietDB(BaseRecipeDB):
 
 
 if __name__ == "__main__":
-    total_recipe_dict_list = get_total_recipe_dict_list()
+    args = parse_crawl_args()
     db = KetoDietDB()
-    db.insert_all_into_db(
-        recipe_dict_list=total_recipe_dict_list,
+    db.write_behind(
+        recipe_dicts=iter_total_recipe_dicts(),
         website_name=WebsiteNames.KETO_DIET.value,
+        resume=args.resume,
+        backfill=args.backfill,
     )
@@ -1,52 +1,69 @@
 import logging
-from typing import Dict, List
+from typing import Any, Dict, List
 
 from constants import WebsiteNames
-from crawlers.ketogenic_diet_resource import get_total_recipe_dict_list
+from crawlers.ketogenic_diet_resource import iter_total_recipe_dicts
+from databases.checkpoint import parse_crawl_args
 from databases.db import BaseRecipeDB
 
 logging.root.setLevel(logging.INFO)
 
 
 class KetogenicDietResourceDB(BaseRecipeDB):
-    def insert_all_into_db(self, recipe_dict_list: List[Dict], website_name: str):
-        try:
-            self.insert_into_keto_recipe(
-                keto_recipe_info_list=[
-                    recipe_info
-                    for recipe_dict in recipe_dict_list
-                    for recipe_info in recipe_dict["keto_recipe_info"]
-                ]
-            )
-            self.insert_into_keto_recipe_ingredients(
-                keto_recipe_ingredients_list=[
-                    ingredients_info
-                    for recipe_dict in recipe_dict_list
-                    for ingredients_info in recipe_dict["keto_recipe_ingredients"]
-                ],
-                website_name=website_name,
-            )
-            self.insert_into_keto_recipe_instructions(
-                keto_recipe_instructions_list=[
-                    instructions_info
-                    for recipe_dict in recipe_dict_list
-                    for instructions_info in recipe_dict["keto_recipe_instructions"]
-                    if instructions_info
-                ],
-                website_name=website_name,
-            )
-            self.db.commit()
-        except Exception as e:
-            logging.error(e)
-            self.db.rollback()
-        finally:
-            self.db.close()
+    # every page holds several recipes, which the fast-load mode doesn't handle
+    FAST_LOAD = False
+
+    def get_recipe_url_id(self, recipe_dict: Dict) -> Any:
+        # the recipes of a page all share its url_id
+        recipe_info_list = recipe_dict["keto_recipe_info"]
+        return recipe_info_list[0]["url_id"] if recipe_info_list else None
+
+    def insert_into_all_tables(
+        self, recipe_dict_list: List[Dict], website_name: str
+    ) -> None:
+        self.insert_into_keto_recipe(
+            keto_recipe_info_list=[
+                recipe_info
+                for recipe_dict in recipe_dict_list
+                for recipe_info in recipe_dict["keto_recipe_info"]
+            ]
+        )
+        recipe_id_map = self.get_recipe_id_map(
+            url_ids=[
+                self.get_recipe_url_id(recipe_dict) for recipe_dict in recipe_dict_list
+            ]
+        )
+        self.insert_into_keto_recipe_ingredients(
+            keto_recipe_ingredients_list=[
+                self.get_rows_with_url_id(
+                    recipe_dict=recipe_dict, rows=ingredients_info
+                )
+                for recipe_dict in recipe_dict_list
+                for ingredients_info in recipe_dict["keto_recipe_ingredients"]
+            ],
+            website_name=website_name,
+            recipe_id_map=recipe_id_map,
+        )
+        self.insert_into_keto_recipe_instructions(
+            keto_recipe_instructions_list=[
+                self.get_rows_with_url_id(
+                    recipe_dict=recipe_dict, rows=instructions_info
+                )
+                for recipe_dict in recipe_dict_list
+                for instructions_info in recipe_dict["keto_recipe_instructions"]
+                if instructions_info
+            ],
+            website_name=website_name,
+            recipe_id_map=recipe_id_map,
+        )
 
 
 if __name__ == "__main__":
-    recipe_dict_list = get_total_recipe_dict_list()
+    args = parse_crawl_args()
     db = KetogenicDietResourceDB()
-    db.insert_all_into_db(
-        recipe_dict_list=recipe_dict_list,
+    db.write_behind(
+        recipe_dicts=iter_total_recipe_dicts(),
         website_name=WebsiteNames.KETOGENIC_DIET_RESOURCE.value,
+        resume=args.resume,
+        backfill=args.backfill,
     )
@@ -0,0 +1,144 @@
+import logging
+from typing import Dict, List, Tuple
+
+from databases.db import BaseDBConnection
+
+logging.root.setLevel(logging.INFO)
+
+# (index name, columns) of the indexes each table needs
+INDEXES: Dict[str, List[Tuple[str, Tuple[str, ...]]]] = {
+    "keto_recipe_urls": [
+        # get_web_url_list, get_new_web_url_list and the url lookups
+        ("ix_keto_recipe_urls_website_url", ("website_name", "url", "url_id")),
+        # get_api_id_list and the post_id lookups
+        ("ix_keto_recipe_urls_website_post", ("website_name", "post_id", "url_id")),
+        # the url_id ordered pages read by iter_query_rows
+        ("ix_keto_recipe_urls_website_id", ("website_name", "url_id")),
+    ],
+    "keto_recipe": [
+        # the anti-join of get_new_web_url_list and the recipe_id lookups, which
+        # read recipe_id from the primary key stored with the index entries
+        ("ix_keto_recipe_url_name", ("url_id", "recipe_name")),
+    ],
+}
+
+# (column name, definition) of the columns each table needs
+COLUMNS: Dict[str, List[Tuple[str, str]]] = {
+    "keto_recipe_urls": [
+        # fingerprint of the recipe last written for the url, see write_recipe_dicts
+        ("content_hash", "CHAR(64) NULL"),
+        # set for pages found not to be recipes, see save_not_recipe_urls
+        ("not_recipe", "TINYINT(1) NOT NULL DEFAULT 0"),
+    ],
+}
+
+# tables that hold crawled text, which needs utf8mb4 for characters such as emoji
+CHARSET = "utf8mb4"
+CHARSET_TABLES = (
+    "keto_recipe_urls",
+    "keto_recipe",
+    "keto_recipe_ingredients",
+    "keto_recipe_instructions",
+    "keto_recipe_tips",
+    "nutrition",
+)
+
+
+class SchemaMigrationDB(BaseDBConnection):
+    def get_column_names(self, table: str) -> List[str]:
+        query = """
+                    SELECT column_name AS column_name from information_schema.columns
+                    where table_schema=DATABASE() and table_name=%s
+                """
+        self.cursor.execute(query, (table,))
+        rows = self.cursor.fetchall()
+        return [data["column_name"] for data in rows]
+
+    def add_column(self, table: str, column: str, definition: str) -> None:
+        self.cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+        logging.info(f"Added column {column} {definition} to {table}")
+
+    def add_missing_columns(self, columns: Dict = None) -> None:
+        """
+        Add the columns of COLUMNS that the tables don't have yet.
+
+        :param columns: Dict
+        :return:
+        """
+        try:
+            for table, table_columns in (columns or COLUMNS).items():
+                column_names = self.get_column_names(table=table)
+                for column, definition in table_columns:
+                    if column not in column_names:
+                        self.add_column(
+                            table=table, column=column, definition=definition
+                        )
+        finally:
+            self.db.close()
+
+    def get_index_names(self, table: str) -> List[str]:
+        query = """
+                    SELECT DISTINCT index_name AS index_name from information_schema.statistics
+                    where table_schema=DATABASE() and table_name=%s
+                """
+        self.cursor.execute(query, (table,))
+        rows = self.cursor.fetchall()
+        return [data["index_name"] for data in rows]
+
+    def add_index(self, table: str, index_name: str, columns: Tuple[str, ...]) -> None:
+        self.cursor.execute(
+            f"ALTER TABLE {table} ADD INDEX {index_name} ({', '.join(columns)})"
+        )
+        logging.info(f"Added index {index_name} on {table}({', '.join(columns)})")
+
+    def add_missing_indexes(self, indexes: Dict = None) -> None:
+        """
+        Add the indexes of INDEXES that the tables don't have yet, so that the
+        migration can be run again safely.
+
+        :param indexes: Dict
+        :return:
+        """
+        try:
+            for table, table_indexes in (indexes or INDEXES).items():
+                index_names = self.get_index_names(table=table)
+                for index_name, columns in table_indexes:
+                    if index_name not in index_names:
+                        self.add_index(
+                            table=table, index_name=index_name, columns=columns
+                        )
+        finally:
+            self.db.close()
+
+    def get_table_collation(self, table: str) -> str:
+        query = """
+                    SELECT table_collation AS table_collation from information_schema.tables
+                    where table_schema=DATABASE() and table_name=%s
+                """
+        self.cursor.execute(query, (table,))
+        row = self.cursor.fetchone()
+        return row["table_collation"]
+
+    def convert_charset(self, tables: Tuple[str, ...] = None) -> None:
+        """
+        Convert the tables of CHARSET_TABLES that aren't in CHARSET yet.
+
+        :param tables: Tuple[str, ...]
+        :return:
+        """
+        try:
+            for table in tables or CHARSET_TABLES:
+                if not self.get_table_collation(table=table).startswith(CHARSET):
+                    self.cursor.execute(
+                        f"ALTER TABLE {table} CONVERT TO CHARACTER SET {CHARSET}"
+                    )
+                    logging.info(f"Converted {table} to {CHARSET}")
+        finally:
+            self.db.close()
+
+
+if __name__ == "__main__":
+    db = SchemaMigrationDB()
+    db.convert_charset()
+    db.add_missing_columns()
+    db.add_missing_indexes()
@@ -0,0 +1,170 @@
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import pymysql
+from config import DB_HOST, DB_NAME, DB_PASSWORD, DB_USERNAME
+
+from constants import DB_POOL_MAX_SIZE, DB_POOL_PING_AFTER, DB_POOL_TIMEOUT
+
+logging.root.setLevel(logging.INFO)
+
+
+def connect() -> pymysql.connections.Connection:
+    return pymysql.connect(
+        user=DB_USERNAME,
+        passwd=DB_PASSWORD,
+        host=DB_HOST,
+        db=DB_NAME,
+        charset="utf8mb4",
+        # needed by the LOAD DATA LOCAL INFILE statements of the fast-load mode
+        local_infile=True,
+    )
+
+
+class PooledConnection:
+    """
+    Connection checked out of a ConnectionPool. It behaves like the pymysql
+    connection it wraps, except that close() hands the connection back to the
+    pool instead of closing it.
+    """
+
+    def __init__(self, pool: "ConnectionPool", connection):
+        self._pool = pool
+        self._connection = connection
+        self._pid = os.getpid()
+
+    @property
+    def closed(self) -> bool:
+        # a connection inherited from the parent of a forked process is unusable
+        return self._connection is None or self._pid != os.getpid()
+
+    def close(self) -> None:
+        if not self.closed:
+            self._pool.release(self._connection)
+        self._connection = None
+
+    def discard(self) -> None:
+        """
+        Drop a broken connection instead of handing it back to the pool.
+
+        :return:
+        """
+        if not self.closed:
+            try:
+                self._connection.close()
+            except Exception:
+                pass
+            self._pool.discard()
+        self._connection = None
+
+    def __getattr__(self, name):
+        if self.closed:
+            raise pymysql.err.InterfaceError(0, "Connection was released to the pool")
+
+        return getattr(self._connection, name)
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """
+    Bounded pool of MySQL connections of one process.
+
+    At most `max_size` connections are open at a time, and acquire() waits up to
+    `timeout` seconds for one to be released once they are all checked out. Idle
+    connections are pinged before being reused when they have been idle for more
+    than `ping_after` seconds, and reconnected when the server has dropped them.
+    """
+
+    def __init__(
+        self,
+        max_size: int = DB_POOL_MAX_SIZE,
+        timeout: float = DB_POOL_TIMEOUT,
+        ping_after: float = DB_POOL_PING_AFTER,
+    ):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.ping_after = ping_after
+        self.size = 0
+        self._idle: List[Tuple[pymysql.connections.Connection, float]] = list()
+        self._condition = threading.Condition()
+
+    def _get_idle_connection(self) -> Optional[pymysql.connections.Connection]:
+        while self._idle:
+            connection, released_at = self._idle.pop()
+            if time.monotonic() - released_at <= self.ping_after:
+                return connection
+            try:
+                connection.ping(reconnect=True)
+                return connection
+            except pymysql.err.Error as e:
+                logging.error(f"Connection pool: dropped stale connection: {e}")
+                self.size -= 1
+
+        return None
+
+    def acquire(self) -> PooledConnection:
+        deadline = time.monotonic() + self.timeout
+        with self._condition:
+            while True:
+                connection = self._get_idle_connection()
+                if connection is not None:
+                    return PooledConnection(pool=self, connection=connection)
+                if self.size < self.max_size:
+                    self.size += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(
+                        f"Connection pool: no connection released in {self.timeout}s"
+                    )
+                self._condition.wait(remaining)
+
+        try:
+            return PooledConnection(pool=self, connection=connect())
+        except Exception:
+            self.discard()
+            raise
+
+    def release(self, connection: pymysql.connections.Connection) -> None:
+        try:
+            # drop the uncommitted changes, as closing the connection would
+            connection.rollback()
+        except pymysql.err.Error:
+            self.discard()
+            return
+
+        with self._condition:
+            self._idle.append((connection, time.monotonic()))
+            self._condition.notify()
+
+    def discard(self) -> None:
+        with self._condition:
+            self.size -= 1
+            self._condition.notify()
+
+
+_pools: Dict[int, ConnectionPool] = dict()
+
+
+def get_connection_pool() -> ConnectionPool:
+    """
+    Get the connection pool of the current process.
+
+    Pools are kept per process id so that forked crawler processes never share
+    MySQL connections with their parent.
+
+    :return: ConnectionPool
+    """
+    pid = os.getpid()
+    if pid not in _pools:
+        _pools[pid] = ConnectionPool()
+
+    return _pools[pid]
@@ -1,14 +1,31 @@
 import logging
-from typing import Dict, List
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
 
 from constants import WebsiteNames
-from crawlers.ruled_me import get_total_recipe_dict_list
+from crawlers.ruled_me import iter_total_recipe_dicts
+from databases.checkpoint import parse_crawl_args
 from databases.db import BaseRecipeDB
 
 logging.root.setLevel(logging.INFO)
 
 
 class RuledMeDB(BaseRecipeDB):
+    FAST_LOAD_COLUMNS = {
+        "keto_recipe": ("recipe_name", "yield", "url_id", "yield_unit", "image_url"),
+        "keto_recipe_ingredients": ("ingredient_name",),
+        "keto_recipe_instructions": ("order_number", "eng_description"),
+        "nutrition": (
+            "energy",
+            "fat",
+            "carbohydrate",
+            "total_dietary_fiber",
+            "protein",
+        ),
+    }
+
+    def get_recipe_url_id(self, recipe_dict: Dict) -> Any:
+        return recipe_dict["url_id"]
+
     def insert_into_keto_recipe(self, recipe_dict_sublist: List[Dict]):
         try:
             query_list = [
@@ -21,52 +38,62 @@ class RuledMeDB(BaseRecipeDB):
                 )
                 for recipe in recipe_dict_sublist
             ]
-            query = f"""
-                        INSERT IGNORE INTO keto_recipe(recipe_name, yield, url_id, yield_unit, image_url)
-                        VALUES (%s, %s, %s, %s, %s)
-                    """
+            self.bulk_insert(
+                table="keto_recipe",
+                columns=("recipe_name", "yield", "url_id", "yield_unit", "image_url"),
+                rows=query_list,
+            )
             logging.info(f"Ruled Me: Successfully inserted into keto_recipe")
-            self.cursor.executemany(query, query_list)
         except Exception as e:
             logging.error(f"Ruled Me: {e} -> keto_recipe")
             raise e
 
     def insert_into_keto_recipe_ingredients(
-        self, recipe_dict_sublist: List[Dict], website_name: str
+        self,
+        recipe_dict_sublist: List[Dict],
+        website_name: str,
+        recipe_id_map: Dict[Tuple[Any, str], Any] = None,
     ):
         try:
+            if recipe_id_map is None:
+                recipe_id_map = self.get_recipe_id_map(
+                    url_ids=[recipe["url_id"] for recipe in recipe_dict_sublist]
+                )
             query_list = [
                 (
                     ingredient,
-                    self.get_recipe_id_by_recipe_and_website_name(
-                        recipe_name=recipe["recipe_name"], website_name=website_name
-                    ),
+                    recipe_id_map[(recipe["url_id"], recipe["recipe_name"])],
                 )
                 for recipe in recipe_dict_sublist
                 if recipe.get("ingredients") is not None
                 for ingredient in recipe["ingredients"]
             ]
-            query = f"""
-                        INSERT IGNORE INTO keto_recipe_ingredients(ingredient_name, recipe_id)
-                        VALUES (%s, %s)
-                    """
+            self.bulk_insert(
+                table="keto_recipe_ingredients",
+                columns=("ingredient_name", "recipe_id"),
+                rows=query_list,
+            )
             logging.info(
                 f"Ruled Me: Successfully inserted into keto_recipe_ingredients"
             )
-            self.cursor.executemany(query, query_list)
         except Exception as e:
             logging.error(f"Ruled Me: {e} -> keto_recipe_ingredients")
             raise e
 
     def insert_into_keto_recipe_instructions(
-        self, recipe_dict_sublist: List[Dict], website_name: str
+        self,
+        recipe_dict_sublist: List[Dict],
+        website_name: str,
+        recipe_id_map: Dict[Tuple[Any, str], Any] = None,
     ):
         try:
+            if recipe_id_map is None:
+                recipe_id_map = self.get_recipe_id_map(
+                    url_ids=[recipe["url_id"] for recipe in recipe_dict_sublist]
+                )
             query_list = [
                 (
-                    self.get_recipe_id_by_recipe_and_website_name(
-                        recipe_name=recipe["recipe_name"], website_name=website_name
-                    ),
+                    recipe_id_map[(recipe["url_id"], recipe["recipe_name"])],
                     index,
                     instruction.strip(),
                 )
@@ -74,27 +101,32 @@ class RuledMeDB(BaseRecipeDB):
                 if recipe.get("instructions") is not None
                 for index, instruction in enumerate(recipe["instructions"])
             ]
-            query = f"""
-                        INSERT IGNORE INTO keto_recipe_instructions(recipe_id, order_number, eng_description)
-                        VALUES (%s, %s, %s)
-                    """
+            self.bulk_insert(
+                table="keto_recipe_instructions",
+                columns=("recipe_id", "order_number", "eng_description"),
+                rows=query_list,
+            )
             logging.info(
                 f"Ruled Me: Successfully inserted into keto_recipe_instructions"
             )
-            self.cursor.executemany(query, query_list)
         except Exception as e:
             logging.error(f"Ruled Me: {e} -> keto_recipe_instructions")
             raise e
 
     def insert_into_keto_recipe_nutrition(
-        self, recipe_dict_sublist: List[Dict], website_name: str
+        self,
+        recipe_dict_sublist: List[Dict],
+        website_name: str,
+        recipe_id_map: Dict[Tuple[Any, str], Any] = None,
     ):
         try:
+            if recipe_id_map is None:
+                recipe_id_map = self.get_recipe_id_map(
+                    url_ids=[recipe["url_id"] for recipe in recipe_dict_sublist]
+                )
             query_list = [
                 (
-                    self.get_recipe_id_by_recipe_and_website_name(
-                        recipe["recipe_name"], website_name=website_name
-                    ),
+                    recipe_id_map[(recipe["url_id"], recipe["recipe_name"])],
                     recipe["nutrition"]["energy"],
                     recipe["nutrition"]["fat"],
                     recipe["nutrition"]["net_carbs"],
@@ -104,41 +136,80 @@ class RuledMeDB(BaseRecipeDB):
                 for recipe in recipe_dict_sublist
                 if recipe.get("nutrition") is not None
             ]
-            query = f"""
-                        INSERT IGNORE INTO nutrition(recipe_id, energy, fat, carbohydrate, total_dietary_fiber, protein)
-                        VALUES (%s, %s, %s, %s, %s, %s)
-                    """
+            self.bulk_insert(
+                table="nutrition",
+                columns=(
+                    "recipe_id",
+                    "energy",
+                    "fat",
+                    "carbohydrate",
+                    "total_dietary_fiber",
+                    "protein",
+                ),
+                rows=query_list,
+            )
             logging.info(f"Ruled Me: Successfully inserted into keto_recipe_nutrition")
-            self.cursor.executemany(query, query_list)
         except Exception as e:
             logging.error(f"Ruled Me: {e} -> keto_recipe_nutrition")
             raise e
 
-    def run(self):
-        recipe_dict_list = get_total_recipe_dict_list()
-        for i in range(0, len(recipe_dict_list), 100):
-            try:
-                recipe_dict_sublist = recipe_dict_list[i : i + 100]
-                self.insert_into_keto_recipe(recipe_dict_sublist)
-                self.insert_into_keto_recipe_instructions(
-                    recipe_dict_sublist, WebsiteNames.RULED_ME.value
-                )
-                self.insert_into_keto_recipe_ingredients(
-                    recipe_dict_sublist, WebsiteNames.RULED_ME.value
-                )
-                self.insert_into_keto_recipe_nutrition(
-                    recipe_dict_sublist, WebsiteNames.RULED_ME.value
-                )
-                logging.info(
-                    f"Inserted {i+len(recipe_dict_sublist)}/{len(recipe_dict_list)}"
-                )
-                self.db.commit()
-            except Exception as e:
-                logging.error(f"Ruled Me: {e}")
-                self.db.rollback()
-        self.db.close()
+    def iter_fast_load_rows(
+        self, recipe_dicts: Iterable[Dict]
+    ) -> Iterator[Tuple[str, Dict]]:
+        for recipe in recipe_dicts:
+            recipe_key = {
+                "url_id": recipe["url_id"],
+                "recipe_name": recipe["recipe_name"],
+            }
+            yield "keto_recipe", recipe
+            for ingredient in recipe.get("ingredients") or list():
+                yield "keto_recipe_ingredients", {
+                    "ingredient_name": ingredient,
+                    **recipe_key,
+                }
+            for index, instruction in enumerate(recipe.get("instructions") or list()):
+                yield "keto_recipe_instructions", {
+                    "order_number": index,
+                    "eng_description": instruction.strip(),
+                    **recipe_key,
+                }
+            if recipe.get("nutrition") is not None:
+                yield "nutrition", {
+                    "energy": recipe["nutrition"]["energy"],
+                    "fat": recipe["nutrition"]["fat"],
+                    "carbohydrate": recipe["nutrition"]["net_carbs"],
+                    "total_dietary_fiber": recipe["nutrition"]["total_dietary_fiber"],
+                    "protein": recipe["nutrition"]["protein"],
+                    **recipe_key,
+                }
+
+    def insert_into_all_tables(
+        self, recipe_dict_list: List[Dict], website_name: str
+    ) -> None:
+        self.insert_into_keto_recipe(recipe_dict_list)
+        recipe_id_map = self.get_recipe_id_map(
+            url_ids=[recipe["url_id"] for recipe in recipe_dict_list]
+        )
+        self.insert_into_keto_recipe_instructions(
+            recipe_dict_list, website_name, recipe_id_map
+        )
+        self.insert_into_keto_recipe_ingredients(
+            recipe_dict_list, website_name, recipe_id_map
+        )
+        self.insert_into_keto_recipe_nutrition(
+            recipe_dict_list, website_name, recipe_id_map
+        )
+
+    def run(self, resume: bool = False, backfill: bool = False):
+        self.write_behind(
+            recipe_dicts=iter_total_recipe_dicts(),
+            website_name=WebsiteNames.RULED_ME.value,
+            resume=resume,
+            backfill=backfill,
+        )
 
 
 if __name__ == "__main__":
+    args = parse_crawl_args()
     db = RuledMeDB()
-    db.run()
+    db.run(resume=args.resume, backfill=args.backfill)
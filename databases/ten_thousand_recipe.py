@@ -1,29 +1,39 @@
 import logging
-from typing import List
+from typing import Any, Dict, List, Tuple
 
 from constants import WebsiteNames
-from crawlers.ten_thousand_recipe import get_total_recipe_dict_list
+from crawlers.ten_thousand_recipe import iter_total_recipe_dicts
+from databases.checkpoint import parse_crawl_args
 from databases.db import BaseRecipeDB
 
 logging.root.setLevel(logging.INFO)
 
 
 class TenThousandRecipeDB(BaseRecipeDB):
+    FAST_LOAD_COLUMNS = {
+        **BaseRecipeDB.FAST_LOAD_COLUMNS,
+        "keto_recipe_instructions": ("order_number", "kor_description"),
+    }
+
     def insert_into_keto_recipe_instructions(
-        self, keto_recipe_instructions_list: List[List], website_name: str
+        self,
+        keto_recipe_instructions_list: List[List],
+        website_name: str,
+        recipe_id_map: Dict[Tuple[Any, str], Any] = None,
     ):
         try:
-            for instructions_list in keto_recipe_instructions_list:
-                recipe_id = self.get_recipe_id_by_recipe_and_website_name(
-                    recipe_name=instructions_list[0]["recipe_name"],
-                    website_name=website_name,
+            if recipe_id_map is None:
+                recipe_id_map = self.get_recipe_id_map(
+                    url_ids=self.get_row_url_ids(keto_recipe_instructions_list)
                 )
-                query = f"""
-                            INSERT IGNORE INTO
-                            keto_recipe_instructions(recipe_id, order_number, kor_description)
-                            VALUES ({recipe_id}, %(order_number)s, %(kor_description)s)
-                        """
-                self.cursor.executemany(query, instructions_list)
+            self.bulk_insert(
+                table="keto_recipe_instructions",
+                columns=("recipe_id", "order_number", "kor_description"),
+                rows=self.get_rows_with_recipe_id(
+                    row_lists=keto_recipe_instructions_list,
+                    recipe_id_map=recipe_id_map,
+                ),
+            )
             logging.info(f"Successfully inserted into keto_recipe_instructions")
         except Exception as e:
             logging.error(f"{e} -> keto_recipe_instructions")
@@ -31,9 +41,11 @@ class TenThousandRecipeDB(BaseRecipeDB):
 
 
 if __name__ == "__main__":
-    recipe_dict_list = get_total_recipe_dict_list()
+    args = parse_crawl_args()
     db = TenThousandRecipeDB()
-    db.insert_all_into_db(
-        recipe_dict_list=recipe_dict_list,
+    db.write_behind(
+        recipe_dicts=iter_total_recipe_dicts(),
         website_name=WebsiteNames.TEN_THOUSAND_RECIPE.value,
+        resume=args.resume,
+        backfill=args.backfill,
     )
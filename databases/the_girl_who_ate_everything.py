@@ -1,16 +1,19 @@
 import logging
 
 from constants import WebsiteNames
-from crawlers.the_girl_who_ate_everything import get_total_recipe_dict_list
+from crawlers.the_girl_who_ate_everything import iter_total_recipe_dicts
+from databases.checkpoint import parse_crawl_args
 from databases.db import BaseRecipeDB
 
 logging.root.setLevel(logging.INFO)
 
 
 if __name__ == "__main__":
-    recipe_dict_list = get_total_recipe_dict_list()
+    args = parse_crawl_args()
     db = BaseRecipeDB()
-    db.insert_all_into_db(
-        recipe_dict_list=recipe_dict_list,
+    db.write_behind(
+        recipe_dicts=iter_total_recipe_dicts(),
         website_name=WebsiteNames.THE_GIRL_WHO_ATE_EVERYTHING.value,
+        resume=args.resume,
+        backfill=args.backfill,
     )
@@ -0,0 +1,167 @@
+import logging
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from constants import (
+    DB_WRITER_CHUNK_SIZE,
+    DB_WRITER_FLUSH_INTERVAL,
+    DB_WRITER_PUT_TIMEOUT,
+    DB_WRITER_QUEUE_SIZE,
+)
+
+logging.root.setLevel(logging.INFO)
+
+_DONE = object()
+
+
+class WriteBehindWriter:
+    """
+    Writes recipe dicts into the DB from a background thread while crawling goes
+    on.
+
+    The thread starts with the first recipe put. Recipes are put on a bounded
+    queue, so the crawl waits for the writer once `queue_size` recipes are
+    pending. The writer writes them with `db.write_recipe_dicts`, which skips the
+    ones that didn't change since the last crawl, and commits every `chunk_size`
+    recipes, or whatever it holds once no recipe came in for `flush_interval`
+    seconds. A chunk that fails is rolled back
+    and logged, and the following chunks are still written, on a new connection
+    when the rollback shows the connection itself is broken. The url_ids of the
+    committed chunks are recorded in `checkpoint`, when there is one.
+
+    Should the writer thread die, put() and close() raise its error in the
+    crawling thread instead of waiting on the queue forever.
+    """
+
+    def __init__(
+        self,
+        db: Any,
+        website_name: str,
+        chunk_size: int = DB_WRITER_CHUNK_SIZE,
+        queue_size: int = DB_WRITER_QUEUE_SIZE,
+        flush_interval: float = DB_WRITER_FLUSH_INTERVAL,
+        checkpoint: Any = None,
+    ):
+        self.db = db
+        self.website_name = website_name
+        self.checkpoint = checkpoint
+        self.chunk_size = chunk_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.unchanged = 0
+        self.failed = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._error: Optional[BaseException] = None
+
+    def __enter__(self) -> "WriteBehindWriter":
+        return self
+
+    @property
+    def started(self) -> bool:
+        return self._thread.ident is not None
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def raise_error(self) -> None:
+        if self._error is not None:
+            message = f"{self.website_name}: DB writer stopped"
+            raise RuntimeError(message) from self._error
+        if self.started and not self._thread.is_alive():
+            raise RuntimeError(f"{self.website_name}: DB writer is not running")
+
+    def _put(self, item: Any) -> None:
+        if not self.started:
+            # started on the first recipe rather than on __enter__, as the crawl
+            # forks its parse workers before yielding it, and forking a process
+            # while this thread holds a lock would leave the lock held in the child
+            self._thread.start()
+        # waits in slices, so that a writer that died doesn't block the crawl
+        while True:
+            self.raise_error()
+            try:
+                self._queue.put(item, timeout=DB_WRITER_PUT_TIMEOUT)
+                return
+            except queue.Full:
+                continue
+
+    def put(self, recipe_dict: Dict) -> None:
+        self._put(recipe_dict)
+
+    def close(self) -> None:
+        """
+        Wait for the pending recipes to be written and release the DB connection.
+
+        :return:
+        """
+        try:
+            if self.started:
+                self._put(_DONE)
+                self._thread.join()
+                if self._error is not None:
+                    self.raise_error()
+        finally:
+            self.db.db.close()
+        logging.info(
+            f"{self.website_name}: Wrote {self.written} recipes, "
+            f"{self.unchanged} unchanged, {self.failed} failed"
+        )
+
+    def write_chunk(self, chunk: List[Dict]) -> None:
+        try:
+            written = self.db.write_recipe_dicts(
+                recipe_dict_list=chunk, website_name=self.website_name
+            )
+            self.db.db.commit()
+            if self.checkpoint is not None:
+                self.checkpoint.mark_committed(
+                    url_ids=[self.db.get_recipe_url_id(recipe) for recipe in chunk]
+                )
+            self.written += written
+            self.unchanged += len(chunk) - written
+            logging.info(f"{self.website_name}: Committed {self.written} recipes")
+        except Exception as e:
+            logging.error(f"{self.website_name}: {e}")
+            self.failed += len(chunk)
+            try:
+                self.db.db.rollback()
+            except Exception as rollback_error:
+                logging.error(
+                    f"{self.website_name}: Dropped DB connection: {rollback_error}"
+                )
+                # the next chunk checks out a new connection
+                self.db.db.discard()
+
+    def _run(self) -> None:
+        try:
+            self._write_queued()
+        except BaseException as e:
+            logging.error(f"{self.website_name}: DB writer stopped: {e}")
+            self._error = e
+
+    def _write_queued(self) -> None:
+        chunk = list()
+        flush_at = None
+        while True:
+            timeout = max(flush_at - time.monotonic(), 0) if chunk else None
+            try:
+                recipe_dict = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                self.write_chunk(chunk)
+                chunk = list()
+                continue
+
+            if recipe_dict is _DONE:
+                if chunk:
+                    self.write_chunk(chunk)
+                return
+
+            if not chunk:
+                flush_at = time.monotonic() + self.flush_interval
+            chunk.append(recipe_dict)
+            if len(chunk) >= self.chunk_size:
+                self.write_chunk(chunk)
+                chunk = list()
@@ -0,0 +1,333 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Iterator, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+from constants import (
+    CACHE_KEY_HEADERS,
+    DEFAULT_RESPONSE_CACHE_TTL,
+    RESPONSE_CACHE_DIR,
+    RESPONSE_CACHE_MAX_SIZE,
+    RESPONSE_CACHE_SIZE_RESYNC_WRITES,
+    RESPONSE_CACHE_TTLS,
+)
+from network.rate_limiter import get_host
+
+logging.root.setLevel(logging.INFO)
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+_response_cache_ttls = {
+    get_host(base_url.value): ttl for base_url, ttl in RESPONSE_CACHE_TTLS.items()
+}
+
+
+def normalize_url(url: str) -> str:
+    parsed = urlparse(url.strip())
+    scheme = parsed.scheme.lower()
+    netloc = parsed.hostname.lower() if parsed.hostname else ""
+    if parsed.port and parsed.port != DEFAULT_PORTS.get(scheme):
+        netloc = f"{netloc}:{parsed.port}"
+    query = urlencode(sorted(parse_qsl(parsed.query, keep_blank_values=True)))
+
+    return urlunparse((scheme, netloc, parsed.path or "/", parsed.params, query, ""))
+
+
+def get_cache_key(url: str, headers: Dict = None) -> str:
+    """
+    Build the cache key of a request from its normalized url and the headers that
+    change the response body. Headers such as User-Agent, which the crawlers pick
+    at random, are left out so that they don't split the cache.
+
+    :param url: str
+    :param headers: Dict
+    :return: str
+    """
+    header_lines = sorted(
+        f"{key.lower()}:{value}"
+        for key, value in (headers or dict()).items()
+        if key.lower() in CACHE_KEY_HEADERS
+    )
+    key = "\n".join([normalize_url(url)] + header_lines)
+
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    On-disk cache of response bodies.
+
+    Bodies are compressed and stored once per content digest under `objects/`,
+    and an SQLite index maps each request key to its digest. Entries expire after
+    the TTL of their website, and the least recently used ones are evicted once
+    the stored bodies exceed `max_size` bytes. The ETag and Last-Modified headers
+    of each response are kept so that expired entries can be revalidated.
+
+    The size of the stored bodies is counted as they are written, and only summed
+    up from the index every `resync_writes` writes, to catch up with the bodies
+    other processes wrote, so that writes don't scan the index.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = RESPONSE_CACHE_DIR,
+        max_size: int = RESPONSE_CACHE_MAX_SIZE,
+        resync_writes: int = RESPONSE_CACHE_SIZE_RESYNC_WRITES,
+    ):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.resync_writes = resync_writes
+        self._local = threading.local()
+        self._size_lock = threading.Lock()
+        self._evict_lock = threading.Lock()
+        self._total_size: Optional[int] = None
+        self._writes = 0
+        os.makedirs(os.path.join(cache_dir, "objects"), exist_ok=True)
+        with self.db:
+            self.db.execute(
+                """
+                    CREATE TABLE IF NOT EXISTS entries(
+                        key TEXT PRIMARY KEY, url TEXT, digest TEXT,
+                        fetched_at REAL, accessed_at REAL,
+                        etag TEXT, last_modified TEXT
+                    )
+                """
+            )
+            entry_columns = [
+                row[1] for row in self.db.execute("PRAGMA table_info(entries)")
+            ]
+            for column in ("etag", "last_modified"):
+                if column not in entry_columns:
+                    self.db.execute(f"ALTER TABLE entries ADD COLUMN {column} TEXT")
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS objects(digest TEXT PRIMARY KEY, size INTEGER)"
+            )
+            self.db.execute(
+                "CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries(accessed_at)"
+            )
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        # sqlite connections can't be shared between threads or forked processes
+        if getattr(self._local, "pid", None) != os.getpid():
+            self._local.db = sqlite3.connect(
+                os.path.join(self.cache_dir, "index.sqlite3"), timeout=30
+            )
+            self._local.pid = os.getpid()
+
+        return self._local.db
+
+    def get_object_path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, "objects", digest[:2], digest)
+
+    @staticmethod
+    def get_ttl(url: str) -> int:
+        return _response_cache_ttls.get(get_host(url), DEFAULT_RESPONSE_CACHE_TTL)
+
+    def get(
+        self, url: str, headers: Dict = None, ignore_ttl: bool = False
+    ) -> Optional[bytes]:
+        """
+        Get the stored body of url while it is fresh, or however old it is with
+        ignore_ttl, as after a 304 response.
+
+        :param url: str
+        :param headers: Dict
+        :param ignore_ttl: bool
+        :return: Optional[bytes]
+        """
+        key = get_cache_key(url=url, headers=headers)
+        row = self.db.execute(
+            "SELECT digest, fetched_at FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        if not ignore_ttl and time.time() - row[1] > self.get_ttl(url):
+            return None
+
+        try:
+            with open(self.get_object_path(row[0]), "rb") as f:
+                content = zlib.decompress(f.read())
+        except (OSError, zlib.error) as e:
+            logging.error(f"Response cache: {url}: {e}")
+            return None
+
+        with self.db:
+            self.db.execute(
+                "UPDATE entries SET accessed_at = ? WHERE key = ?", (time.time(), key)
+            )
+
+        return content
+
+    def get_validators(self, url: str, headers: Dict = None) -> Dict:
+        """
+        Get the conditional request headers revalidating the stored copy of url.
+
+        :param url: str
+        :param headers: Dict
+        :return: Dict
+        """
+        row = self.db.execute(
+            "SELECT etag, last_modified FROM entries WHERE key = ?",
+            (get_cache_key(url=url, headers=headers),),
+        ).fetchone()
+        validators = dict()
+        if row is not None and row[0]:
+            validators["If-None-Match"] = row[0]
+        if row is not None and row[1]:
+            validators["If-Modified-Since"] = row[1]
+
+        return validators
+
+    def touch(self, url: str, headers: Dict = None) -> None:
+        """
+        Mark the stored copy of url as fresh again after a 304 response.
+
+        :param url: str
+        :param headers: Dict
+        :return:
+        """
+        now = time.time()
+        with self.db:
+            self.db.execute(
+                "UPDATE entries SET fetched_at = ?, accessed_at = ? WHERE key = ?",
+                (now, now, get_cache_key(url=url, headers=headers)),
+            )
+
+    def set(
+        self,
+        url: str,
+        content: bytes,
+        headers: Dict = None,
+        etag: str = None,
+        last_modified: str = None,
+    ) -> None:
+        digest = hashlib.sha256(content).hexdigest()
+        object_path = self.get_object_path(digest)
+        is_new_object = not os.path.exists(object_path)
+        if is_new_object:
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            temp_path = f"{object_path}.{os.getpid()}.{threading.get_ident()}"
+            with open(temp_path, "wb") as f:
+                f.write(zlib.compress(content))
+            os.replace(temp_path, object_path)
+
+        size = os.path.getsize(object_path)
+        now = time.time()
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO objects(digest, size) VALUES (?, ?)",
+                (digest, size),
+            )
+            self.db.execute(
+                """
+                    INSERT OR REPLACE INTO entries(
+                        key, url, digest, fetched_at, accessed_at, etag, last_modified
+                    )
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    get_cache_key(url=url, headers=headers),
+                    url,
+                    digest,
+                    now,
+                    now,
+                    etag,
+                    last_modified,
+                ),
+            )
+
+        if self.add_size(size if is_new_object else 0) > self.max_size:
+            self.evict()
+
+    def get_total_size(self) -> int:
+        return self.db.execute("SELECT SUM(size) FROM objects").fetchone()[0] or 0
+
+    def add_size(self, size: int) -> int:
+        """
+        Count size more bytes of stored bodies, and get the total.
+
+        :param size: int
+        :return: int
+        """
+        with self._size_lock:
+            self._writes += 1
+            if self._total_size is None or self._writes % self.resync_writes == 0:
+                self._total_size = self.get_total_size()
+            else:
+                self._total_size += size
+
+            return self._total_size
+
+    def iter_contents(self) -> Iterator[Tuple[str, bytes]]:
+        """
+        Iterate over the url and body of every stored response, fresh or not.
+
+        :return: (url, content) tuples
+        """
+        rows = self.db.execute(
+            "SELECT url, digest FROM entries ORDER BY url"
+        ).fetchall()
+        for url, digest in rows:
+            try:
+                with open(self.get_object_path(digest), "rb") as f:
+                    yield url, zlib.decompress(f.read())
+            except (OSError, zlib.error) as e:
+                logging.error(f"Response cache: {url}: {e}")
+
+    def evict(self) -> None:
+        # one thread evicts at a time, the others carry on writing meanwhile
+        if not self._evict_lock.acquire(blocking=False):
+            return
+
+        try:
+            total_size = self.get_total_size()
+            while total_size > self.max_size:
+                with self.db:
+                    deleted = self.db.execute(
+                        """
+                            DELETE FROM entries WHERE key IN (
+                                SELECT key FROM entries ORDER BY accessed_at LIMIT 100
+                            )
+                        """
+                    ).rowcount
+                    orphans = self.db.execute(
+                        """
+                            SELECT digest, size FROM objects
+                            WHERE digest NOT IN (SELECT digest FROM entries)
+                        """
+                    ).fetchall()
+                    self.db.executemany(
+                        "DELETE FROM objects WHERE digest = ?",
+                        [(digest,) for digest, _ in orphans],
+                    )
+                for digest, _ in orphans:
+                    try:
+                        os.remove(self.get_object_path(digest))
+                    except OSError:
+                        pass
+                total_size -= sum(size for _, size in orphans)
+                logging.info(f"Response cache: evicted {len(orphans)} bodies")
+                if not deleted:
+                    break
+
+            with self._size_lock:
+                self._total_size = total_size
+        finally:
+            self._evict_lock.release()
+
+
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache()
+
+    return _response_cache
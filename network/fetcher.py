@@ -0,0 +1,216 @@
+import asyncio
+import logging
+import queue
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+from typing import Awaitable, Callable, Dict, Iterable, Iterator
+
+import aiohttp
+
+from constants import FETCH_CONCURRENCY, FETCH_QUEUE_SIZE, RESPONSE_CACHE_IO_WORKERS
+from network.cache import get_response_cache
+from network.rate_limiter import get_rate_limiter
+from network.session import create_async_session
+
+logging.root.setLevel(logging.INFO)
+
+
+async def fetch_response_content(
+    session: aiohttp.ClientSession,
+    url: str,
+    headers: Dict = None,
+    cache: bool = True,
+    cache_executor: Executor = None,
+) -> Dict:
+    if not cache:
+        await get_rate_limiter(url).acquire_async()
+        async with session.get(url, headers=headers) as response:
+            response_content = await response.read()
+        logging.info(f"Got response content from {url}")
+        return {"url": url, "response_content": response_content, "not_modified": False}
+
+    loop = asyncio.get_running_loop()
+    response_cache = get_response_cache()
+
+    def run_cache_io(function: Callable, **kwargs) -> Awaitable:
+        # sqlite and file I/O of the cache, kept off the event loop
+        return loop.run_in_executor(cache_executor, partial(function, **kwargs))
+
+    response_content = await run_cache_io(response_cache.get, url=url, headers=headers)
+    if response_content is not None:
+        logging.info(f"Got cached response content from {url}")
+        return {"url": url, "response_content": response_content, "not_modified": False}
+
+    request_headers = dict(headers or dict())
+    request_headers.update(
+        await run_cache_io(response_cache.get_validators, url=url, headers=headers)
+    )
+    await get_rate_limiter(url).acquire_async()
+    async with session.get(url, headers=request_headers) as response:
+        response_content = await response.read()
+
+    if response.status == 304:
+        await run_cache_io(response_cache.touch, url=url, headers=headers)
+        response_content = await run_cache_io(
+            response_cache.get, url=url, headers=headers, ignore_ttl=True
+        )
+        if response_content is not None:
+            logging.info(f"Not modified since last crawl: {url}")
+            return {
+                "url": url,
+                "response_content": response_content,
+                "not_modified": True,
+            }
+
+        # the stored body is gone, so it is fetched again unconditionally
+        await get_rate_limiter(url).acquire_async()
+        async with session.get(url, headers=headers) as response:
+            response_content = await response.read()
+
+    if response.status == 200:
+        await run_cache_io(
+            response_cache.set,
+            url=url,
+            content=response_content,
+            headers=headers,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+    logging.info(f"Got response content from {url}")
+
+    return {"url": url, "response_content": response_content, "not_modified": False}
+
+
+async def stream_url_list_async(
+    url_list: Iterable[str],
+    result_queue: queue.Queue,
+    stop_event: threading.Event,
+    headers: Dict = None,
+    concurrency: int = FETCH_CONCURRENCY,
+    cache: bool = True,
+) -> None:
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+    url_iterator = iter(url_list)
+    cache_executor = ThreadPoolExecutor(max_workers=RESPONSE_CACHE_IO_WORKERS)
+
+    async def fetch_into_queue(session: aiohttp.ClientSession, url: str) -> None:
+        # The semaphore is held until the queue accepts the page, so at most
+        # `concurrency` pages wait outside the queue.
+        try:
+            item = await fetch_response_content(
+                session=session,
+                url=url,
+                headers=headers,
+                cache=cache,
+                cache_executor=cache_executor,
+            )
+            await loop.run_in_executor(None, result_queue.put, item)
+        except Exception as e:
+            logging.error(f"{url}: {e}")
+        finally:
+            semaphore.release()
+
+    # put on the queue after the pages, None once every url was fetched, or the
+    # error that stopped fetching, for iter_url_list to raise
+    end = None
+    try:
+        async with create_async_session() as session:
+            tasks = set()
+            try:
+                while not stop_event.is_set():
+                    await semaphore.acquire()
+                    # Urls are only pulled once a slot is free, and off the event
+                    # loop, as url_list may be a generator streaming them from the DB.
+                    url = await loop.run_in_executor(None, next, url_iterator, None)
+                    if url is None or stop_event.is_set():
+                        semaphore.release()
+                        break
+                    task = asyncio.ensure_future(fetch_into_queue(session, url))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            finally:
+                # the fetches in flight still finish when pulling a url fails
+                await asyncio.gather(*tasks)
+    except Exception as e:
+        logging.error(f"Stopped fetching: {e}")
+        end = e
+    finally:
+        # every fetch has returned by now, so no cache I/O is left running
+        cache_executor.shutdown(wait=False)
+        # stops a generator streaming the urls from the DB when stopped early
+        if hasattr(url_iterator, "close"):
+            await loop.run_in_executor(None, url_iterator.close)
+        await loop.run_in_executor(None, result_queue.put, end)
+
+
+def iter_url_list(
+    url_list: Iterable[str],
+    headers: Dict = None,
+    concurrency: int = FETCH_CONCURRENCY,
+    queue_size: int = FETCH_QUEUE_SIZE,
+    cache: bool = True,
+) -> Iterator[Dict]:
+    """
+    Fetch every url in url_list from a single process, keeping at most
+    `concurrency` requests in flight at once and pacing each host with its
+    rate limiter. Pages are yielded as soon as they arrive, in completion order.
+    Urls are pulled from url_list only as requests go out, so it can be a
+    generator that is still reading them from the DB.
+
+    Fetching runs on an event loop in a background thread and hands pages over
+    through a queue of `queue_size`, so it stalls while the caller is busy and
+    at most `queue_size + concurrency` pages are held in memory.
+
+    Urls with an expired cache entry are revalidated with a conditional request.
+    When the server answers 304, the item carries the stored content and is
+    flagged `not_modified`, so that callers can skip pages they already wrote.
+    iter_parsed_recipe_dicts still parses the ones that may never have been
+    written. Pages that must be up to date, such as listing pages, are fetched
+    with cache=False and never go through the response cache.
+
+    Should fetching stop on an error other than a failed request, such as the
+    session failing to open or url_list raising, the error is raised here once
+    the pages fetched before it were yielded.
+
+    :param url_list: Iterable[str]
+    :param headers: Dict
+    :param concurrency: int
+    :param queue_size: int
+    :param cache: bool
+    :return: {"url": url, "response_content": bytes, "not_modified": bool}, ...
+    """
+    result_queue = queue.Queue(maxsize=queue_size)
+    stop_event = threading.Event()
+    thread = threading.Thread(
+        target=asyncio.run,
+        args=(
+            stream_url_list_async(
+                url_list=url_list,
+                result_queue=result_queue,
+                stop_event=stop_event,
+                headers=headers,
+                concurrency=concurrency,
+                cache=cache,
+            ),
+        ),
+        daemon=True,
+    )
+    thread.start()
+
+    try:
+        while True:
+            item = result_queue.get()
+            if item is None:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop_event.set()
+        while thread.is_alive():
+            try:
+                result_queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
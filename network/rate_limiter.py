@@ -0,0 +1,75 @@
+import asyncio
+import multiprocessing
+import time
+from typing import Dict
+from urllib.parse import urlparse
+
+from constants import DEFAULT_RATE_LIMIT, RATE_LIMITS, BaseUrls
+
+
+class TokenBucket:
+    """
+    Token bucket allowing `rate` requests per second with bursts of up to `burst`.
+
+    The bucket state lives in shared memory, so every process forked after the
+    bucket is created draws from the same budget.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._lock = multiprocessing.Lock()
+        self._tokens = multiprocessing.RawValue("d", burst)
+        self._updated_at = multiprocessing.RawValue("d", time.monotonic())
+
+    def reserve(self) -> float:
+        """
+        Take a token and return how many seconds the caller has to wait before using it.
+
+        :return: float
+        """
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._updated_at.value
+            tokens = min(self.burst, self._tokens.value + elapsed * self.rate) - 1
+            self._tokens.value = tokens
+            self._updated_at.value = now
+
+        return max(0.0, -tokens / self.rate)
+
+    def acquire(self) -> None:
+        time.sleep(self.reserve())
+
+    async def acquire_async(self) -> None:
+        await asyncio.sleep(self.reserve())
+
+
+def get_host(url: str) -> str:
+    host = urlparse(url).netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+_rate_limiters: Dict[str, TokenBucket] = {
+    get_host(base_url.value): TokenBucket(
+        *RATE_LIMITS.get(base_url, DEFAULT_RATE_LIMIT)
+    )
+    for base_url in BaseUrls
+}
+
+
+def get_rate_limiter(url: str) -> TokenBucket:
+    """
+    Get the token bucket of the host serving url.
+
+    Buckets of the BaseUrls hosts are created at import time so that they are
+    shared with every crawler process. Other hosts get a bucket on first use,
+    which is only shared with processes forked after that.
+
+    :param url: str
+    :return: TokenBucket
+    """
+    host = get_host(url)
+    if host not in _rate_limiters:
+        _rate_limiters[host] = TokenBucket(*DEFAULT_RATE_LIMIT)
+
+    return _rate_limiters[host]
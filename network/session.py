@@ -0,0 +1,60 @@
+import os
+from typing import Dict
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+
+from constants import (
+    FETCH_CONCURRENCY,
+    HTTP_KEEPALIVE_TIMEOUT,
+    HTTP_POOL_CONNECTIONS,
+    HTTP_POOL_MAXSIZE,
+)
+from network.rate_limiter import get_rate_limiter
+
+
+class CrawlerSession(requests.Session):
+    def request(self, method, url, *args, **kwargs):
+        get_rate_limiter(url).acquire()
+        return super().request(method, url, *args, **kwargs)
+
+
+_sessions: Dict[int, CrawlerSession] = dict()
+
+
+def get_session() -> requests.Session:
+    """
+    Get the keep-alive session of the current process.
+
+    Sessions are kept per process id so that forked crawler processes never share
+    pooled sockets with their parent.
+
+    :return: requests.Session
+    """
+    pid = os.getpid()
+    if pid not in _sessions:
+        session = CrawlerSession()
+        adapter = HTTPAdapter(
+            pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _sessions[pid] = session
+
+    return _sessions[pid]
+
+
+def create_async_session() -> aiohttp.ClientSession:
+    """
+    Create the session used by the asyncio fetch engine. It has to be created
+    inside a running event loop and closed by the caller.
+
+    :return: aiohttp.ClientSession
+    """
+    connector = aiohttp.TCPConnector(
+        limit=FETCH_CONCURRENCY,
+        limit_per_host=HTTP_POOL_MAXSIZE,
+        keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+    )
+    return aiohttp.ClientSession(connector=connector)
@@ -0,0 +1,200 @@
+import logging
+import re
+import zlib
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from urllib.parse import urljoin
+from xml.etree.ElementTree import XMLPullParser
+
+import isodate
+
+from constants import SITEMAP_CHUNK_SIZE, SITEMAP_PATHS, SITEMAPS, BaseUrls
+from network.session import get_session
+
+logging.root.setLevel(logging.INFO)
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+class SitemapEntry(NamedTuple):
+    url: str
+    lastmod: Optional[datetime]
+
+
+def parse_lastmod(value: Optional[str]) -> Optional[datetime]:
+    """
+    Parse a W3C datetime of a sitemap, which may be a bare date, into an aware
+    datetime. Dates without a timezone are taken as UTC.
+
+    :param value: Optional[str]
+    :return: Optional[datetime]
+    """
+    if not value:
+        return None
+
+    try:
+        lastmod = isodate.parse_datetime(value.strip())
+    except (ValueError, isodate.ISO8601Error):
+        try:
+            date = isodate.parse_date(value.strip())
+        except (ValueError, isodate.ISO8601Error):
+            return None
+        lastmod = datetime(date.year, date.month, date.day)
+
+    return lastmod if lastmod.tzinfo else lastmod.replace(tzinfo=timezone.utc)
+
+
+def get_local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def iter_sitemap_elements(
+    sitemap_url: str, headers: Dict = None
+) -> Iterator[Tuple[str, str, Optional[datetime]]]:
+    """
+    Stream a sitemap or sitemap index and parse it while it downloads, gzipped or
+    not, so that large sitemaps are never held in memory.
+
+    :param sitemap_url: str
+    :param headers: Dict
+    :return: ("url" or "sitemap", loc, lastmod), ...
+    """
+    response = get_session().get(sitemap_url, headers=headers, stream=True)
+    try:
+        response.raise_for_status()
+        parser = XMLPullParser(events=("end",))
+        decompressor = None
+        first_chunk = True
+        for chunk in response.iter_content(SITEMAP_CHUNK_SIZE):
+            if first_chunk and chunk.startswith(GZIP_MAGIC):
+                decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            first_chunk = False
+            parser.feed(decompressor.decompress(chunk) if decompressor else chunk)
+
+            for _, element in parser.read_events():
+                kind = get_local_name(element.tag)
+                if kind not in ("url", "sitemap"):
+                    continue
+                # only direct children, as image and video extensions have a loc too
+                values = {
+                    get_local_name(child.tag): (child.text or "").strip()
+                    for child in element
+                }
+                element.clear()
+                if values.get("loc"):
+                    yield kind, values["loc"], parse_lastmod(values.get("lastmod"))
+    finally:
+        response.close()
+
+
+def iter_sitemap_entries(
+    sitemap_urls: Iterable[str],
+    headers: Dict = None,
+    sitemap_pattern: str = None,
+    since: datetime = None,
+) -> Iterator[SitemapEntry]:
+    """
+    Walk sitemap indexes breadth first and yield the page urls of the sitemaps
+    they list.
+
+    Only the child sitemaps matching sitemap_pattern are followed. With since,
+    child sitemaps and pages whose lastmod is older are left out, while those
+    without a lastmod are always kept.
+
+    :param sitemap_urls: Iterable[str]
+    :param headers: Dict
+    :param sitemap_pattern: str
+    :param since: datetime
+    :return: SitemapEntry, ...
+    """
+    pending = deque(sitemap_urls)
+    visited = set()
+    while pending:
+        sitemap_url = pending.popleft()
+        if sitemap_url in visited:
+            continue
+        visited.add(sitemap_url)
+
+        try:
+            for kind, loc, lastmod in iter_sitemap_elements(
+                sitemap_url=sitemap_url, headers=headers
+            ):
+                if since is not None and lastmod is not None and lastmod < since:
+                    continue
+                if kind == "url":
+                    yield SitemapEntry(url=loc, lastmod=lastmod)
+                elif sitemap_pattern is None or re.search(sitemap_pattern, loc):
+                    pending.append(loc)
+        except Exception as e:
+            logging.error(f"Sitemap {sitemap_url}: {e}")
+
+
+def find_sitemap_urls(base_url: str, headers: Dict = None) -> List[str]:
+    """
+    Find the sitemaps of a website from the Sitemap lines of its robots.txt, or
+    else from the first of SITEMAP_PATHS that it serves.
+
+    :param base_url: str
+    :param headers: Dict
+    :return: List[str]
+    """
+    session = get_session()
+    try:
+        response = session.get(urljoin(base_url, "robots.txt"), headers=headers)
+        if response.status_code == 200:
+            sitemap_urls = re.findall(
+                r"^\s*sitemap:\s*(\S+)", response.text, flags=re.IGNORECASE | re.M
+            )
+            if sitemap_urls:
+                return sitemap_urls
+    except Exception as e:
+        logging.error(f"{base_url}robots.txt: {e}")
+
+    for path in SITEMAP_PATHS:
+        sitemap_url = urljoin(base_url, path)
+        try:
+            response = session.get(sitemap_url, headers=headers, stream=True)
+            response.close()
+        except Exception as e:
+            logging.error(f"{sitemap_url}: {e}")
+            continue
+        if response.status_code == 200:
+            return [sitemap_url]
+
+    return list()
+
+
+def get_sitemap_url_list(
+    base_url: BaseUrls, headers: Dict = None, since: datetime = None
+) -> Optional[List[str]]:
+    """
+    Discover the recipe urls of a website listed in SITEMAPS from its sitemaps.
+
+    :param base_url: BaseUrls
+    :param headers: Dict
+    :param since: datetime
+    :return: the urls, or None when the website has no sitemap to discover from or
+    its sitemaps list no url
+    """
+    if base_url not in SITEMAPS:
+        return None
+
+    sitemap_urls = find_sitemap_urls(base_url=base_url.value, headers=headers)
+    if not sitemap_urls:
+        logging.info(f"No sitemap found for {base_url.value}")
+        return None
+
+    url_list = list(
+        dict.fromkeys(
+            entry.url
+            for entry in iter_sitemap_entries(
+                sitemap_urls=sitemap_urls,
+                headers=headers,
+                sitemap_pattern=SITEMAPS[base_url],
+                since=since,
+            )
+        )
+    )
+    logging.info(f"Found {len(url_list)} urls in the sitemaps of {base_url.value}")
+    return url_list or None
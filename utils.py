@@ -1,12 +1,8 @@
 import logging
 import re
-import time
-from multiprocessing import Pipe, Process
-from multiprocessing.connection import Connection
-from typing import Any, Dict, List
+from typing import Any, List
 
 import isodate
-import requests
 from bs4 import BeautifulSoup
 
 logging.root.setLevel(logging.INFO)
@@ -47,46 +43,3 @@ def get_letters_from_string(string: str) -> List[Any]:
     if string is not None:
         return re.findall(r"[가-힣]+|[a-zA-Z]+", string)
     return [None]
-
-
-def get_response_content_list(url_list, headers: Dict = None) -> List[Dict]:
-    response_list = list()
-    processes = list()
-
-    for i in range(0, len(url_list), 10):
-        url_sublist = url_list[i : i + 10]
-        parent_conn, child_conn = Pipe()
-        response_list.append(parent_conn)
-        process = Process(
-            target=get_response_content_sublist, args=(url_sublist, child_conn, headers)
-        )
-        processes.append(process)
-
-    for process in processes:
-        process.start()
-
-    total_response_list = list()
-    for response_sublist in response_list:
-        total_response_list.extend(response_sublist.recv())
-
-    for process in processes:
-        process.join()
-
-    return total_response_list
-
-
-def get_response_content_sublist(
-    url_sublist: List[str], child_conn: Connection, headers: Dict = None
-) -> None:
-    response_list = list()
-    for url in url_sublist:
-        try:
-            response = requests.get(url, headers=headers)
-            time.sleep(0)
-            response_list.append({"url": url, "response_content": response.content})
-            logging.info(f"Got response content from {url}")
-        except Exception as e:
-            logging.error(e)
-            pass
-    child_conn.send(response_list)
-    child_conn.close()